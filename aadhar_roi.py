@@ -0,0 +1,124 @@
+"""
+Template-driven region-of-interest OCR for Aadhar cards
+The card is located in the photo (or taken as the whole image when it is a
+cropped scan), straightened to the template's canonical size and cut into the
+name, DOB, gender and number regions from AADHAR_TEMPLATE. Only those crops
+are recognized, so the full page never pays for text detection. The engine
+falls back to full-page OCR when the card cannot be found or the number
+region does not read as a valid Aadhar number.
+"""
+
+import re
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from backends import load_backend
+from config import AADHAR_TEMPLATE, DOCUMENT_TYPES
+
+DIGITS_RE = re.compile(r'\D')
+DOB_RE = re.compile('|'.join(DOCUMENT_TYPES['aadhar']['dob_patterns']))
+NAME_RE = re.compile(r'[^A-Za-z.\s]')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _order_corners(points: np.ndarray) -> np.ndarray:
+    """Corners as top-left, top-right, bottom-right, bottom-left with the long edge on top"""
+    points = np.asarray(points, dtype=np.float32)
+    sums = points.sum(axis=1)
+    diffs = np.diff(points, axis=1).ravel()
+    ordered = np.array([points[np.argmin(sums)], points[np.argmin(diffs)],
+                        points[np.argmax(sums)], points[np.argmax(diffs)]], dtype=np.float32)
+    # A card photographed sideways has its long edge vertical; rotate so it reads left to right
+    if np.linalg.norm(ordered[1] - ordered[0]) < np.linalg.norm(ordered[2] - ordered[1]):
+        ordered = np.roll(ordered, -1, axis=0)
+    return ordered
+
+
+def _aspect_matches(width: float, height: float, template: Dict[str, Any], tolerance: float) -> bool:
+    """Whether a width x height box has the card's proportions"""
+    card_width, card_height = template['size']
+    ratio = card_width / card_height
+    long_side, short_side = max(width, height), min(width, height)
+    return short_side > 0 and abs(long_side / short_side - ratio) / ratio <= tolerance
+
+
+def locate_card(image_array: np.ndarray, template: Dict[str, Any] = None) -> Optional[np.ndarray]:
+    """Find the card and return it warped to the template size, or None if there is no card-shaped region"""
+    cv2 = load_backend('opencv')
+    template = template or AADHAR_TEMPLATE
+    size = tuple(template['size'])
+    gray = image_array if image_array.ndim == 2 else cv2.cvtColor(image_array, cv2.COLOR_RGB2GRAY)
+    height, width = gray.shape
+
+    # Look for the card outline on a small copy of the image
+    scale = min(1.0, template['probe_side'] / max(height, width))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else gray
+    edges = cv2.Canny(cv2.GaussianBlur(small, (5, 5), 0), 50, 150)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    min_area = template['min_area'] * small.shape[0] * small.shape[1]
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        if cv2.contourArea(contour) < min_area:
+            break
+        # minAreaRect copes with rounded corners and slight rotation
+        rect = cv2.minAreaRect(contour)
+        if not _aspect_matches(*rect[1], template, template['aspect_tolerance']):
+            continue
+        corners = _order_corners(cv2.boxPoints(rect) / scale)
+        target = np.array([[0, 0], [size[0] - 1, 0], [size[0] - 1, size[1] - 1], [0, size[1] - 1]],
+                          dtype=np.float32)
+        matrix = cv2.getPerspectiveTransform(corners, target)
+        return cv2.warpPerspective(image_array, matrix, size, flags=cv2.INTER_LINEAR)
+
+    # A scan already cropped to the card has no background to find an outline against
+    if _aspect_matches(width, height, template, template['scan_tolerance']):
+        if height > width:
+            image_array = cv2.rotate(image_array, cv2.ROTATE_90_CLOCKWISE)
+        interpolation = cv2.INTER_AREA if image_array.shape[1] > size[0] else cv2.INTER_LINEAR
+        return cv2.resize(image_array, size, interpolation=interpolation)
+    return None
+
+
+def crop_regions(card: np.ndarray, template: Dict[str, Any] = None) -> Dict[str, np.ndarray]:
+    """Cut the template's regions out of a straightened card"""
+    template = template or AADHAR_TEMPLATE
+    height, width = card.shape[:2]
+    return {
+        name: card[int(top * height):int(bottom * height), int(left * width):int(right * width)]
+        for name, (left, top, right, bottom) in template['regions'].items()
+    }
+
+
+def valid_aadhar_number(digits: str) -> bool:
+    """12 digits not starting with 0 or 1, as issued by UIDAI"""
+    return len(digits) == 12 and digits[0] not in '01'
+
+
+def parse_regions(texts: Dict[str, str]) -> Dict[str, Any]:
+    """Turn the text read from each region into parse_aadhar's fields"""
+    aadhar_data = {
+        'name': '',
+        'aadhar_number': '',
+        'dob': '',
+        'gender': '',
+        'address': ''
+    }
+
+    digits = DIGITS_RE.sub('', texts.get('number', ''))
+    if valid_aadhar_number(digits):
+        aadhar_data['aadhar_number'] = digits
+
+    dob = DOB_RE.search(texts.get('dob', ''))
+    if dob:
+        aadhar_data['dob'] = dob.group()
+
+    gender = texts.get('gender', '').lower()
+    if 'female' in gender:
+        aadhar_data['gender'] = 'Female'
+    elif 'male' in gender:
+        aadhar_data['gender'] = 'Male'
+
+    aadhar_data['name'] = WHITESPACE_RE.sub(' ', NAME_RE.sub('', texts.get('name', ''))).strip()
+    return aadhar_data
@@ -1,15 +1,22 @@
 import streamlit as st
-import cv2
-import pytesseract
-from PIL import Image
-import numpy as np
-import pandas as pd
-import re
 import io
 import base64
-from typing import Dict, List, Any
-import easyocr
-from pdf2image import convert_from_bytes
+import hashlib
+import json
+import math
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+from PIL import Image
+import metrics
+from backends import load_backend
+from config import METRICS_CONFIG, UI_CONFIG
+from decoding import decode_image, decode_image_with_scale
+from ocr_engine import OCREngine
+from ocr_result import OCRResult
+from ocr_cache import get_default_cache
+from pdf_pages import iter_pdf_document, pdf_page_count, render_pdf_page
+from page_pool import ocr_pages
 
 # Configure Streamlit page
 st.set_page_config(
@@ -19,160 +26,54 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-class OCREngine:
-    def __init__(self):
-        self.reader = easyocr.Reader(['en'])
-        
-    def preprocess_image(self, image: Image.Image) -> np.ndarray:
-        """Preprocess image for better OCR results"""
-        # Convert PIL image to OpenCV format
-        opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-        
-        # Convert to grayscale
-        gray = cv2.cvtColor(opencv_image, cv2.COLOR_BGR2GRAY)
-        
-        # Apply noise reduction
-        denoised = cv2.medianBlur(gray, 5)
-        
-        # Apply adaptive thresholding
-        thresh = cv2.adaptiveThreshold(
-            denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-        )
-        
-        return thresh
-    
-    def extract_text_tesseract(self, image: Image.Image) -> str:
-        """Extract text using Tesseract OCR"""
-        processed_image = self.preprocess_image(image)
-        text = pytesseract.image_to_string(processed_image, lang='eng')
-        return text
-    
-    def extract_text_easyocr(self, image: Image.Image) -> List[tuple]:
-        """Extract text using EasyOCR"""
-        image_array = np.array(image)
-        results = self.reader.readtext(image_array)
-        return results
-    
-    def parse_resume(self, text: str) -> Dict[str, Any]:
-        """Parse resume text and extract structured information"""
-        resume_data = {
-            'name': '',
-            'email': '',
-            'phone': '',
-            'skills': [],
-            'experience': [],
-            'education': []
-        }
-        
-        # Extract email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        if emails:
-            resume_data['email'] = emails[0]
-        
-        # Extract phone number
-        phone_pattern = r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phones = re.findall(phone_pattern, text)
-        if phones:
-            resume_data['phone'] = ''.join(phones[0]) if isinstance(phones[0], tuple) else phones[0]
-        
-        # Extract name (assuming it's in the first few lines)
-        lines = text.split('\n')
-        for line in lines[:5]:
-            line = line.strip()
-            if line and len(line.split()) <= 4 and not any(char.isdigit() for char in line):
-                if '@' not in line and len(line) > 3:
-                    resume_data['name'] = line
-                    break
-        
-        # Extract skills (looking for common skill-related keywords)
-        skill_keywords = ['python', 'java', 'javascript', 'react', 'angular', 'node.js', 
-                         'sql', 'mongodb', 'aws', 'docker', 'kubernetes', 'git', 'html', 
-                         'css', 'machine learning', 'data science', 'tensorflow', 'pytorch']
-        
-        text_lower = text.lower()
-        found_skills = [skill for skill in skill_keywords if skill in text_lower]
-        resume_data['skills'] = found_skills
-        
-        return resume_data
-    
-    def parse_aadhar(self, text: str) -> Dict[str, Any]:
-        """Parse Aadhar card text and extract structured information"""
-        aadhar_data = {
-            'name': '',
-            'aadhar_number': '',
-            'dob': '',
-            'gender': '',
-            'address': ''
-        }
-        
-        # Extract Aadhar number (12 digits)
-        aadhar_pattern = r'\b\d{4}\s?\d{4}\s?\d{4}\b'
-        aadhar_matches = re.findall(aadhar_pattern, text)
-        if aadhar_matches:
-            aadhar_data['aadhar_number'] = aadhar_matches[0].replace(' ', '')
-        
-        # Extract DOB pattern
-        dob_pattern = r'\b\d{2}[/-]\d{2}[/-]\d{4}\b'
-        dob_matches = re.findall(dob_pattern, text)
-        if dob_matches:
-            aadhar_data['dob'] = dob_matches[0]
-        
-        # Extract gender
-        if 'male' in text.lower() and 'female' not in text.lower():
-            aadhar_data['gender'] = 'Male'
-        elif 'female' in text.lower():
-            aadhar_data['gender'] = 'Female'
-        
-        # Extract name (heuristic approach)
-        lines = text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line and len(line.split()) <= 4 and not any(char.isdigit() for char in line):
-                if 'government' not in line.lower() and 'india' not in line.lower():
-                    aadhar_data['name'] = line
-                    break
-        
-        return aadhar_data
-    
-    def parse_handwritten_notes(self, text: str) -> Dict[str, Any]:
-        """Parse handwritten notes and provide basic structure"""
-        notes_data = {
-            'content': text,
-            'word_count': len(text.split()),
-            'line_count': len(text.split('\n')),
-            'key_points': []
-        }
-        
-        # Extract potential key points (lines starting with bullet points or numbers)
-        lines = text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line.startswith(('•', '-', '*')) or (line and line[0].isdigit() and '.' in line[:3]):
-                notes_data['key_points'].append(line)
-        
-        return notes_data
+# Sidebar label -> OCREngine engine key
+OCR_METHODS = {
+    "EasyOCR (Recommended)": 'easyocr',
+    "Tesseract OCR": 'tesseract',
+    "Cascade (Tesseract, EasyOCR where unsure)": 'cascade'
+}
+
+# Sidebar label -> OCREngine.parse_document key
+DOCUMENT_TYPE_KEYS = {
+    "Resume": 'resume',
+    "Aadhar Card": 'aadhar',
+    "Handwritten Notes": 'notes',
+    "General Text": 'general'
+}
+
+# How a page was read, for pages that were not OCR'd themselves
+PAGE_SOURCE_NOTES = {
+    'text_layer': "Read from the PDF's embedded text layer, without OCR",
+    'blank': "Blank page, skipped without OCR"
+}
+
+# Processed documents kept per session, so reruns re-render instead of re-running OCR
+MAX_MEMOIZED_DOCUMENTS = 3
 
 def main():
     st.title("🔍 AI OCR Engine")
     st.markdown("### Advanced Optical Character Recognition with AI")
     
-    # Initialize OCR engine
+    # Initialize OCR engine (models are shared process-wide via model_registry)
     if 'ocr_engine' not in st.session_state:
-        st.session_state.ocr_engine = OCREngine()
+        st.session_state.ocr_engine = OCREngine(cache=get_default_cache())
+    if 'document_results' not in st.session_state:
+        st.session_state.document_results = OrderedDict()
     
     # Sidebar for options
     st.sidebar.title("📋 Options")
     document_type = st.sidebar.selectbox(
         "Select Document Type",
-        ["Resume", "Aadhar Card", "Handwritten Notes", "General Text"]
+        list(DOCUMENT_TYPE_KEYS)
     )
     
     ocr_method = st.sidebar.selectbox(
         "Select OCR Method",
-        ["EasyOCR (Recommended)", "Tesseract OCR"]
+        list(OCR_METHODS)
     )
     
+    show_metrics = st.sidebar.checkbox("⏱️ Show timing metrics")
+    
     # File upload
     st.subheader("📤 Upload Document")
     uploaded_file = st.file_uploader(
@@ -182,104 +83,306 @@ def main():
     )
     
     if uploaded_file is not None:
+        key = document_key(uploaded_file, document_type, ocr_method)
+        memoized = st.session_state.document_results
+        
+        # Every span recorded for this upload carries the document type and engine
+        with metrics.context(doc_type=DOCUMENT_TYPE_KEYS[document_type], engine=OCR_METHODS[ocr_method]):
+            document = memoized_document(memoized, key, uploaded_file)
+            if document is not None:
+                render_document(document, uploaded_file, document_type, ocr_method, st.session_state.ocr_engine, key)
+    
+    if show_metrics:
+        display_metrics_panel(st.session_state.get('last_spans', []))
+
+def document_key(uploaded_file, document_type: str, ocr_method: str) -> str:
+    """Identify an upload's results by file content, engine and document type"""
+    digest = hashlib.blake2b(uploaded_file.getvalue(), digest_size=16).hexdigest()
+    return f"{digest}:{OCR_METHODS[ocr_method]}:{DOCUMENT_TYPE_KEYS[document_type]}"
+
+def memoized_document(memoized: "OrderedDict[str, Dict[str, Any]]", key: str,
+                      uploaded_file) -> Optional[Dict[str, Any]]:
+    """The session's entry for an upload, opened on first sight; only the most recent few are kept"""
+    if key in memoized:
+        # Widget interactions rerun the script; pages already OCR'd are re-rendered, not recomputed
+        memoized.move_to_end(key)
+        return memoized[key]
+    document = open_document(uploaded_file)
+    if document is not None:
+        memoized[key] = document
+        while len(memoized) > MAX_MEMOIZED_DOCUMENTS:
+            memoized.popitem(last=False)
+    return document
+
+def open_document(uploaded_file) -> Optional[Dict[str, Any]]:
+    """A new document entry: its kind and page count, with no page OCR'd yet"""
+    if uploaded_file.type != "application/pdf":
+        return {'kind': 'image', 'page_count': 1, 'pages': {}}
+    try:
+        page_count = pdf_page_count(uploaded_file.getvalue())
+    except Exception as e:
+        st.error(f"Error processing file: {str(e)}")
+        return None
+    return {'kind': 'pdf', 'page_count': page_count, 'pages': {}}
+
+def page_runs(numbers: List[int]) -> List[Tuple[int, int]]:
+    """Sorted page numbers as (first, last) runs of consecutive pages"""
+    runs = []
+    for number in sorted(numbers):
+        if runs and runs[-1][1] == number - 1:
+            runs[-1] = (runs[-1][0], number)
+        else:
+            runs.append((number, number))
+    return runs
+
+def thumbnail(image, side: int) -> Image.Image:
+    """Copy of a PIL image or ndarray that fits in side x side pixels"""
+    preview = Image.fromarray(image) if isinstance(image, np.ndarray) else image.copy()
+    preview.thumbnail((side, side))
+    return preview
+
+def store_page(document: Dict[str, Any], page: Dict[str, Any]):
+    """Keep a page result with a thumbnail in place of its full-resolution image"""
+    image = page.pop('image', None)
+    page['thumbnail'] = None if image is None else thumbnail(image, UI_CONFIG['thumbnail_side'])
+    document['pages'][page['page']] = page
+
+def process_pages(document: Dict[str, Any], numbers: List[int], data: bytes, document_type: str,
+                  ocr_method: str, ocr_engine: OCREngine):
+    """OCR and parse pages of an uploaded image or PDF, storing each result in the document"""
+    doc_type = DOCUMENT_TYPE_KEYS[document_type]
+    engine = OCR_METHODS[ocr_method]
+    with metrics.collect() as spans, metrics.span('document') as document_span:
         try:
-            # Handle PDF files
-            if uploaded_file.type == "application/pdf":
-                st.info("📄 PDF file detected. Converting to images...")
-                pdf_images = convert_from_bytes(uploaded_file.getvalue())
-                
-                for i, image in enumerate(pdf_images):
-                    st.subheader(f"Page {i+1}")
-                    process_image(image, document_type, ocr_method, st.session_state.ocr_engine)
+            if document['kind'] == 'pdf':
+                progress = st.progress(0.0, text=f"📄 Reading {len(numbers)} page(s)...")
+                done = 0
+                for first, last in page_runs(numbers):
+                    # Pages with a text layer come back as text and skip rasterization and OCR;
+                    # the rest are OCR'd concurrently, and all arrive in page order
+                    pdf_document = iter_pdf_document(data, first_page=first, last_page=last)
+                    for page in ocr_pages(pdf_document, engine, ocr_engine, first_page=first,
+                                          document_type=doc_type):
+                        if not page['error'] and 'parsed' not in page:
+                            with metrics.context(page=page['page']):
+                                page['parsed'] = ocr_engine.parse_document(page['text'], doc_type)
+                        store_page(document, page)
+                        done += 1
+                        progress.progress(done / len(numbers), text=f"📄 Read {done} of {len(numbers)} page(s)")
+                progress.empty()
             else:
-                # Handle image files
-                image = Image.open(uploaded_file)
-                process_image(image, document_type, ocr_method, st.session_state.ocr_engine)
+                with metrics.span('decode', bytes=len(data)) as span:
+                    # Tesseract only reads luminance, so its JPEGs skip colour decoding entirely
+                    image, scale = decode_image_with_scale(data, grayscale=engine == 'tesseract')
+                    span.update(metrics.image_size(image))
                 
+                cascade = None
+                source = 'ocr'
+                with st.spinner("🔍 Extracting text..."):
+                    if doc_type == 'aadhar':
+                        # Reads only the template regions, falling back to the full page
+                        text, detections, parsed = ocr_engine.read_aadhar(image, engine)
+                    elif engine == 'cascade':
+                        text, detections, cascade = ocr_engine.extract_text_cascade(image)
+                        parsed = ocr_engine.parse_document(text, doc_type)
+                    else:
+                        # A blank image is not OCR'd
+                        text, detections, source = ocr_engine.read_pages([image], engine)[0]
+                        parsed = ocr_engine.parse_document(text, doc_type)
+                if detections is not None:
+                    # A large JPEG was decoded at reduced size; report boxes in the upload's coordinates
+                    detections = detections.scaled(scale)
+                store_page(document, {'page': 1, 'image': image, 'text': text, 'detections': detections,
+                                      'error': None, 'parsed': parsed, 'cascade': cascade, 'source': source})
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
+        document_span['pages'] = len(document['pages'])
+        for source in ('text_layer', 'blank'):
+            document_span[f'{source}_pages'] = sum(1 for page in document['pages'].values()
+                                                   if page['source'] == source)
+    st.session_state.last_spans = spans
+    if METRICS_CONFIG['prometheus_path']:
+        metrics.get_recorder().write_prometheus(METRICS_CONFIG['prometheus_path'])
+
+def render_document(document: Dict[str, Any], uploaded_file, document_type: str, ocr_method: str,
+                    ocr_engine: OCREngine, key: str):
+    """Display one results page of a document, OCR'ing its pages first if they have not been
 
-def process_image(image: Image.Image, document_type: str, ocr_method: str, ocr_engine: OCREngine):
-    """Process a single image"""
+    Only the pages on the selected results page are OCR'd and shown, so a long
+    PDF costs one page range at a time, in both OCR and what is sent to the browser.
+    """
+    page_count = document['page_count']
+    page_size = UI_CONFIG['page_size']
+    # Filled in after this run's pages are processed, but shown above them
+    summary = st.container()
     
-    # Display image
-    st.image(image, caption="Uploaded Image", use_column_width=True)
+    first = 1
+    if page_count > page_size:
+        results_pages = math.ceil(page_count / page_size)
+        results_page = st.number_input(f"Results page (1-{results_pages})", min_value=1, max_value=results_pages,
+                                       value=1, key=f"{key}:results_page")
+        first = (int(results_page) - 1) * page_size + 1
+    visible = range(first, min(first + page_size - 1, page_count) + 1)
     
-    # Progress bar
-    progress_bar = st.progress(0)
-    progress_bar.progress(25)
+    pending = [number for number in visible if number not in document['pages']]
+    remaining = page_count - len(document['pages'])
+    if remaining > len(pending) and st.button(f"OCR all {remaining} remaining pages", key=f"{key}:all"):
+        pending = [number for number in range(1, page_count + 1) if number not in document['pages']]
+    if pending:
+        process_pages(document, pending, uploaded_file.getvalue(), document_type, ocr_method, ocr_engine)
+    
+    if page_count > 1:
+        with summary:
+            display_document_summary(document, key)
+    for number in visible:
+        if number in document['pages']:
+            render_page(document, document['pages'][number], uploaded_file, document_type, key)
+
+def page_stats(page: Dict[str, Any]) -> Dict[str, Any]:
+    """Word count and mean detection confidence of one page result, and whether it was OCR'd"""
+    detections = page['detections']
+    return {
+        'page': page['page'],
+        'status': 'error' if page['error'] else 'done',
+        'source': page['source'],
+        'words': len(page['text'].split()),
+        'mean_confidence': round(float(detections.confidences.mean()), 3) if detections else None
+    }
+
+def display_document_summary(document: Dict[str, Any], key: str):
+    """Page, word and confidence totals over the pages OCR'd so far, with a combined text download"""
+    pages = [document['pages'][number] for number in sorted(document['pages'])]
+    stats = [page_stats(page) for page in pages]
+    detections = [page['detections'] for page in pages if page['detections']]
     
-    # Extract text
-    st.subheader("🔍 Text Extraction")
+    st.subheader("📑 Document Summary")
+    col1, col2, col3, col4, col5, col6 = st.columns(6)
+    col1.metric("Pages read", f"{len(pages)} / {document['page_count']}")
+    col2.metric("Words", sum(stat['words'] for stat in stats))
+    # Weighted by detection, over every page with confidences (Tesseract's plain text has none)
+    col3.metric("Mean confidence",
+                f"{float(np.concatenate([d.confidences for d in detections]).mean()):.2f}" if detections else "—")
+    col4.metric("From text layer", sum(1 for stat in stats if stat['source'] == 'text_layer'))
+    col5.metric("Blank pages", sum(1 for stat in stats if stat['source'] == 'blank'))
+    col6.metric("Pages with errors", sum(1 for stat in stats if stat['status'] == 'error'))
     
-    if ocr_method == "EasyOCR (Recommended)":
-        results = ocr_engine.extract_text_easyocr(image)
-        extracted_text = ' '.join([result[1] for result in results])
+    if stats:
+        with st.expander("Per-page summary"):
+            st.dataframe(load_backend('pandas').DataFrame(stats), hide_index=True)
+        st.download_button(
+            label="📄 Download all text",
+            data='\n\n'.join(page['text'] for page in pages if not page['error']),
+            file_name="extracted_text.txt",
+            mime="text/plain",
+            key=f"{key}:document:text"
+        )
+
+def page_preview(document: Dict[str, Any], number: int, data: bytes) -> Image.Image:
+    """A page at preview size, decoded again from the upload since results keep only thumbnails"""
+    if document['kind'] == 'pdf':
+        image = render_pdf_page(data, number, dpi=UI_CONFIG['preview_dpi'])
+    else:
+        image = decode_image(data, max_side=UI_CONFIG['preview_side'])
+    return thumbnail(image, UI_CONFIG['preview_side'])
+
+def render_page(document: Dict[str, Any], page: Dict[str, Any], uploaded_file, document_type: str, key: str):
+    """Display one page: a thumbnail and text snippet, or everything once expanded
+
+    A single-page document is always shown expanded.
+    """
+    number = page['page']
+    with metrics.context(page=number), metrics.span('render'):
+        expanded = document['page_count'] == 1
+        if not expanded:
+            st.divider()
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                if page['thumbnail'] is not None:
+                    st.image(page['thumbnail'], caption=f"Page {number}")
+                elif page['source'] == 'text_layer':
+                    # Never rasterized; the preview is rendered only if the page is expanded
+                    st.info("📝 Text layer")
+            with col2:
+                st.subheader(f"Page {number}")
+                if not page['error']:
+                    stats = page_stats(page)
+                    confidence = '' if stats['mean_confidence'] is None else \
+                        f", mean confidence {stats['mean_confidence']:.2f}"
+                    source = '' if page['source'] == 'ocr' else f" · {page['source'].replace('_', ' ')}"
+                    st.caption(f"{stats['words']} words{confidence}{source}")
+                    st.text(page['text'][:UI_CONFIG['snippet_chars']])
+                    expanded = st.toggle("Show full page", key=f"{key}:{number}:expanded")
+        if page['error']:
+            st.error(f"Error processing page {number}: {page['error']}")
+            return
+        if not expanded:
+            return
         
+        # Display image
+        st.image(page_preview(document, number, uploaded_file.getvalue()), caption="Uploaded Image",
+                 use_column_width=True)
+        
+        st.subheader("🔍 Text Extraction")
+        if page['source'] in PAGE_SOURCE_NOTES:
+            st.caption(PAGE_SOURCE_NOTES[page['source']])
+        if page.get('cascade'):
+            st.caption(f"Cascade: {page['cascade']['escalated_fraction']:.1%} of pixels re-read by EasyOCR "
+                       f"in {page['cascade']['regions']} region(s)")
+        display_extraction(page['text'], page['detections'])
+        display_parsed_data(page['text'], page['parsed'], document_type, f"{key}:{number}")
+
+def display_extraction(extracted_text: str, results: Optional[OCRResult]):
+    """Display detections and the raw extracted text"""
+    if results is not None:
         # Display confidence scores
         st.subheader("📊 Detection Results")
-        confidence_data = []
-        for result in results:
-            confidence_data.append({
-                'Text': result[1],
-                'Confidence': f"{result[2]:.2%}",
-                'Coordinates': str(result[0])
+        if len(results):
+            # Confidence and box columns are views of the result's arrays, not per-word strings
+            st.dataframe(results.to_frame(), column_config={
+                'text': 'Text',
+                'confidence': st.column_config.ProgressColumn('Confidence', format='%.2f',
+                                                              min_value=0.0, max_value=1.0)
             })
-        
-        if confidence_data:
-            df = pd.DataFrame(confidence_data)
-            st.dataframe(df)
-    else:
-        extracted_text = ocr_engine.extract_text_tesseract(image)
-    
-    progress_bar.progress(50)
     
     # Display raw text
     st.subheader("📝 Extracted Text")
     st.text_area("Raw Text", extracted_text, height=200)
-    
-    progress_bar.progress(75)
-    
-    # Parse based on document type
+
+def display_parsed_data(extracted_text: str, parsed_data: Dict[str, Any], document_type: str, widget_key: str):
+    """Display structured fields and download options"""
     st.subheader("📋 Structured Data")
     
     if document_type == "Resume":
-        parsed_data = ocr_engine.parse_resume(extracted_text)
         display_resume_data(parsed_data)
     elif document_type == "Aadhar Card":
-        parsed_data = ocr_engine.parse_aadhar(extracted_text)
         display_aadhar_data(parsed_data)
     elif document_type == "Handwritten Notes":
-        parsed_data = ocr_engine.parse_handwritten_notes(extracted_text)
         display_notes_data(parsed_data)
     else:
         st.write("**General Text Extraction Complete**")
         st.info("Select a specific document type for structured parsing.")
     
-    progress_bar.progress(100)
-    
-    # Download options
+    # Download options (the click reruns the script, which only re-renders memoized results)
     st.subheader("💾 Download Options")
     col1, col2 = st.columns(2)
     
     with col1:
-        if st.button("📄 Download as Text"):
-            st.download_button(
-                label="Download Text File",
-                data=extracted_text,
-                file_name="extracted_text.txt",
-                mime="text/plain"
-            )
+        st.download_button(
+            label="📄 Download as Text",
+            data=extracted_text,
+            file_name="extracted_text.txt",
+            mime="text/plain",
+            key=f"{widget_key}:text"
+        )
     
     with col2:
-        if st.button("📊 Download as JSON") and document_type != "General Text":
-            import json
-            json_data = json.dumps(parsed_data, indent=2)
+        if document_type != "General Text":
             st.download_button(
-                label="Download JSON File",
-                data=json_data,
+                label="📊 Download as JSON",
+                data=json.dumps(parsed_data, indent=2),
                 file_name="structured_data.json",
-                mime="application/json"
+                mime="application/json",
+                key=f"{widget_key}:json"
             )
 
 def display_resume_data(data: Dict[str, Any]):
@@ -317,6 +420,10 @@ def display_aadhar_data(data: Dict[str, Any]):
             st.success("✅ Aadhar number detected")
         else:
             st.warning("⚠️ Aadhar number not clearly detected")
+        if data.get('method') == 'template':
+            st.caption("Read from the card's template regions")
+        elif data.get('method') == 'template+full_page':
+            st.caption("Read from the card's template regions, with missing fields from the full page")
 
 def display_notes_data(data: Dict[str, Any]):
     """Display parsed handwritten notes data"""
@@ -335,5 +442,19 @@ def display_notes_data(data: Dict[str, Any]):
         else:
             st.write("No bullet points or numbered items detected")
 
+def display_metrics_panel(spans: List[Dict[str, Any]]):
+    """Sidebar panel with the stage timings of the last document and the Prometheus dump"""
+    st.sidebar.subheader("⏱️ Timing Metrics")
+    if not spans:
+        st.sidebar.write("Process a document to see where time goes.")
+        return
+    
+    pd = load_backend('pandas')
+    st.sidebar.dataframe(pd.DataFrame(metrics.stage_totals(spans)))
+    with st.sidebar.expander("Spans"):
+        st.dataframe(pd.DataFrame(spans))
+    with st.sidebar.expander("Prometheus"):
+        st.code(metrics.get_recorder().prometheus_text(), language='text')
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+On-demand loading of heavy OCR and imaging libraries
+Nothing here is imported until a code path actually needs it, so the UI can
+render before torch, OpenCV or pandas are loaded
+"""
+
+import importlib
+import importlib.util
+import threading
+from typing import Callable, Dict, List, Any
+
+# Backend name -> (module to import, pip package to suggest when missing)
+BACKENDS = {
+    'easyocr': ('easyocr', 'easyocr'),
+    'tesseract': ('pytesseract', 'pytesseract'),
+    'tesserocr': ('tesserocr', 'tesserocr'),
+    'opencv': ('cv2', 'opencv-python'),
+    'pdf': ('pdf2image', 'pdf2image'),
+    'pandas': ('pandas', 'pandas'),
+    'torch': ('torch', 'torch'),
+    'onnxruntime': ('onnxruntime', 'onnxruntime'),
+    'onnxruntime_quantization': ('onnxruntime.quantization', 'onnxruntime'),
+}
+
+_loaded: Dict[str, Any] = {}
+_lock = threading.Lock()
+# Callbacks waiting for a backend's first import (see on_load)
+_hooks: Dict[str, List[Callable]] = {}
+
+
+def load_backend(name: str):
+    """Import a backend module on first use and return it"""
+    module = _loaded.get(name)
+    if module is not None:
+        return module
+
+    module_name, package = BACKENDS[name]
+    with _lock:
+        module = _loaded.get(name)
+        if module is None:
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError as e:
+                raise ImportError(
+                    f"{name} backend is not installed ({e}). Install it with: pip install {package}"
+                ) from e
+            _loaded[name] = module
+            callbacks = _hooks.pop(name, [])
+        else:
+            callbacks = []
+    # Outside the lock, so a callback may load other backends
+    for callback in callbacks:
+        callback(module)
+    return module
+
+
+def on_load(name: str, callback: Callable[[Any], None]):
+    """Run callback(module) when a backend is first imported, or now if it already is"""
+    with _lock:
+        module = _loaded.get(name)
+        if module is None:
+            _hooks.setdefault(name, []).append(callback)
+            return
+    callback(module)
+
+
+def is_available(name: str) -> bool:
+    """Check whether a backend can be imported without importing it"""
+    module_name, _ = BACKENDS[name]
+    return importlib.util.find_spec(module_name) is not None
+
+
+def loaded_backends() -> Dict[str, bool]:
+    """Report which backends have been imported so far"""
+    return {name: name in _loaded for name in BACKENDS}
@@ -0,0 +1,174 @@
+"""
+Headless batch OCR over folders of images and PDFs
+Fans documents out over a process pool and streams results to JSONL
+"""
+
+import glob
+import json
+import os
+import time
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Any, Iterator, Optional, TextIO, Union
+
+import numpy as np
+from PIL import Image
+
+import metrics
+from config import EASYOCR_CONFIG, TESSERACT_CONFIG
+from decoding import decode_image
+from page_dedup import PageIndex
+from page_pool import MODEL_ENGINES
+from pdf_pages import iter_pdf_document
+from thread_budget import apply_budget
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp')
+PDF_EXTENSIONS = ('.pdf',)
+SUPPORTED_EXTENSIONS = IMAGE_EXTENSIONS + PDF_EXTENSIONS
+
+# Engine owned by each pool worker, built once by _init_worker
+_worker_engine = None
+
+
+def collect_inputs(patterns: List[str]) -> List[str]:
+    """Expand directories and glob patterns into a sorted list of supported files"""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, files in os.walk(pattern):
+                for name in files:
+                    if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                        paths.add(os.path.join(root, name))
+        else:
+            for path in glob.glob(pattern, recursive=True):
+                if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS):
+                    paths.add(path)
+    return sorted(paths)
+
+
+def iter_pages(path: str, page: Optional[int] = None,
+               grayscale: bool = False) -> Iterator[Union[Image.Image, np.ndarray, str]]:
+    """Yield an image file as one decoded array, or the pages of a PDF one at a time (only `page` if given)
+
+    PDF pages with an embedded text layer are yielded as their text (see
+    pdf_pages.iter_pdf_document) and are never rasterized.
+    """
+    if path.lower().endswith(PDF_EXTENSIONS):
+        yield from iter_pdf_document(path, first_page=page or 1, last_page=page)
+        return
+
+    with metrics.span('decode') as span:
+        image = decode_image(path, grayscale)
+        span.update(metrics.image_size(image))
+    yield image
+
+
+def _init_worker(ocr_engine: str, use_cache: bool = True, workers: int = 1, thread_budget: bool = True):
+    """Build the worker's OCREngine once and warm up the selected model"""
+    global _worker_engine
+    from ocr_engine import OCREngine
+    from ocr_cache import get_default_cache
+
+    from tesseract_pool import TesseractPool
+
+    if thread_budget:
+        apply_budget(workers)
+    # Documents are already spread over processes, so each worker drives a single tesseract
+    _worker_engine = OCREngine(cache=get_default_cache() if use_cache else None,
+                               tesseract_pool=TesseractPool(workers=1))
+    if ocr_engine in MODEL_ENGINES:
+        _worker_engine.reader
+
+
+def process_document(path: str, document_type: str, ocr_engine: str, engine=None,
+                     page: Optional[int] = None) -> Dict[str, Any]:
+    """OCR and parse every page of one document (or just `page`) inside a pool worker"""
+    engine = engine or _worker_engine
+    start = time.perf_counter()
+    record = {
+        'source': path,
+        'document_type': document_type,
+        'engine': ocr_engine,
+        'pages': [],
+        'error': None
+    }
+    first_page = page or 1
+
+    with metrics.context(doc_type=document_type, engine=ocr_engine, source=path):
+        try:
+            # Pages are recognized a chunk at a time so Tesseract starts once per chunk
+            # and EasyOCR detects and recognizes the chunk's pages in shared batches
+            pages = iter_pages(path, page, grayscale=ocr_engine == 'tesseract')
+            chunk_size = (EASYOCR_CONFIG if ocr_engine == 'easyocr' else TESSERACT_CONFIG)['batch_size']
+            # This document's pages so far, so a page repeated in a later chunk is not OCR'd again
+            page_index = PageIndex()
+            for chunk in iter(lambda: list(islice(pages, chunk_size)), []):
+                # Text-layer pages (str) are parsed as they are; only the images are OCR'd
+                images = [image for image in chunk if not isinstance(image, str)]
+                if document_type == 'aadhar':
+                    # Cards are read region by region, so they are not batched
+                    results = [(image_text, parsed, 'ocr')
+                               for image_text, _, parsed in (engine.read_aadhar(image, ocr_engine) for image in images)]
+                else:
+                    # Blank pages and repeats of earlier pages of the document are not OCR'd again
+                    results = [(image_text, engine.parse_document(image_text, document_type), source)
+                               for image_text, _, source in engine.read_pages(images, ocr_engine, page_index)]
+                results = iter(results)
+                for item in chunk:
+                    if isinstance(item, str):
+                        image_text, parsed, source = item, engine.parse_document(item, document_type), 'text_layer'
+                    else:
+                        image_text, parsed, source = next(results)
+                    record['pages'].append({
+                        'page': first_page + len(record['pages']),
+                        'text': image_text,
+                        'parsed': parsed,
+                        'source': source
+                    })
+        except Exception as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+
+        record['elapsed'] = round(time.perf_counter() - start, 4)
+        metrics.record_span('document', record['elapsed'] * 1000, pages=len(record['pages']),
+                            error=record['error'] is not None)
+    return record
+
+
+def iter_batch(paths: List[str], document_type: str, ocr_engine: str, workers: Optional[int] = None,
+               use_cache: bool = True, thread_budget: bool = True) -> Iterator[Dict[str, Any]]:
+    """Yield one result record per document in completion order
+
+    With thread_budget each worker limits torch, OpenCV and Tesseract to its
+    share of the cores (see thread_budget.py).
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(ocr_engine, use_cache, workers, thread_budget)) as pool:
+        futures = [pool.submit(process_document, path, document_type, ocr_engine) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def run_batch(paths: List[str], output: TextIO, document_type: str = 'general',
+              ocr_engine: str = 'tesseract', workers: Optional[int] = None,
+              use_cache: bool = True, thread_budget: bool = True) -> Dict[str, Any]:
+    """Process documents in parallel, writing one JSON line per document as it finishes"""
+    start = time.perf_counter()
+    summary = {'documents': 0, 'pages': 0, 'text_layer_pages': 0, 'blank_pages': 0, 'duplicate_pages': 0,
+               'failed': 0}
+
+    for record in iter_batch(paths, document_type, ocr_engine, workers, use_cache, thread_budget):
+        output.write(json.dumps(record) + '\n')
+        output.flush()
+        summary['documents'] += 1
+        summary['pages'] += len(record['pages'])
+        for page in record['pages']:
+            if page['source'] != 'ocr':
+                summary[f"{page['source']}_pages"] += 1
+        if record['error']:
+            summary['failed'] += 1
+
+    elapsed = time.perf_counter() - start
+    summary['elapsed'] = round(elapsed, 3)
+    summary['docs_per_sec'] = round(summary['documents'] / elapsed, 3) if elapsed > 0 else 0.0
+    return summary
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Full-page vs template-region OCR on Aadhar cards
+
+Renders synthetic cards, both as cropped scans and as photos of a slightly
+rotated card on a larger background, and reads each one with the full-page
+path (extract_text + parse_aadhar) and with OCREngine.read_aadhar. Reports
+latency, how often the number was read correctly, how often a wrong number
+was returned, and how often the template path fell back to the full page.
+
+Usage: python -m benchmarks.aadhar_roi [--engine tesseract] [--cards 8] [--output roi.json]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List, Any, Tuple
+
+from PIL import Image
+
+from ocr_engine import OCREngine
+from benchmarks.synthetic import aadhar_card
+
+BACKGROUND = (92, 84, 76)
+
+
+def photographed(card: Image.Image, rng: random.Random) -> Image.Image:
+    """Paste a slightly rotated card onto a phone-photo sized background"""
+    photo = Image.new('RGB', (3000, 2250), BACKGROUND)
+    rotated = card.rotate(rng.uniform(-8, 8), resample=Image.BICUBIC, expand=True, fillcolor=BACKGROUND)
+    photo.paste(rotated, (rng.randint(300, 1200), rng.randint(300, 900)))
+    return photo
+
+
+def samples(seed: int, cards: int) -> List[Tuple[str, Image.Image, Dict[str, Any]]]:
+    """Scanned and photographed cards with their ground-truth fields"""
+    rng = random.Random(seed)
+    result = []
+    for i in range(cards):
+        card = aadhar_card(rng)
+        result.append((f"scan-{i}", card['image'], card['fields']))
+        result.append((f"photo-{i}", photographed(card['image'], rng), card['fields']))
+    return result
+
+
+def full_page(engine: OCREngine, image: Image.Image, method: str) -> Dict[str, Any]:
+    """The original path: OCR the whole image, then search the text"""
+    text, _ = engine.extract_text(image, method)
+    return dict(engine.parse_document(text, 'aadhar'), method='full_page')
+
+
+def template(engine: OCREngine, image: Image.Image, method: str) -> Dict[str, Any]:
+    """Template regions, falling back to the full page"""
+    return engine.read_aadhar(image, method)[2]
+
+
+def run(engine: OCREngine, read, method: str, cards) -> Dict[str, Any]:
+    """Read every card once, recording latency and number accuracy"""
+    rows = []
+    for name, image, fields in cards:
+        start = time.perf_counter()
+        parsed = read(engine, image, method)
+        elapsed = time.perf_counter() - start
+        rows.append({'sample': name, 'ms': round(elapsed * 1000, 1), 'method': parsed['method'],
+                     'number': parsed['aadhar_number'], 'expected': fields['aadhar_number'],
+                     'dob_correct': parsed['dob'] == fields['dob']})
+    latencies = [row['ms'] for row in rows]
+    return {
+        'mean_ms': round(statistics.mean(latencies), 1),
+        'median_ms': round(statistics.median(latencies), 1),
+        'number_correct': sum(row['number'] == row['expected'] for row in rows) / len(rows),
+        'number_wrong': sum(bool(row['number']) and row['number'] != row['expected'] for row in rows) / len(rows),
+        'dob_correct': sum(row['dob_correct'] for row in rows) / len(rows),
+        'fallbacks': sum(row['method'] == 'full_page' for row in rows),
+        'samples': rows
+    }
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark template-region Aadhar OCR')
+    parser.add_argument('--engine', choices=['tesseract', 'easyocr'], default='tesseract')
+    parser.add_argument('--cards', type=int, default=8, help='Cards generated (each as a scan and a photo)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    cards = samples(args.seed, args.cards)
+    # No cache, so every read does the full work
+    engine = OCREngine(cache=None)
+    if args.engine == 'easyocr':
+        engine.reader
+
+    report = {'engine': args.engine}
+    report['full_page'] = run(engine, full_page, args.engine, cards)
+    report['template'] = run(engine, template, args.engine, cards)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+    for label in ('full_page', 'template'):
+        result = report[label]
+        print(f"{label:<10} {result['mean_ms']:>9.1f} ms mean  number correct {result['number_correct']:.2f}  "
+              f"wrong {result['number_wrong']:.2f}  fallbacks {result['fallbacks']}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
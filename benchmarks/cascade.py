@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Cost against quality for the Tesseract -> EasyOCR cascade
+
+Runs the cascade over the synthetic pages at several confidence thresholds
+and reports, per threshold, the mean fraction of pixels escalated to
+EasyOCR, latency and accuracy against ground truth, next to Tesseract and
+EasyOCR on their own.
+
+Usage: python -m benchmarks.cascade [--thresholds 40 60 80] [--per-kind 2] [--output cascade.json]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Dict, List, Any, Callable
+
+import numpy as np
+
+from config import CASCADE_CONFIG
+from ocr_engine import OCREngine
+from benchmarks import synthetic
+from benchmarks.common import char_accuracy, report_metadata
+
+
+def run(read: Callable[[np.ndarray], Any], pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Read every page once, recording latency, accuracy and escalation"""
+    latencies = []
+    accuracies = []
+    fractions = []
+    for page in pages:
+        start = time.perf_counter()
+        text, report = read(np.asarray(page['image']))
+        latencies.append((time.perf_counter() - start) * 1000)
+        accuracies.append(char_accuracy(text, page['text']))
+        fractions.append(report['escalated_fraction'])
+    return {
+        'mean_ms': round(statistics.mean(latencies), 1),
+        'accuracy': round(statistics.mean(accuracies), 4),
+        'escalated_fraction': round(statistics.mean(fractions), 4)
+    }
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark the Tesseract -> EasyOCR cascade')
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[40, 60, 80])
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--per-kind', type=int, default=2, help='Documents generated per kind')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    pages = []
+    for document in synthetic.generate(args.seed, args.per_kind):
+        pages.extend(document['pages'] if document['kind'] == 'pdf' else [document])
+    # No cache, so every threshold does the full work; the model is loaded before timing
+    engine = OCREngine(cache=None)
+    engine.reader
+
+    report = {
+        'meta': report_metadata(seed=args.seed, per_kind=args.per_kind, pages=len(pages)),
+        'tesseract': run(lambda image: (engine.extract_text_tesseract(image), {'escalated_fraction': 0.0}),
+                         pages),
+        'easyocr': run(lambda image: (' '.join(result[1] for result in engine.extract_text_easyocr(image)),
+                                      {'escalated_fraction': 1.0}), pages),
+        'cascade': {}
+    }
+
+    def cascade(image: np.ndarray):
+        text, _, escalation = engine.extract_text_cascade(image)
+        return text, escalation
+
+    for threshold in args.thresholds:
+        CASCADE_CONFIG['confidence_threshold'] = threshold
+        report['cascade'][str(threshold)] = run(cascade, pages)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+    rows = [('tesseract', report['tesseract']), ('easyocr', report['easyocr'])]
+    rows += [(f"cascade@{threshold}", result) for threshold, result in report['cascade'].items()]
+    for label, result in rows:
+        print(f"{label:<14} {result['mean_ms']:>9.1f} ms  accuracy {result['accuracy']:.3f}  "
+              f"escalated {result['escalated_fraction']:.1%}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
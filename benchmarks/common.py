@@ -0,0 +1,86 @@
+"""
+Helpers shared by the benchmark scripts: accuracy, latency statistics,
+process memory and report files
+"""
+
+import difflib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Any, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def char_accuracy(predicted: str, truth: str) -> float:
+    """Similarity of whitespace-normalized strings, 1.0 for a perfect match"""
+    return difflib.SequenceMatcher(None, ' '.join(predicted.split()), ' '.join(truth.split())).ratio()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Linear-interpolated percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def latency_stats(seconds: List[float]) -> Dict[str, float]:
+    """Throughput and p50/p95/mean latency for a list of per-call timings"""
+    total = sum(seconds)
+    return {
+        'calls': len(seconds),
+        'throughput_per_sec': round(len(seconds) / total, 3) if total > 0 else 0.0,
+        'p50_ms': round(percentile(seconds, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(seconds, 0.95) * 1000, 3),
+        'mean_ms': round(total / len(seconds) * 1000, 3) if seconds else 0.0
+    }
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+def git_commit() -> Optional[str]:
+    """Current commit of the repository, if it is a git checkout"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    return result.stdout.strip() or None
+
+
+def report_metadata(**extra) -> Dict[str, Any]:
+    """Environment details recorded with every report so runs can be compared"""
+    return dict(
+        commit=git_commit(),
+        timestamp=time.strftime('%Y-%m-%dT%H:%M:%S'),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        cpu_count=os.cpu_count(),
+        **extra
+    )
+
+
+def write_report(report: Dict[str, Any], path: Optional[str]) -> str:
+    """Serialize a report, writing it to path when given"""
+    output = json.dumps(report, indent=2)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(output)
+    return output
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+EasyOCR CPU inference: torch fp32 / int8 against onnxruntime fp32 / int8
+
+Prepares the synthetic pages once, then reads them through readtext_many with
+each runtime at several intra-op thread counts, reporting per-page latency,
+accuracy against ground truth and agreement with EasyOCR's stock setup
+(torch, int8 recognizer, library thread count). ONNX exports are written to
+EASYOCR_CONFIG['onnx_dir'] on the first run.
+
+Usage: python -m benchmarks.cpu_inference [--threads 1 2 4] [--per-kind 2] [--output cpu.json]
+"""
+
+import argparse
+import copy
+import json
+import statistics
+import sys
+import time
+from typing import Dict, List, Any
+
+import numpy as np
+
+from backends import load_backend
+from config import EASYOCR_CONFIG
+from cpu_inference import OnnxModule, export_onnx, set_torch_threads
+from model_registry import SharedReader
+from preprocessing import get_pipeline
+from resolution import normalize_resolution
+from benchmarks import synthetic
+from benchmarks.common import char_accuracy, peak_rss_mb, report_metadata
+
+
+def read_all(reader: SharedReader, images: List[np.ndarray]) -> Dict[str, Any]:
+    """Read every page one call at a time, returning latencies and joined texts"""
+    latencies = []
+    texts = []
+    for image in images:
+        start = time.perf_counter()
+        detections = reader.readtext_many([image])[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        texts.append(' '.join(result[1] for result in detections))
+    return {'latencies': latencies, 'texts': texts}
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark EasyOCR CPU runtimes and thread counts')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--per-kind', type=int, default=2, help='Documents generated per kind')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4], help='Intra-op thread counts')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    pages = []
+    for document in synthetic.generate(args.seed, args.per_kind):
+        pages.extend(document['pages'] if document['kind'] == 'pdf' else [document])
+    pipeline = get_pipeline('easyocr')
+    images = [pipeline.run(normalize_resolution(np.asarray(page['image']))[0]) for page in pages]
+    truths = [page['text'] for page in pages]
+
+    # Models are loaded and exported before anything is timed
+    easyocr = load_backend('easyocr')
+    torch = load_backend('torch')
+    languages = EASYOCR_CONFIG['languages']
+    float_reader = easyocr.Reader(languages, gpu=False, quantize=False)
+    int8_reader = easyocr.Reader(languages, gpu=False, quantize=True)
+    exports = {'onnx_fp32': export_onnx(float_reader, quantize=False),
+               'onnx_int8': export_onnx(float_reader, quantize=True)}
+
+    default_threads = torch.get_num_threads()
+    baseline = read_all(SharedReader(int8_reader), images)['texts']
+
+    report = {
+        'meta': report_metadata(seed=args.seed, per_kind=args.per_kind, pages=len(images),
+                                default_threads=default_threads),
+        'runs': {}
+    }
+    for threads in args.threads:
+        set_torch_threads(threads)
+        readers = {'torch_fp32': float_reader, 'torch_int8': int8_reader}
+        for name, (detector_path, recognizer_path) in exports.items():
+            reader = copy.copy(float_reader)
+            reader.detector = OnnxModule(detector_path, threads, outputs=2)
+            reader.recognizer = OnnxModule(recognizer_path, threads)
+            readers[name] = reader
+
+        for name, reader in readers.items():
+            shared = SharedReader(reader)
+            # One untimed page warms the allocator and onnxruntime's kernels
+            shared.readtext_many(images[:1])
+            result = read_all(shared, images)
+            report['runs'][f"{name}@{threads}"] = {
+                'runtime': name,
+                'threads': threads,
+                'mean_ms': round(statistics.mean(result['latencies']), 1),
+                'p95_ms': round(float(np.percentile(result['latencies'], 95)), 1),
+                'accuracy': round(statistics.mean(map(char_accuracy, result['texts'], truths)), 4),
+                'agreement': round(statistics.mean(map(char_accuracy, result['texts'], baseline)), 4),
+                'peak_rss_mb': peak_rss_mb()
+            }
+    set_torch_threads(default_threads)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+    for label, result in report['runs'].items():
+        print(f"{label:<14} {result['mean_ms']:>9.1f} ms  accuracy {result['accuracy']:.3f}  "
+              f"agreement {result['agreement']:.3f}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Upload decoding: PIL open + RGB conversion vs decoding.decode_image
+
+Encodes the resolution benchmark's scanner- to phone-photo-sized text images
+as JPEG and PNG and decodes each one repeatedly the way uploads used to be
+decoded (Image.open, convert('RGB'), np.array, then a grayscale conversion
+for Tesseract) and with decode_image, in colour and grayscale. Reports
+latency and the size of the array handed to the engine; --engine also OCRs
+both arrays to show reduced-scale JPEG decoding keeps accuracy.
+
+Usage: python -m benchmarks.decoding [--repeats 5] [--engine tesseract] [--output decoding.json]
+"""
+
+import argparse
+import io
+import json
+import sys
+import time
+from typing import Callable, Dict, Any
+
+import numpy as np
+from PIL import Image
+
+from backends import load_backend
+from decoding import decode_image
+from benchmarks.common import char_accuracy, latency_stats, report_metadata
+from benchmarks.resolution import synthetic_samples
+
+
+def pil_decode(data: bytes, grayscale: bool) -> np.ndarray:
+    """The previous upload path: a full-size RGB decode, converted to gray afterwards if needed"""
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    pixels = np.array(image.convert('RGB'))
+    if grayscale:
+        cv2 = load_backend('opencv')
+        pixels = cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY)
+    return pixels
+
+
+def measure(decode: Callable[[bytes, bool], np.ndarray], data: bytes, grayscale: bool,
+            repeats: int) -> Dict[str, Any]:
+    """Latency of `repeats` decodes and the shape of the array they produce"""
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        pixels = decode(data, grayscale)
+        seconds.append(time.perf_counter() - start)
+    return dict(latency_stats(seconds), shape=list(pixels.shape), megabytes=round(pixels.nbytes / 2 ** 20, 2))
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark upload decoding')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--quality', type=int, default=90, help='JPEG quality of the encoded samples')
+    parser.add_argument('--engine', choices=['tesseract', 'easyocr'],
+                        help='Also OCR both decodes with this engine and compare accuracy')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    engine = None
+    if args.engine:
+        from ocr_engine import OCREngine
+        engine = OCREngine(cache=None)
+
+    report = {
+        'meta': report_metadata(repeats=args.repeats, quality=args.quality, engine=args.engine),
+        'samples': []
+    }
+    for name, pixels, truth in synthetic_samples():
+        for fmt in ('JPEG', 'PNG'):
+            buffer = io.BytesIO()
+            Image.fromarray(pixels).save(buffer, fmt, quality=args.quality)
+            data = buffer.getvalue()
+            # Tesseract is handed grayscale, EasyOCR colour
+            grayscale = args.engine != 'easyocr'
+            entry = {'sample': name, 'format': fmt, 'bytes': len(data)}
+            for mode, gray in (('rgb', False), ('gray', True)):
+                entry[mode] = {'pil': measure(pil_decode, data, gray, args.repeats),
+                               'decode_image': measure(decode_image, data, gray, args.repeats)}
+            if engine is not None:
+                accuracy = {}
+                for label, decode in (('pil', pil_decode), ('decode_image', decode_image)):
+                    text, _ = engine.extract_text(decode(data, grayscale), args.engine)
+                    accuracy[label] = round(char_accuracy(text, truth), 4)
+                entry['accuracy'] = accuracy
+            report['samples'].append(entry)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+    print(f"{'sample':<24} {'fmt':<5} {'rgb pil/new ms':>16} {'gray pil/new ms':>17}", file=sys.stderr)
+    for entry in report['samples']:
+        rgb, gray = entry['rgb'], entry['gray']
+        print(f"{entry['sample']:<24} {entry['format']:<5} "
+              f"{rgb['pil']['p50_ms']:>8.1f}/{rgb['decode_image']['p50_ms']:<7.1f} "
+              f"{gray['pil']['p50_ms']:>8.1f}/{gray['decode_image']['p50_ms']:<7.1f}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
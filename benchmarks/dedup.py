@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Page deduplication: false matches, missed copies and cost per page
+
+Fingerprints every synthetic page, re-scanned copies of each (JPEG
+recompression, sensor noise and a shift of a few pixels), blank pages with
+faint noise, and pairs of Aadhar cards and resumes rendered from one
+template that differ in a single field (name, one digit of the number or
+phone, the DOB year). Reports, at several max_difference thresholds, how
+many pairs of distinct pages and of single-field variants near-duplicate
+matching would wrongly treat as duplicates and how many copies it would
+miss, plus the blank-page verdicts and the time to fingerprint a page and
+compare two.
+
+Usage: python -m benchmarks.dedup [--shifts 2 10 25] [--variants 4] [--thresholds 0.004 0.008 0.016] [--output dedup.json]
+"""
+
+import argparse
+import io
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from config import DEDUP_CONFIG
+from page_dedup import fingerprint, hash_distances, page_difference
+from benchmarks import synthetic
+from benchmarks.common import latency_stats, report_metadata, write_report
+
+
+def rescan(pixels: np.ndarray, shift: int, rng: np.random.Generator) -> np.ndarray:
+    """A page as a second scan might return it: recompressed, noisy and shifted by `shift` px"""
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, 'JPEG', quality=60)
+    copy = np.asarray(Image.open(buffer)).astype(np.int16) + rng.integers(-8, 9, pixels.shape)
+    copy = np.clip(copy, 0, 255).astype(np.uint8)
+    # Shifted in from white paper rather than wrapped around
+    shifted = np.full_like(copy, 255)
+    shifted[shift:, shift:] = copy[:copy.shape[0] - shift, :copy.shape[1] - shift]
+    return shifted
+
+
+def candidate(first, second) -> bool:
+    return hash_distances(first['hash'][None], second['hash'])[0] <= DEDUP_CONFIG['max_hash_distance']
+
+
+def _last_digit_changed(value: str) -> str:
+    return value[:-1] + str((int(value[-1]) + 1) % 10)
+
+
+def field_variants(seed: int, count: int) -> List[Tuple[str, np.ndarray, np.ndarray]]:
+    """(change, page, page with that one field changed) for Aadhar cards and resumes of one template"""
+    rng = random.Random(seed)
+    changes = {
+        'name': lambda person: dict(person, name=person['name'].split()[0] + ' ' + rng.choice(synthetic.LAST_NAMES)),
+        'aadhar_number_digit': lambda person: dict(person, aadhar_number=_last_digit_changed(person['aadhar_number'])),
+        'dob_year': lambda person: dict(person, dob=person['dob'][:-1] + str((int(person['dob'][-1]) + 1) % 10)),
+        'phone_digit': lambda person: dict(person, phone=_last_digit_changed(person['phone']))
+    }
+    fields: Dict[str, tuple] = {'aadhar': ('name', 'aadhar_number_digit', 'dob_year'),
+                                'resume': ('name', 'phone_digit')}
+    variants = []
+    for index in range(count):
+        person = synthetic._person(rng)
+        for kind, maker in (('aadhar', synthetic.aadhar_card), ('resume', synthetic.resume)):
+            page_seed = rng.random()
+            # The same seed redraws everything but the person, so only the changed field differs
+            original = maker(random.Random(page_seed), person=person)['image']
+            for change in fields[kind]:
+                changed = changes[change](person)
+                if changed == person:
+                    continue
+                variant = maker(random.Random(page_seed), person=changed)['image']
+                variants.append((f"{kind}:{change}", np.asarray(original.convert('RGB')),
+                                 np.asarray(variant.convert('RGB'))))
+    return variants
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark perceptual page deduplication')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--per-kind', type=int, default=3, help='Documents generated per kind')
+    parser.add_argument('--shifts', type=int, nargs='+', default=[2, 10, 25], help='Re-scan offsets in px')
+    parser.add_argument('--variants', type=int, default=4, help='People rendered with single-field changes')
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[0.004, 0.008, 0.016],
+                        help='max_difference values to evaluate')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    pages: List[np.ndarray] = []
+    for document in synthetic.generate(args.seed, args.per_kind):
+        images = [page['image'] for page in document['pages']] if document['kind'] == 'pdf' else [document['image']]
+        pages.extend(np.asarray(image.convert('RGB')) for image in images)
+
+    seconds = []
+    fingerprints = []
+    for pixels in pages:
+        start = time.perf_counter()
+        fingerprints.append(fingerprint(pixels))
+        seconds.append(time.perf_counter() - start)
+
+    # Distinct pages only ever meet pages of their own size
+    distinct, compare_seconds = [], []
+    for i in range(len(pages)):
+        for j in range(i + 1, len(pages)):
+            if pages[i].shape == pages[j].shape:
+                start = time.perf_counter()
+                difference = page_difference(fingerprints[i], fingerprints[j])
+                compare_seconds.append(time.perf_counter() - start)
+                distinct.append((candidate(fingerprints[i], fingerprints[j]), difference))
+    copies = []
+    for pixels, page in zip(pages, fingerprints):
+        for shift in args.shifts:
+            copy = fingerprint(rescan(pixels, shift, rng))
+            copies.append((candidate(page, copy), page_difference(page, copy)))
+
+    variants, exact_matches = [], 0
+    for change, original, variant in field_variants(args.seed, args.variants):
+        first, second = fingerprint(original), fingerprint(variant)
+        variants.append((change, candidate(first, second), page_difference(first, second)))
+        exact_matches += first['digest'] == second['digest']
+
+    blanks = [np.clip(np.full((1400, 1000), 245) + rng.integers(-6, 7, (1400, 1000)), 0, 255).astype(np.uint8)
+              for _ in range(3)]
+    report = {
+        'meta': report_metadata(seed=args.seed, per_kind=args.per_kind, pages=len(pages), shifts=args.shifts,
+                                max_hash_distance=DEDUP_CONFIG['max_hash_distance']),
+        'fingerprint': latency_stats(seconds),
+        'compare': latency_stats(compare_seconds),
+        'blank': {'blank_pages_detected': sum(fingerprint(blank)['blank'] for blank in blanks),
+                  'blank_pages': len(blanks),
+                  'content_pages_called_blank': sum(page['blank'] for page in fingerprints)},
+        'distinct_pairs': len(distinct),
+        'field_variant_pairs': len(variants),
+        # What the default exact matching (identical pixels) reuses among them
+        'field_variant_exact_matches': exact_matches,
+        'copies': len(copies),
+        'closest_distinct': round(min((difference for _, difference in distinct), default=1.0), 4),
+        'field_variant_differences': {change: round(max(difference for name, _, difference in variants
+                                                        if name == change), 5)
+                                      for change in sorted({name for name, _, _ in variants})},
+        'furthest_copy': round(max((difference for _, difference in copies), default=0.0), 4),
+        'thresholds': {}
+    }
+    for threshold in args.thresholds:
+        report['thresholds'][str(threshold)] = {
+            'false_matches': sum(1 for close, difference in distinct if close and difference <= threshold),
+            # Matching these would hand one person's page the other's name, number or date
+            'field_variant_matches': sum(1 for _, close, difference in variants
+                                         if close and difference <= threshold),
+            'missed_copies': sum(1 for close, difference in copies if not (close and difference <= threshold))
+        }
+
+    print(write_report(report, args.output))
+    print(f"{'max_difference':>14}  {'false matches':>13}  {'field variants':>14}  {'missed copies':>13}",
+          file=sys.stderr)
+    for threshold, result in report['thresholds'].items():
+        print(f"{threshold:>14}  {result['false_matches']:>6}/{len(distinct):<6}  "
+              f"{result['field_variant_matches']:>7}/{len(variants):<6}  "
+              f"{result['missed_copies']:>6}/{len(copies):<6}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
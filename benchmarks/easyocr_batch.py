@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Batched EasyOCR inference vs the per-image readtext loop
+
+Normalizes and preprocesses the synthetic pages once, then runs the shared
+reader's readtext on one page at a time (the previous extract_text_easyocr
+path) and readtext_many at several batch sizes, reporting pages per second
+and how closely the batched text matches the per-image text.
+
+Usage: python -m benchmarks.easyocr_batch [--per-kind 2] [--batch-sizes 1 4 8] [--output batch.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Any
+
+import numpy as np
+
+from config import EASYOCR_CONFIG
+from ocr_engine import OCREngine
+from preprocessing import get_pipeline
+from resolution import normalize_resolution
+from benchmarks import synthetic
+from benchmarks.common import char_accuracy, peak_rss_mb, report_metadata
+
+
+def texts(results: List[List[tuple]]) -> List[str]:
+    """Joined text of each image's detections"""
+    return [' '.join(result[1] for result in detections) for detections in results]
+
+
+def throughput(seconds: float, pages: int) -> Dict[str, Any]:
+    """Wall time and pages per second for one run"""
+    return {'seconds': round(seconds, 3), 'pages_per_second': round(pages / seconds, 3) if seconds else None}
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark batched EasyOCR inference')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--per-kind', type=int, default=2, help='Documents generated per kind')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8],
+                        help='Detection batch sizes to try')
+    parser.add_argument('--recognition-batch-size', type=int, default=EASYOCR_CONFIG['recognition_batch_size'])
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    images = []
+    for document in synthetic.generate(args.seed, args.per_kind):
+        pages = document['pages'] if document['kind'] == 'pdf' else [document]
+        images.extend(np.asarray(page['image']) for page in pages)
+    # Only inference is timed: pages are prepared and the model loaded beforehand
+    pipeline = get_pipeline('easyocr')
+    images = [pipeline.run(normalize_resolution(image)[0]) for image in images]
+    reader = OCREngine().reader
+
+    start = time.perf_counter()
+    baseline = texts([reader.readtext(image) for image in images])
+    report = {
+        'meta': report_metadata(seed=args.seed, per_kind=args.per_kind, pages=len(images),
+                                recognition_batch_size=args.recognition_batch_size),
+        'per_image': dict(throughput(time.perf_counter() - start, len(images)), peak_rss_mb=peak_rss_mb()),
+        'batched': {}
+    }
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        batched = texts(reader.readtext_many(images, batch_size, args.recognition_batch_size))
+        result = throughput(time.perf_counter() - start, len(images))
+        result['peak_rss_mb'] = peak_rss_mb()
+        # Padding and shared recognizer batches can shift a character here and there
+        result['agreement'] = round(float(np.mean([char_accuracy(text, reference)
+                                                   for text, reference in zip(batched, baseline)])), 4)
+        report['batched'][str(batch_size)] = result
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+    print(f"{'per-image':<12} {report['per_image']['pages_per_second']:>8} pages/s", file=sys.stderr)
+    for batch_size, result in report['batched'].items():
+        print(f"{'batch ' + batch_size:<12} {result['pages_per_second']:>8} pages/s  "
+              f"agreement {result['agreement']:.3f}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Latency and accuracy with and without resolution normalization
+
+Renders large, phone-photo sized text images with known text (or reads
+<name>.png + <name>.txt pairs from --samples) and OCRs each one with
+normalization off and on.
+
+Usage: python -m benchmarks.resolution [--engine tesseract] [--samples dir] [--output resize.json]
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from ocr_engine import OCREngine
+from benchmarks.common import char_accuracy
+from benchmarks.synthetic import font
+
+SAMPLE_TEXT = [
+    "Government of India",
+    "Name: Priya Sharma",
+    "DOB: 14/08/1991  Female",
+    "4821 9930 1276",
+]
+
+# (width, height, font size) of synthetic samples, from scanner-sized to large phone photos
+SYNTHETIC_SIZES = [(1240, 1754, 28), (3000, 2250, 70), (4000, 3000, 96), (6000, 4500, 140)]
+
+
+def synthetic_samples() -> List[Tuple[str, np.ndarray, str]]:
+    """Render text at several resolutions with known ground truth"""
+    samples = []
+    for width, height, font_size in SYNTHETIC_SIZES:
+        image = Image.new('RGB', (width, height), (236, 232, 224))
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate(SAMPLE_TEXT):
+            draw.text((width // 10, height // 6 + row * font_size * 2), line, fill=(20, 20, 20),
+                      font=font(font_size))
+        samples.append((f"synthetic-{width}x{height}", np.array(image), '\n'.join(SAMPLE_TEXT)))
+    return samples
+
+
+def folder_samples(folder: str) -> List[Tuple[str, np.ndarray, str]]:
+    """Load image files that have a ground-truth .txt file next to them"""
+    samples = []
+    for path in sorted(glob.glob(os.path.join(folder, '*'))):
+        truth_path = os.path.splitext(path)[0] + '.txt'
+        if path.endswith('.txt') or not os.path.exists(truth_path):
+            continue
+        with open(truth_path, encoding='utf-8') as f:
+            truth = f.read()
+        samples.append((os.path.basename(path), np.array(Image.open(path).convert('RGB')), truth))
+    return samples
+
+
+def run_samples(engine: OCREngine, method: str, samples) -> List[Dict[str, Any]]:
+    """OCR every sample once and record latency and accuracy"""
+    rows = []
+    for name, image, truth in samples:
+        start = time.perf_counter()
+        text, _ = engine.extract_text(image, method)
+        elapsed = time.perf_counter() - start
+        rows.append({'sample': name, 'shape': list(image.shape), 'ms': round(elapsed * 1000, 1),
+                     'accuracy': round(char_accuracy(text, truth), 4)})
+    return rows
+
+
+def summarize(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Mean accuracy and latency percentiles for one configuration"""
+    latencies = [row['ms'] for row in rows]
+    return {
+        'mean_ms': round(statistics.mean(latencies), 1),
+        'median_ms': round(statistics.median(latencies), 1),
+        'mean_accuracy': round(statistics.mean(row['accuracy'] for row in rows), 4),
+        'samples': rows
+    }
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark resolution normalization')
+    parser.add_argument('--engine', choices=['tesseract', 'easyocr'], default='tesseract')
+    parser.add_argument('--samples', help='Folder of images with matching .txt ground truth')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    samples = folder_samples(args.samples) if args.samples else synthetic_samples()
+    report = {'engine': args.engine}
+    for label, normalize in (('original', False), ('normalized', True)):
+        engine = OCREngine(normalize_resolution=normalize)
+        if args.engine == 'easyocr':
+            engine.reader
+        report[label] = summarize(run_samples(engine, args.engine, samples))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+    for label in ('original', 'normalized'):
+        print(f"{label:<11} {report[label]['mean_ms']:>9.1f} ms mean  "
+              f"accuracy {report[label]['mean_accuracy']:.3f}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the AI OCR Engine
+Measures the cold import time of each module and the time until the
+Streamlit app finishes its first render, each in a fresh interpreter.
+
+Usage: python -m benchmarks.startup [--repeat 5] [--output startup.json] [--baseline old.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Any, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Project modules must stay cheap to import; third-party ones are listed for reference
+PROJECT_MODULES = ['config', 'utils', 'backends', 'model_registry', 'ocr_engine', 'batch', 'ocr']
+THIRD_PARTY_MODULES = ['streamlit', 'PIL', 'numpy', 'cv2', 'pytesseract', 'pandas', 'pdf2image', 'torch', 'easyocr']
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in ('torch', 'easyocr', 'cv2', 'pandas', 'pdf2image', 'pytesseract') if name in sys.modules]
+print(elapsed)
+print(','.join(heavy))
+"""
+
+FIRST_RENDER_SNIPPET = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file('app.py', default_timeout=120)
+app.run()
+print(time.perf_counter() - start)
+"""
+
+
+def _run_snippet(snippet: str) -> Optional[List[str]]:
+    """Run a snippet in a fresh interpreter from the repo root, returning its output lines"""
+    result = subprocess.run([sys.executable, '-c', snippet], cwd=REPO_ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip().split('\n')
+
+
+def time_import(module: str, repeat: int) -> Dict[str, Any]:
+    """Median cold import time of a module plus the heavy libraries it pulls in"""
+    samples = []
+    heavy = []
+    for _ in range(repeat):
+        lines = _run_snippet(IMPORT_SNIPPET.format(module=module))
+        if lines is None:
+            return {'available': False}
+        samples.append(float(lines[0]))
+        heavy = [name for name in lines[1].split(',') if name] if len(lines) > 1 else []
+    return {
+        'available': True,
+        'median_ms': round(statistics.median(samples) * 1000, 2),
+        'min_ms': round(min(samples) * 1000, 2),
+        'heavy_imports': heavy
+    }
+
+
+def time_first_render(repeat: int) -> Optional[float]:
+    """Median time for the Streamlit script to complete its first run, in ms"""
+    samples = []
+    for _ in range(repeat):
+        lines = _run_snippet(FIRST_RENDER_SNIPPET)
+        if lines is None:
+            return None
+        samples.append(float(lines[-1]))
+    return round(statistics.median(samples) * 1000, 2)
+
+
+def run_benchmark(repeat: int = 5) -> Dict[str, Any]:
+    """Collect import and first-render timings"""
+    return {
+        'python': sys.version.split()[0],
+        'first_render_ms': time_first_render(repeat),
+        'project_modules': {module: time_import(module, repeat) for module in PROJECT_MODULES},
+        'third_party_modules': {module: time_import(module, repeat) for module in THIRD_PARTY_MODULES}
+    }
+
+
+def find_regressions(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Compare against a previous report and describe anything slower than tolerance allows"""
+    problems = []
+
+    old, new = baseline.get('first_render_ms'), report.get('first_render_ms')
+    if old and new and new > old * tolerance:
+        problems.append(f"first render {old:.0f}ms -> {new:.0f}ms")
+
+    for module, stats in report['project_modules'].items():
+        if stats.get('heavy_imports'):
+            problems.append(f"{module} imports {', '.join(stats['heavy_imports'])} at module load")
+        old_stats = baseline.get('project_modules', {}).get(module, {})
+        old, new = old_stats.get('median_ms'), stats.get('median_ms')
+        if old and new and new > old * tolerance:
+            problems.append(f"import {module} {old:.1f}ms -> {new:.1f}ms")
+
+    return problems
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Measure OCR engine startup cost')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    parser.add_argument('--baseline', help='Previous JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help='Allowed slowdown factor versus the baseline')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.repeat)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    problems = find_regressions(report, baseline, args.tolerance)
+    for problem in problems:
+        print(f"❌ {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
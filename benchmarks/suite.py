@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+End-to-end OCR benchmark suite
+Times every stage of OCREngine (preprocessing, Tesseract, EasyOCR, parsers)
+and the utils.py helpers on the synthetic document set, recording
+throughput, p50/p95 latency, peak RSS and accuracy against ground truth.
+Stages whose engine is not installed are reported as skipped.
+
+Usage: python -m benchmarks.suite [--repeat 3] [--output bench.json] [--compare previous.json]
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import time
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+import numpy as np
+
+import utils
+from backends import is_available, load_backend
+from config import DOCUMENT_TYPES, METRICS_CONFIG
+from ocr_engine import OCREngine
+from ocr_result import OCRResult
+from preprocessing import get_pipeline
+from benchmarks import synthetic
+from benchmarks.common import char_accuracy, latency_stats, peak_rss_mb, report_metadata, write_report
+
+PARSERS = {'resume': 'parse_resume', 'aadhar': 'parse_aadhar', 'notes': 'parse_handwritten_notes'}
+
+
+def time_calls(items: Iterable[Any], call: Callable[[Any], Any], repeat: int):
+    """Call once per item per repeat, returning per-call seconds and the last outputs"""
+    seconds = []
+    outputs = []
+    for _ in range(repeat):
+        outputs = []
+        for item in items:
+            start = time.perf_counter()
+            outputs.append(call(item))
+            seconds.append(time.perf_counter() - start)
+    return seconds, outputs
+
+
+def stage_result(seconds: List[float], accuracy: Optional[float] = None, **extra) -> Dict[str, Any]:
+    """Latency statistics plus peak RSS and optional accuracy for one stage"""
+    result = latency_stats(seconds)
+    result['peak_rss_mb'] = peak_rss_mb()
+    if accuracy is not None:
+        result['accuracy'] = round(accuracy, 4)
+    result.update(extra)
+    return result
+
+
+def field_accuracy(parsed: Dict[str, Any], expected: Dict[str, Any]) -> float:
+    """Fraction of expected fields the parser got exactly right"""
+    hits = 0
+    for name, value in expected.items():
+        found = parsed.get(name)
+        if isinstance(value, list):
+            hits += sorted(found or []) == sorted(value)
+        else:
+            hits += found == value
+    return hits / len(expected) if expected else 1.0
+
+
+def _tesseract_installed() -> bool:
+    """Tesseract needs both pytesseract and the tesseract binary"""
+    if not is_available('tesseract'):
+        return False
+    return shutil.which(load_backend('tesseract').pytesseract.tesseract_cmd) is not None
+
+
+def _page_documents(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Single-page documents, with PDF pages flattened in"""
+    pages = []
+    for document in documents:
+        pages.extend(document['pages'] if document['kind'] == 'pdf' else [document])
+    return pages
+
+
+def run_suite(seed: int = 7, per_kind: int = 3, repeat: int = 3) -> Dict[str, Any]:
+    """Run every available stage over the synthetic documents"""
+    documents = synthetic.generate(seed, per_kind)
+    pages = _page_documents(documents)
+    images = [np.asarray(page['image']) for page in pages]
+    engine = OCREngine()
+    stages: Dict[str, Any] = {}
+
+    seconds, _ = time_calls(images, engine.preprocess_image, repeat)
+    stages['preprocess'] = stage_result(seconds, per_stage=get_pipeline('tesseract').summary())
+
+    if _tesseract_installed():
+        seconds, texts = time_calls(images, engine.extract_text_tesseract, repeat)
+        accuracy = np.mean([char_accuracy(text, page['text']) for text, page in zip(texts, pages)])
+        stages['extract_text_tesseract'] = stage_result(seconds, accuracy)
+    else:
+        stages['extract_text_tesseract'] = {'skipped': 'tesseract not installed'}
+
+    if is_available('easyocr'):
+        # Load the model outside the timed calls
+        engine.reader
+        seconds, results = time_calls(images, engine.extract_text_easyocr, repeat)
+        texts = [' '.join(result[1] for result in detections) for detections in results]
+        accuracy = np.mean([char_accuracy(text, page['text']) for text, page in zip(texts, pages)])
+        stages['extract_text_easyocr'] = stage_result(seconds, accuracy)
+    else:
+        stages['extract_text_easyocr'] = {'skipped': 'easyocr not installed'}
+
+    # Parsers run on ground-truth text so their cost and accuracy are measured on their own
+    for kind, method in PARSERS.items():
+        samples = [page for page in pages if page['kind'] == kind]
+        parse = getattr(engine, method)
+        seconds, parsed = time_calls([page['text'] for page in samples], parse, repeat * 20)
+        accuracy = np.mean([field_accuracy(result, page['fields']) for result, page in zip(parsed, samples)])
+        stages[method] = stage_result(seconds, accuracy)
+
+    texts = [page['text'] for page in pages]
+    keywords = DOCUMENT_TYPES['resume']['skills_keywords']
+    helpers = {
+        'utils.clean_text': utils.clean_text,
+        'utils.extract_email_addresses': utils.extract_email_addresses,
+        'utils.extract_phone_numbers': utils.extract_phone_numbers,
+        'utils.extract_dates': utils.extract_dates,
+        'utils.extract_skills_from_text': lambda text: utils.extract_skills_from_text(text, keywords),
+    }
+    for name, helper in helpers.items():
+        seconds, _ = time_calls(texts, helper, repeat * 20)
+        stages[name] = stage_result(seconds)
+
+    detections = [
+        [([[0, 0], [10, 0], [10, 10], [0, 10]], word, (i % 10) / 10) for i, word in enumerate(text.split())]
+        for text in texts
+    ]
+    seconds, _ = time_calls(detections, utils.format_extraction_results, repeat * 20)
+    stages['utils.format_extraction_results'] = stage_result(seconds)
+    # Columnar results: built once per page, then filtered and tabulated without per-word objects
+    results = [OCRResult.from_detections(page) for page in detections]
+    seconds, _ = time_calls(detections, OCRResult.from_detections, repeat * 20)
+    stages['ocr_result.from_detections'] = stage_result(seconds)
+    if is_available('pandas'):
+        seconds, _ = time_calls(results, lambda result: result.filter(0.5).to_frame(), repeat * 20)
+        stages['ocr_result.confidence_table'] = stage_result(seconds)
+
+    if is_available('pdf') and shutil.which('pdftoppm'):
+        from pdf_pages import iter_pdf_pages
+        pdfs = [document['pdf'] for document in documents if document['kind'] == 'pdf']
+        seconds, page_counts = time_calls(pdfs, lambda pdf: sum(1 for _ in iter_pdf_pages(pdf)), repeat)
+        stages['pdf_rasterize'] = stage_result(seconds, pages_per_document=page_counts[0])
+    else:
+        stages['pdf_rasterize'] = {'skipped': 'poppler not installed'}
+
+    return {
+        'meta': report_metadata(seed=seed, per_kind=per_kind, repeat=repeat, pages=len(pages)),
+        'stages': stages
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+            min_ms: float = 0.05) -> List[str]:
+    """Describe stages whose p50 latency or accuracy got worse than the baseline
+
+    Slowdowns smaller than min_ms are timer noise on sub-millisecond stages
+    and are not counted.
+    """
+    problems = []
+    for name, stage in report['stages'].items():
+        old = baseline.get('stages', {}).get(name, {})
+        if 'p50_ms' in stage and old.get('p50_ms'):
+            ratio = stage['p50_ms'] / old['p50_ms']
+            print(f"{name:<36} p50 {old['p50_ms']:>10.3f} -> {stage['p50_ms']:>10.3f} ms  x{ratio:.2f}",
+                  file=sys.stderr)
+            if ratio > tolerance and stage['p50_ms'] - old['p50_ms'] > min_ms:
+                problems.append(f"{name} p50 slowed x{ratio:.2f}")
+        if 'accuracy' in stage and 'accuracy' in old and stage['accuracy'] < old['accuracy'] - 0.01:
+            problems.append(f"{name} accuracy {old['accuracy']:.3f} -> {stage['accuracy']:.3f}")
+    return problems
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Run the OCR benchmark suite')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--per-kind', type=int, default=3, help='Documents generated per kind')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    parser.add_argument('--compare', help='Previous JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=1.25,
+                        help='Allowed p50 slowdown factor versus the baseline')
+    parser.add_argument('--min-ms', type=float, default=0.05,
+                        help='Ignore p50 slowdowns smaller than this many milliseconds')
+    args = parser.parse_args()
+
+    # Spans are still recorded in memory, but thousands of timed calls should not fill the span log
+    METRICS_CONFIG['log_path'] = None
+    report = run_suite(args.seed, args.per_kind, args.repeat)
+    print(write_report(report, args.output))
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            problems = compare(report, json.load(f), args.tolerance, args.min_ms)
+        for problem in problems:
+            print(f"❌ {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Synthetic documents with known ground truth
+Renders resumes, Aadhar-style cards, noisy "handwritten" notes and
+multi-page PDFs locally with PIL. The same seed always produces the same
+documents, so benchmark runs are comparable across commits.
+
+Usage: python -m benchmarks.synthetic --output samples/ [--seed 7]
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+from typing import Dict, List, Any
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+from config import DOCUMENT_TYPES
+
+FIRST_NAMES = ['Priya', 'Rahul', 'Anita', 'Vikram', 'Sneha', 'Arjun', 'Meera', 'Karan']
+LAST_NAMES = ['Sharma', 'Verma', 'Iyer', 'Reddy', 'Nair', 'Gupta', 'Das', 'Khan']
+NOTE_WORDS = ['review', 'budget', 'meeting', 'deadline', 'client', 'draft', 'design', 'follow',
+              'update', 'schedule', 'report', 'invoice', 'call', 'team', 'plan', 'notes']
+
+_font_cache: Dict[int, ImageFont.ImageFont] = {}
+
+
+def font(size: int) -> ImageFont.ImageFont:
+    """A scalable font when one is available, otherwise Pillow's built-in bitmap font"""
+    if size not in _font_cache:
+        for name in ('DejaVuSans.ttf', 'Arial.ttf', 'LiberationSans-Regular.ttf'):
+            try:
+                _font_cache[size] = ImageFont.truetype(name, size)
+                break
+            except OSError:
+                continue
+        else:
+            try:
+                _font_cache[size] = ImageFont.load_default(size=size)
+            except TypeError:
+                # Pillow < 10.1 has no sized default font
+                _font_cache[size] = ImageFont.load_default()
+    return _font_cache[size]
+
+
+def _person(rng: random.Random) -> Dict[str, str]:
+    """Random identity details"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {
+        'name': f"{first} {last}",
+        'email': f"{first.lower()}.{last.lower()}{rng.randint(1, 99)}@example.com",
+        'phone': f"{rng.randint(200, 999)}-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        'dob': f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1960, 2005)}",
+        'gender': rng.choice(['Male', 'Female']),
+        'aadhar_number': ' '.join(str(rng.randint(1000, 9999)) for _ in range(3))
+    }
+
+
+def _draw_lines(draw: ImageDraw.ImageDraw, lines: List[str], x: int, y: int, size: int, spacing: float = 1.6):
+    """Draw lines of text top to bottom"""
+    for line in lines:
+        draw.text((x, y), line, fill=(20, 20, 20), font=font(size))
+        y += int(size * spacing)
+
+
+def resume(rng: random.Random, width: int = 1240, height: int = 1754,
+           person: Dict[str, str] = None) -> Dict[str, Any]:
+    """A4 resume page at 150 dpi, for `person` if given"""
+    person = person or _person(rng)
+    skills = rng.sample(DOCUMENT_TYPES['resume']['skills_keywords'], 6)
+    lines = [
+        person['name'],
+        f"{person['email']} | {person['phone']}",
+        '',
+        'Skills: ' + ', '.join(skills),
+        '',
+        'Experience',
+        f"Software Engineer at Example Corp ({rng.randint(2, 9)} years)",
+        'Built data pipelines and internal tools',
+        '',
+        'Education',
+        'B.Tech Computer Science'
+    ]
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    draw.text((100, 100), lines[0], fill=(0, 0, 0), font=font(56))
+    _draw_lines(draw, lines[1:], 100, 200, 30)
+    return {
+        'kind': 'resume',
+        'image': image,
+        'text': '\n'.join(line for line in lines if line),
+        'fields': {'name': person['name'], 'email': person['email'], 'phone': person['phone'],
+                   'skills': sorted(skills)}
+    }
+
+
+def aadhar_card(rng: random.Random, width: int = 1011, height: int = 638,
+                person: Dict[str, str] = None) -> Dict[str, Any]:
+    """Aadhar-style ID card at 300 dpi (85.6 x 54 mm), for `person` if given"""
+    person = person or _person(rng)
+    image = Image.new('RGB', (width, height), (250, 246, 235))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, width, 90], fill=(255, 153, 51))
+    draw.text((300, 25), 'Government of India', fill=(0, 0, 0), font=font(40))
+    draw.rectangle([40, 130, 260, 400], outline=(120, 120, 120), width=3)
+
+    lines = [person['name'], f"DOB: {person['dob']}", person['gender']]
+    _draw_lines(draw, lines, 300, 150, 34)
+    draw.text((260, 500), person['aadhar_number'], fill=(0, 0, 0), font=font(60))
+    return {
+        'kind': 'aadhar',
+        'image': image,
+        'text': '\n'.join(['Government of India'] + lines + [person['aadhar_number']]),
+        'fields': {'name': person['name'], 'aadhar_number': person['aadhar_number'].replace(' ', ''),
+                   'dob': person['dob'], 'gender': person['gender']}
+    }
+
+
+def handwritten_note(rng: random.Random, width: int = 1200, height: int = 900) -> Dict[str, Any]:
+    """Ruled paper with jittered, rotated, blurred and noisy text"""
+    lines = []
+    for i in range(rng.randint(5, 8)):
+        words = ' '.join(rng.sample(NOTE_WORDS, rng.randint(2, 5)))
+        prefix = rng.choice(['- ', f"{i + 1}. ", ''])
+        lines.append(prefix + words)
+
+    image = Image.new('RGB', (width, height), (252, 250, 240))
+    draw = ImageDraw.Draw(image)
+    for y in range(120, height, 70):
+        draw.line([(0, y), (width, y)], fill=(180, 200, 230), width=2)
+    for row, line in enumerate(lines):
+        x = 80 + rng.randint(-10, 10)
+        for word in line.split(' '):
+            y = 70 + row * 70 + rng.randint(-6, 6)
+            draw.text((x, y), word, fill=(30, 40, 110), font=font(38 + rng.randint(-4, 4)))
+            x += int(draw.textlength(word + ' ', font=font(40)))
+
+    image = image.rotate(rng.uniform(-2.5, 2.5), resample=Image.BICUBIC, fillcolor=(252, 250, 240))
+    image = image.filter(ImageFilter.GaussianBlur(rng.uniform(0.6, 1.2)))
+    pixels = np.asarray(image).astype(np.int16)
+    noise = np.random.default_rng(rng.randint(0, 2 ** 31)).normal(0, 10, pixels.shape)
+    image = Image.fromarray(np.clip(pixels + noise, 0, 255).astype(np.uint8))
+    return {
+        'kind': 'notes',
+        'image': image,
+        'text': '\n'.join(lines),
+        'fields': {'key_points': [line for line in lines if line.startswith('-') or line[0].isdigit()]}
+    }
+
+
+def multipage_pdf(rng: random.Random, pages: int = 4) -> Dict[str, Any]:
+    """PDF of several resume pages, with per-page ground truth"""
+    documents = [resume(rng) for _ in range(pages)]
+    buffer = io.BytesIO()
+    images = [document['image'] for document in documents]
+    images[0].save(buffer, format='PDF', save_all=True, append_images=images[1:], resolution=150)
+    return {
+        'kind': 'pdf',
+        'pdf': buffer.getvalue(),
+        'pages': documents,
+        'text': '\n\f'.join(document['text'] for document in documents)
+    }
+
+
+def generate(seed: int = 7, per_kind: int = 3, pdf_pages: int = 4) -> List[Dict[str, Any]]:
+    """Deterministic set of documents of every kind"""
+    rng = random.Random(seed)
+    documents = []
+    for index in range(per_kind):
+        for maker in (resume, aadhar_card, handwritten_note):
+            document = maker(rng)
+            document['name'] = f"{document['kind']}-{index:02d}"
+            documents.append(document)
+    pdf = multipage_pdf(rng, pdf_pages)
+    pdf['name'] = 'pdf-00'
+    documents.append(pdf)
+    return documents
+
+
+def save(documents: List[Dict[str, Any]], folder: str):
+    """Write each document as PNG/PDF with a .txt ground truth and .json expected fields"""
+    os.makedirs(folder, exist_ok=True)
+    for document in documents:
+        base = os.path.join(folder, document['name'])
+        if document['kind'] == 'pdf':
+            with open(base + '.pdf', 'wb') as f:
+                f.write(document['pdf'])
+        else:
+            document['image'].save(base + '.png')
+            with open(base + '.json', 'w', encoding='utf-8') as f:
+                json.dump(document['fields'], f, indent=2)
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write(document['text'])
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Generate synthetic OCR documents with ground truth')
+    parser.add_argument('--output', required=True, help='Folder to write documents into')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--per-kind', type=int, default=3)
+    args = parser.parse_args()
+
+    documents = generate(args.seed, args.per_kind)
+    save(documents, args.output)
+    print(f"✅ Wrote {len(documents)} documents to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
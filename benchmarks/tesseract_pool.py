@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pooled Tesseract backend against one pytesseract call per image
+
+Usage: python -m benchmarks.tesseract_pool [--images 64] [--workers 4] [--output tesseract.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Any, Callable
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from backends import is_available, load_backend
+from ocr_engine import OCREngine
+from tesseract_pool import TesseractPool
+
+SAMPLE_LINES = [
+    "John Doe - Senior Python Developer",
+    "Email: john.doe@example.com  Phone: 555-123-4567",
+    "Skills: Python, Docker, Kubernetes, SQL, AWS",
+    "Experience: 6 years building data pipelines",
+]
+
+
+def render_text_image(index: int, width: int = 1000, height: int = 220) -> Image.Image:
+    """Render a few lines of text onto a white image"""
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    for row, line in enumerate(SAMPLE_LINES):
+        draw.text((20, 20 + row * 45), f"{line} #{index}", fill='black')
+    return image
+
+
+def _time(label: str, count: int, run: Callable[[], List[str]]) -> Dict[str, Any]:
+    """Time one strategy over the whole image set"""
+    start = time.perf_counter()
+    texts = run()
+    elapsed = time.perf_counter() - start
+    return {
+        'strategy': label,
+        'seconds': round(elapsed, 3),
+        'images_per_sec': round(count / elapsed, 2),
+        'ms_per_image': round(elapsed / count * 1000, 2),
+        'characters': sum(len(text.strip()) for text in texts)
+    }
+
+
+def run_benchmark(image_count: int, workers: int, batch_size: int) -> Dict[str, Any]:
+    """Compare pytesseract against the pool in each available mode"""
+    engine = OCREngine()
+    processed: List[np.ndarray] = [engine.preprocess_image(render_text_image(i)) for i in range(image_count)]
+    pytesseract = load_backend('tesseract')
+
+    results = [_time('pytesseract (process per image)', image_count,
+                     lambda: [pytesseract.image_to_string(image, lang='eng') for image in processed])]
+
+    filelist = TesseractPool(workers=1, batch_size=batch_size, mode='filelist')
+    results.append(_time('filelist, 1 worker', image_count, lambda: filelist.recognize_many(processed)))
+    filelist.close()
+
+    if workers > 1:
+        parallel = TesseractPool(workers=workers, batch_size=batch_size, mode='filelist')
+        results.append(_time(f'filelist, {workers} workers', image_count,
+                             lambda: parallel.recognize_many(processed)))
+        parallel.close()
+
+    if is_available('tesserocr'):
+        api_pool = TesseractPool(workers=workers, mode='tesserocr')
+        results.append(_time(f'tesserocr, {workers} handles', image_count,
+                             lambda: api_pool.recognize_many(processed)))
+        api_pool.close()
+
+    baseline = results[0]['seconds']
+    for result in results:
+        result['speedup'] = round(baseline / result['seconds'], 2)
+
+    return {'images': image_count, 'workers': workers, 'batch_size': batch_size, 'results': results}
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark the pooled Tesseract backend')
+    parser.add_argument('--images', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.images, args.workers, args.batch_size)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+    for result in report['results']:
+        print(f"{result['strategy']:<35} {result['ms_per_image']:>8.1f} ms/image  x{result['speedup']}",
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
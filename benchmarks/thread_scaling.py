@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Batch throughput from 1 to N worker processes, with and without the thread budget
+
+Writes the synthetic documents to a temporary folder and runs the batch
+pipeline over them (OCR result cache off) at each worker count, once with
+every worker limited to its share of the cores (thread_budget.py) and once
+with each library using every core as before. Reports documents and pages
+per second and the speed-up over one worker.
+
+Usage: python -m benchmarks.thread_scaling [--engine tesseract] [--max-workers 8] [--output scaling.json]
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List, Any
+
+from batch import collect_inputs, iter_batch
+from thread_budget import available_cores, plan
+from benchmarks import synthetic
+from benchmarks.common import report_metadata
+
+
+def run(paths: List[str], engine: str, workers: int, thread_budget: bool) -> Dict[str, Any]:
+    """One batch run over every document, timed from pool start to the last result"""
+    start = time.perf_counter()
+    records = list(iter_batch(paths, 'general', engine, workers, use_cache=False, thread_budget=thread_budget))
+    elapsed = time.perf_counter() - start
+    pages = sum(len(record['pages']) for record in records)
+    return {
+        'seconds': round(elapsed, 3),
+        'docs_per_sec': round(len(records) / elapsed, 3),
+        'pages_per_sec': round(pages / elapsed, 3),
+        'failed': sum(1 for record in records if record['error'])
+    }
+
+
+def main():
+    """Main function"""
+    cores = available_cores()
+    parser = argparse.ArgumentParser(description='Benchmark batch scaling across worker processes')
+    parser.add_argument('--engine', choices=['tesseract', 'easyocr', 'cascade'], default='tesseract')
+    parser.add_argument('--max-workers', type=int, default=cores, help='Largest worker count (default: cores)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--per-kind', type=int, default=3, help='Documents generated per kind')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    # 1, 2, 4, ... up to and including max-workers
+    worker_counts = []
+    workers = 1
+    while workers < args.max_workers:
+        worker_counts.append(workers)
+        workers *= 2
+    worker_counts.append(args.max_workers)
+
+    folder = tempfile.mkdtemp(prefix='ocr-scaling-')
+    try:
+        synthetic.save(synthetic.generate(args.seed, args.per_kind), folder)
+        paths = collect_inputs([folder])
+        report = {
+            'meta': report_metadata(engine=args.engine, seed=args.seed, per_kind=args.per_kind,
+                                    documents=len(paths), cores=cores),
+            'budget': {},
+            'unmanaged': {}
+        }
+        for workers in worker_counts:
+            report['budget'][str(workers)] = dict(run(paths, args.engine, workers, True),
+                                                  threads_per_worker=plan(workers, cores)['threads'])
+            report['unmanaged'][str(workers)] = run(paths, args.engine, workers, False)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    for mode in ('budget', 'unmanaged'):
+        single = report[mode][str(worker_counts[0])]['docs_per_sec']
+        for result in report[mode].values():
+            result['speedup'] = round(result['docs_per_sec'] / single, 2) if single else None
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+    print(f"{'workers':>7}  {'budget docs/s':>14}  {'unmanaged docs/s':>16}", file=sys.stderr)
+    for workers in map(str, worker_counts):
+        budget, unmanaged = report['budget'][workers], report['unmanaged'][workers]
+        print(f"{workers:>7}  {budget['docs_per_sec']:>8.3f} x{budget['speedup']:<5}"
+              f"{unmanaged['docs_per_sec']:>10.3f} x{unmanaged['speedup']}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
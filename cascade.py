@@ -0,0 +1,92 @@
+"""
+Confidence-gated Tesseract -> EasyOCR cascade
+Tesseract reads the page first with word confidences. Words below
+CASCADE_CONFIG['confidence_threshold'] are grown into regions and only those
+regions are re-read by EasyOCR; the whole page is escalated when too much of
+it would be re-read anyway. The surviving Tesseract words and the EasyOCR
+results are merged into one OCRResult and line-ordered text.
+"""
+
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+
+from backends import load_backend
+from config import CASCADE_CONFIG
+from ocr_result import OCRResult
+
+Region = Tuple[int, int, int, int]
+
+
+def low_confidence_regions(words: List[Dict[str, Any]], shape: Tuple[int, ...],
+                           config: Dict[str, Any] = None) -> List[Region]:
+    """Boxes (left, top, right, bottom) around the low-confidence words, overlapping ones merged"""
+    cv2 = load_backend('opencv')
+    config = config or CASCADE_CONFIG
+    height, width = shape[:2]
+    mask = np.zeros((height, width), dtype=np.uint8)
+    for word in words:
+        if word['confidence'] >= config['confidence_threshold']:
+            continue
+        left, top, box_width, box_height = word['box']
+        # EasyOCR needs some context around a word to detect it
+        pad = int(box_height * config['padding'])
+        mask[max(0, top - pad):top + box_height + pad, max(0, left - pad):left + box_width + pad] = 1
+
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    return [(int(left), int(top), int(left + box_width), int(top + box_height))
+            for left, top, box_width, box_height, _ in stats[1:count]]
+
+
+def covered_fraction(regions: List[Region], shape: Tuple[int, ...]) -> float:
+    """Fraction of the page's pixels inside the regions"""
+    height, width = shape[:2]
+    if not regions or not height or not width:
+        return 0.0
+    mask = np.zeros((height, width), dtype=bool)
+    for left, top, right, bottom in regions:
+        mask[top:bottom, left:right] = True
+    return float(mask.mean())
+
+
+def word_result(words: List[Dict[str, Any]]) -> OCRResult:
+    """Tesseract words as an OCRResult, confidences scaled to EasyOCR's 0-1"""
+    boxes = np.array([word['box'] for word in words], dtype=np.float32).reshape(-1, 4)
+    left, top = boxes[:, 0], boxes[:, 1]
+    right, bottom = left + boxes[:, 2], top + boxes[:, 3]
+    corners = np.stack([left, top, right, top, right, bottom, left, bottom], axis=1)
+    confidences = np.array([word['confidence'] for word in words], dtype=np.float32) / 100
+    return OCRResult.from_columns(corners, [word['text'] for word in words], confidences)
+
+
+def merge_detections(words: List[Dict[str, Any]], regions: List[Region],
+                     region_results: List[OCRResult]) -> OCRResult:
+    """Tesseract words outside the regions plus each region's EasyOCR detections in page coordinates"""
+    result = word_result(words)
+    centres = result.boxes.mean(axis=1)
+    keep = np.ones(len(result), dtype=bool)
+    for left, top, right, bottom in regions:
+        keep &= ~((centres[:, 0] >= left) & (centres[:, 0] < right)
+                  & (centres[:, 1] >= top) & (centres[:, 1] < bottom))
+    parts = [result.select(keep)]
+    parts += [OCRResult.coerce(results).translated(left, top)
+              for (left, top, _, _), results in zip(regions, region_results)]
+    return OCRResult.concatenate(parts)
+
+
+def detections_to_text(detections: OCRResult) -> str:
+    """Join detections into lines (by vertical overlap) read left to right"""
+    detections = OCRResult.coerce(detections)
+    left, top, _, bottom = (values.tolist() for values in detections.bounds())
+    texts = detections.texts
+    lines: List[Dict[str, Any]] = []
+    for i in sorted(range(len(texts)), key=top.__getitem__):
+        centre = (top[i] + bottom[i]) / 2
+        line = lines[-1] if lines else None
+        if line is not None and line['top'] <= centre <= line['bottom']:
+            line['words'].append((left[i], texts[i]))
+            line['bottom'] = max(line['bottom'], bottom[i])
+        else:
+            lines.append({'top': top[i], 'bottom': bottom[i], 'words': [(left[i], texts[i])]})
+    return '\n'.join(' '.join(text for _, text in sorted(line['words'], key=lambda word: word[0]))
+                     for line in lines)
@@ -3,14 +3,32 @@ import os
 # OCR Configuration
 TESSERACT_CONFIG = {
     'lang': 'eng',
-    'config': '--oem 3 --psm 6'
+    'config': '--oem 3 --psm 6',
+    'pool_workers': None,  # concurrent tesseract processes/API handles (default: CPU count)
+    'batch_size': 16       # images recognized per tesseract process in file-list mode
 }
 
 EASYOCR_CONFIG = {
     'languages': ['en'],
     'gpu': False,  # Set to True if you have CUDA-capable GPU
     'width_ths': 0.7,
-    'height_ths': 0.7
+    'height_ths': 0.7,
+    'batch_size': 8,               # similarly sized images detected together by extract_text_easyocr_many
+    'recognition_batch_size': 32,  # text crops per recognizer forward pass (readtext's default is 1)
+    'max_padding': 1.3,            # largest padded/smallest area ratio allowed within a detection batch
+    'max_batch_pixels': 4_000_000,  # padded pixels per detection batch; CPU memory grows ~1.3 KB per pixel
+    'quantize': True,   # int8 recognizer weights on CPU (EasyOCR's own default; the CRAFT detector stays float)
+    'runtime': 'torch',  # 'torch' or 'onnx' (exported models run by onnxruntime, see cpu_inference.py)
+    'threads': None,     # intra-op threads for torch/onnxruntime; None follows the thread budget
+    'onnx_dir': 'outputs/onnx'  # exported ONNX models, named by a hash of the weights
+}
+
+# Tesseract -> EasyOCR cascade (see cascade.py)
+CASCADE_CONFIG = {
+    'confidence_threshold': 60,  # Tesseract word confidence (0-100) below which EasyOCR re-reads the word
+    'padding': 0.5,              # context kept around a low-confidence word, as a fraction of its height
+    'page_fraction': 0.5,        # re-read the whole page with EasyOCR above this escalated pixel fraction
+    'escalate_empty': True       # re-read pages on which Tesseract found no words at all
 }
 
 # Streamlit Configuration
@@ -24,6 +42,15 @@ STREAMLIT_CONFIG = {
     }
 }
 
+# Results view (app.py): multi-page documents are OCR'd and shown one results page at a time
+UI_CONFIG = {
+    'page_size': 10,         # document pages per results page; later pages are OCR'd when viewed
+    'thumbnail_side': 320,   # px, longest side of the preview kept with each page result
+    'preview_side': 1600,    # px, longest side of the image shown when a page is expanded
+    'preview_dpi': 100,      # PDF pages are re-rendered at this dpi when expanded
+    'snippet_chars': 200     # characters of text shown for a collapsed page
+}
+
 # Document Processing Configuration
 DOCUMENT_TYPES = {
     'resume': {
@@ -48,11 +75,153 @@ DOCUMENT_TYPES = {
     }
 }
 
+# Aadhar card template for region-of-interest OCR (see aadhar_roi.py). Regions are
+# (left, top, right, bottom) fractions of the card after it has been located and straightened.
+AADHAR_TEMPLATE = {
+    'enabled': True,
+    'size': (1011, 638),        # canonical card size in px (85.6 x 54 mm at 300 dpi)
+    'aspect_tolerance': 0.15,   # allowed deviation from the card's width/height ratio in a photo
+    'scan_tolerance': 0.05,     # ... for treating the whole image as an already-cropped card
+    'min_area': 0.05,           # a card found in a photo must cover this fraction of it
+    'probe_side': 800,          # longest side of the image searched for the card outline
+    'regions': {
+        'name': (0.27, 0.21, 0.98, 0.315),
+        'dob': (0.27, 0.315, 0.98, 0.395),
+        'gender': (0.27, 0.395, 0.98, 0.48),
+        'number': (0.15, 0.72, 0.85, 0.93)
+    },
+    # Read with a digit-restricted recognizer. Not the DOB: its crop includes the printed "DOB:" label,
+    # which a digit allowlist garbles, so it is read as text and the date picked out with dob_patterns
+    'digit_regions': ['number'],
+    'digit_allowlist': '0123456789/-'
+}
+
+# Preprocessing pipelines per engine, as (stage, params) pairs run in order.
+# Stages: grayscale, denoise, clahe, threshold, morphology (see preprocessing.py)
+PREPROCESS_CONFIG = {
+    'tesseract': [
+        ('grayscale', {}),
+        ('denoise', {'ksize': 5}),
+        ('threshold', {'block_size': 11, 'c': 2})
+    ],
+    'easyocr': [],  # EasyOCR does its own normalization; add stages here to experiment
+    'advanced': [
+        ('grayscale', {'order': 'bgr'}),
+        ('denoise', {'ksize': 3}),
+        ('clahe', {'clip_limit': 2.0, 'tile_grid_size': 8}),
+        ('threshold', {'block_size': 11, 'c': 2})
+    ]
+}
+
+# Resolution normalization before OCR
+RESIZE_CONFIG = {
+    'enabled': True,
+    'target_text_height': 32,   # px; recognizers gain little accuracy past this
+    'max_side': 2560,           # longest side handed to the detector
+    'min_scale': 0.2,
+    'max_scale': 1.5,
+    'tolerance': 0.15,          # skip resampling when the scale is within this of 1.0
+    'probe_side': 1024,         # longest side of the image used to estimate text height
+    'min_components': 10,       # text-like blobs needed to trust the estimate
+    'draft_jpeg': True          # decode JPEGs larger than max_side at 1/2, 1/4 or 1/8 size (see decoding.py)
+}
+
+# PDF rasterization (pages are streamed a window at a time)
+PDF_CONFIG = {
+    'dpi': 200,
+    'grayscale': True,
+    'window': 1,    # pages rendered per poppler call
+    'prefetch': 1,  # windows rendered ahead of the page being OCR'd
+    'text_layer': True,          # use a page's embedded text (poppler's pdftotext) instead of OCR when it has one
+    'text_layer_min_chars': 40,  # letters and digits a page's text needs to count as a text layer
+    'text_layer_timeout': 60     # seconds for pdftotext to read a document
+}
+
+# Concurrent per-page OCR for multi-page documents
+PARALLEL_CONFIG = {
+    'tesseract_workers': os.cpu_count() or 1,  # threads; each page is its own tesseract process
+    'easyocr_workers': 2,                      # processes; each holds a copy of the model
+    'cascade_workers': 2,                      # processes; Tesseract first, EasyOCR model for escalations
+    'queue_depth': 2                           # pages in flight per worker
+}
+
+# CPU thread budget for worker processes (see thread_budget.py): each of N workers gets
+# cores // N threads for torch, OpenCV and Tesseract's OpenMP instead of one per core
+THREAD_CONFIG = {
+    'enabled': True,
+    'cores': None,          # cores to share out (default: the CPUs this process may run on)
+    'interop_threads': 1    # torch inter-op threads per worker; OCR models have no parallel branches worth it
+}
+
+# HTTP OCR service (see service.py)
+SERVICE_CONFIG = {
+    'host': '127.0.0.1',
+    'port': 8502,
+    'engines': {
+        # workers: requests an engine processes at once; queue_size: requests waiting before 429
+        'tesseract': {'workers': os.cpu_count() or 1, 'queue_size': 32},
+        'easyocr': {'workers': 2, 'queue_size': 8},
+        'cascade': {'workers': 2, 'queue_size': 16}
+    },
+    'max_body_bytes': 25 * 1024 * 1024,
+    'max_pdf_pages': 200,    # longer PDFs are turned away with 413 instead of tying up a lane
+    'header_timeout': 10,    # seconds to receive the request line and headers
+    'request_timeout': 120   # seconds a request may wait in the queue and run
+}
+
+# Durable job queue for large batches (see job_queue.py)
+JOBS_CONFIG = {
+    'lease_seconds': 300,   # a claimed job returns to the queue if its worker goes quiet this long
+    'max_attempts': 3,
+    'backoff_base': 10,     # seconds before the first retry, doubled after each failure
+    'backoff_max': 900,
+    'poll_seconds': 2.0     # idle worker sleep between claims
+}
+
 # File paths (if needed)
 UPLOAD_FOLDER = 'uploads'
 OUTPUT_FOLDER = 'outputs'
 TEMP_FOLDER = 'temp'
 
-# Create directories if they don't exist
-for folder in [UPLOAD_FOLDER, OUTPUT_FOLDER, TEMP_FOLDER]:
-    os.makedirs(folder, exist_ok=True)
\ No newline at end of file
+# OCR result cache (memory LRU in front of SQLite under OUTPUT_FOLDER)
+CACHE_CONFIG = {
+    'enabled': True,
+    'path': os.path.join(OUTPUT_FOLDER, 'ocr_cache.sqlite3'),
+    'memory_bytes': 64 * 1024 * 1024,
+    'disk_bytes': 1024 * 1024 * 1024
+}
+
+# Skipping blank and repeated pages of a document before OCR (see page_dedup.py)
+DEDUP_CONFIG = {
+    'enabled': True,
+    'skip_blank': True,           # return no text for blank pages instead of OCR'ing them
+    'exact': True,                # reuse the result of a page with identical pixels earlier in the document
+    # Also reuse near-identical pages (re-scans). Off by default: the ink comparison cannot tell
+    # pages apart that differ only in a name, date or ID number, so it can return another page's fields
+    'near_duplicates': False,
+    'side': 512,                  # px, longest side of the downscaled page that is checked and compared
+    'ink_contrast': 48,           # grey levels below the page background that count as ink when comparing
+    # A page with no ink at ink_contrast is only blank if a min-pooled copy has no faint ink either:
+    'blank_contrast': 32,         # grey levels below the paper that count as faint ink, at least
+    'blank_noise': 6,             # ... and at least this many times the paper's grain (noise std. dev.)
+    'blank_ink_fraction': 0.0005, # pages with less ink than this are blank (allows a few specks of dust)
+    'hash_size': 16,              # the hash marks which cells of a hash_size x hash_size grid hold ink
+    'max_hash_distance': 48,      # differing hash bits for an earlier page to be compared in detail
+    'max_difference': 0.008,      # share of ink with no ink nearby on the other page, for a near-duplicate
+    'index_size': 256             # earlier pages of a document remembered
+}
+
+# Per-stage timing spans (see metrics.py)
+METRICS_CONFIG = {
+    'enabled': True,
+    'log_path': os.path.join(OUTPUT_FOLDER, 'metrics.jsonl'),  # one JSON span per line; None to disable
+    'prometheus_path': None,   # rewrite a Prometheus text file after each document (node_exporter textfile)
+    'history': 1000,           # recent spans kept in memory for the sidebar panel
+    'buckets': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # seconds
+}
+
+
+def ensure_directories(*folders: str):
+    """Create working directories on demand (all of them if none are given)"""
+    for folder in folders or (UPLOAD_FOLDER, OUTPUT_FOLDER, TEMP_FOLDER):
+        os.makedirs(folder, exist_ok=True)
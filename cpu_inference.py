@@ -0,0 +1,156 @@
+"""
+Optimized CPU inference for the EasyOCR models
+The detector and recognizer can be exported once to ONNX and run with
+onnxruntime instead of torch, with the recognizer quantized to int8. Exports
+are named by a fingerprint of the model weights and kept in
+EASYOCR_CONFIG['onnx_dir'], so later processes load them without exporting
+again. torch (and onnxruntime) intra-op threads are set explicitly.
+"""
+
+import hashlib
+import importlib.util
+import logging
+import os
+import re
+from typing import Optional, Tuple
+
+import numpy as np
+
+from backends import load_backend
+from config import EASYOCR_CONFIG, ensure_directories
+
+logger = logging.getLogger(__name__)
+
+# torch.onnx.export takes dynamo=True, dynamic_shapes and external_data from torch 2.5
+MIN_TORCH_FOR_ONNX = (2, 5)
+
+
+def set_torch_threads(threads: Optional[int]):
+    """Set torch's intra-op thread count (None leaves torch's default)"""
+    if threads:
+        load_backend('torch').set_num_threads(threads)
+
+
+def onnx_unavailable_reason() -> Optional[str]:
+    """Why the models cannot be exported to and run by onnxruntime here, or None if they can"""
+    torch = load_backend('torch')
+    version = tuple(int(part) for part in re.findall(r'\d+', torch.__version__)[:2])
+    if version < MIN_TORCH_FOR_ONNX:
+        return (f"exporting needs torch {'.'.join(map(str, MIN_TORCH_FOR_ONNX))} or newer "
+                f"(installed: {torch.__version__})")
+    if importlib.util.find_spec('onnxruntime') is None:
+        return "onnxruntime is not installed (pip install onnxruntime)"
+    return None
+
+
+def _fingerprint(module) -> str:
+    """Short hash of a module's weights, so a new model never reuses an old export"""
+    digest = hashlib.blake2b(digest_size=8)
+    for name, tensor in sorted(module.state_dict().items()):
+        digest.update(name.encode())
+        digest.update(tensor.detach().cpu().numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _export(module, example, path: str, dynamic_shapes):
+    """Export a module to ONNX through a temporary file, so a crash never leaves half a model"""
+    torch = load_backend('torch')
+    temp_path = path + '.tmp'
+    torch.onnx.export(module.eval(), (example,), temp_path, input_names=['image'],
+                      dynamic_shapes=dynamic_shapes, dynamo=True, external_data=False)
+    os.replace(temp_path, path)
+
+
+def export_onnx(reader, directory: str = None, quantize: bool = True) -> Tuple[str, str]:
+    """Export a float EasyOCR reader's detector and recognizer, returning their ONNX paths
+
+    With quantize=True the recognizer's weights are stored as int8 (onnxruntime
+    dynamic quantization). The detector is convolutional and stays float:
+    dynamic quantization only covers matmul and recurrent layers.
+    """
+    torch = load_backend('torch')
+    directory = directory or EASYOCR_CONFIG['onnx_dir']
+    ensure_directories(directory)
+    Dim = torch.export.Dim
+
+    class Detector(torch.nn.Module):
+        """CRAFT without the unused feature output"""
+        def __init__(self, net):
+            super().__init__()
+            self.net = net
+
+        def forward(self, image):
+            return self.net(image)[0]
+
+    class Recognizer(torch.nn.Module):
+        """Recognizer without the text argument, which it ignores"""
+        def __init__(self, net):
+            super().__init__()
+            self.net = net
+
+        def forward(self, image):
+            return self.net(image, None)
+
+    detector_path = os.path.join(directory, f"detector-{_fingerprint(reader.detector)}.onnx")
+    if not os.path.exists(detector_path):
+        logger.info("Exporting the EasyOCR detector to %s", detector_path)
+        _export(Detector(reader.detector), torch.zeros(1, 3, 320, 480), detector_path,
+                {'image': {0: Dim('batch', min=1, max=256), 2: Dim.AUTO, 3: Dim.AUTO}})
+
+    recognizer_path = os.path.join(directory, f"recognizer-{_fingerprint(reader.recognizer)}.onnx")
+    if not os.path.exists(recognizer_path):
+        logger.info("Exporting the EasyOCR recognizer to %s", recognizer_path)
+        # Crops are always resized to the recognizer's 64 px input height; batch and width vary
+        _export(Recognizer(reader.recognizer), torch.zeros(2, 1, 64, 256), recognizer_path,
+                {'image': {0: Dim('batch', min=1, max=4096), 3: Dim('width', min=64, max=16384)}})
+
+    if quantize:
+        quantized_path = recognizer_path.replace('.onnx', '-int8.onnx')
+        if not os.path.exists(quantized_path):
+            quantization = load_backend('onnxruntime_quantization')
+            quantization.quantize_dynamic(recognizer_path, quantized_path + '.tmp',
+                                          weight_type=quantization.QuantType.QInt8)
+            os.replace(quantized_path + '.tmp', quantized_path)
+        recognizer_path = quantized_path
+    return detector_path, recognizer_path
+
+
+class OnnxModule:
+    """Callable that stands in for an EasyOCR torch module, running an ONNX graph instead"""
+
+    def __init__(self, path: str, threads: Optional[int] = None, outputs: int = 1):
+        onnxruntime = load_backend('onnxruntime')
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # The exported recognizer records one width in its output shape; other widths run
+        # correctly but would log a shape warning on every call
+        options.log_severity_level = 3
+        if threads:
+            options.intra_op_num_threads = threads
+        self.path = path
+        self.outputs = outputs
+        self.session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, image, *args):
+        torch = load_backend('torch')
+        output = torch.from_numpy(self.session.run(None, {self.input_name: np.ascontiguousarray(image.numpy())})[0])
+        # The detector is called as `y, feature = net(x)`; the feature map is never used
+        return (output, None) if self.outputs == 2 else output
+
+    def eval(self):
+        return self
+
+    def to(self, device):
+        return self
+
+
+def use_onnx_runtime(reader, quantize: bool = True, threads: Optional[int] = None, directory: str = None):
+    """Swap a float reader's torch detector and recognizer for onnxruntime sessions"""
+    reason = onnx_unavailable_reason()
+    if reason:
+        raise RuntimeError(f"The onnx runtime is unavailable: {reason}")
+    detector_path, recognizer_path = export_onnx(reader, directory, quantize)
+    reader.detector = OnnxModule(detector_path, threads, outputs=2)
+    reader.recognizer = OnnxModule(recognizer_path, threads)
+    return reader
@@ -0,0 +1,100 @@
+"""
+Image decoding straight to the array every engine reads
+decode_image turns upload bytes (or a path, file object or PIL image) into one
+uint8 ndarray: (H, W) grayscale or (H, W, 3) RGB. Large JPEGs are decoded at a
+reduced DCT scale when resolution normalization would shrink them anyway, and
+straight to luminance when only grayscale is needed. EXIF orientation is
+applied, transparent images are flattened onto white, and palette, CMYK,
+1-bit and 16-bit images are converted, so later stages only ever see L or RGB.
+decode_image_with_scale also returns the reduced decode's scale, so boxes
+found in the array can be mapped back to the original image.
+"""
+
+import io
+from typing import Optional, Tuple, Union, BinaryIO
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from config import RESIZE_CONFIG
+
+# Modes that stay single-channel even when colour was asked for
+GRAY_MODES = ('1', 'L', 'LA', 'I', 'F')
+
+
+def _default_max_side() -> Optional[int]:
+    """Longest side later stages can use: RESIZE_CONFIG['max_side'] when normalization is on"""
+    if RESIZE_CONFIG['enabled'] and RESIZE_CONFIG['draft_jpeg']:
+        return RESIZE_CONFIG['max_side']
+    return None
+
+
+def _flatten_alpha(image: Image.Image) -> Image.Image:
+    """Composite a transparent image onto white, where OCR expects paper"""
+    gray = image.mode in ('LA', 'La')
+    image = image.convert('LA' if gray else 'RGBA')
+    background = Image.new('L' if gray else 'RGB', image.size, 'white')
+    background.paste(image.convert(background.mode), mask=image.getchannel('A'))
+    return background
+
+
+def _to_uint8(image: Image.Image) -> np.ndarray:
+    """16-bit, 32-bit integer and float images scaled into 0-255 instead of clipped"""
+    pixels = np.asarray(image, dtype=np.float32)
+    peak = float(pixels.max()) if pixels.size else 0.0
+    if peak > 255:
+        pixels *= 255 / peak
+    return np.clip(pixels, 0, 255).astype(np.uint8)
+
+
+def decode_image(source: Union[bytes, str, BinaryIO, Image.Image], grayscale: bool = False,
+                 max_side: Optional[int] = None, draft: bool = True) -> np.ndarray:
+    """Decode an image into a (H, W) grayscale or (H, W, 3) RGB uint8 array
+
+    grayscale=True returns one channel whatever the source. Grayscale sources
+    stay single-channel either way, since every engine accepts them. With
+    draft, JPEGs larger than max_side (RESIZE_CONFIG['max_side'] when
+    normalization is on) are decoded at the smallest DCT scale that still
+    covers it.
+    """
+    return decode_image_with_scale(source, grayscale, max_side, draft)[0]
+
+
+def decode_image_with_scale(source: Union[bytes, str, BinaryIO, Image.Image], grayscale: bool = False,
+                            max_side: Optional[int] = None, draft: bool = True) -> Tuple[np.ndarray, float]:
+    """decode_image, plus the array's size relative to the original image
+
+    The scale is below 1.0 only after a reduced-scale JPEG decode. Boxes
+    found in the array map back to the original with OCRResult.scaled(scale).
+    """
+    scale = 1.0
+    if isinstance(source, Image.Image):
+        image = source
+    else:
+        image = Image.open(io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source)
+        max_side = (max_side or _default_max_side()) if draft else None
+        if image.format == 'JPEG' and (max_side or grayscale):
+            width, height = image.size
+            target = min(1.0, max_side / max(width, height)) if max_side else 1.0
+            # draft never goes below the requested size, so text stays as sharp as resizing would leave it
+            image.draft('L' if grayscale else image.mode, (int(width * target), int(height * target)))
+            # Before exif_transpose, so width still refers to the same axis
+            scale = image.size[0] / width
+        image.load()
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode == 'P':
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    if image.mode in ('RGBA', 'RGBa', 'LA', 'La', 'PA'):
+        image = _flatten_alpha(image)
+
+    if image.mode.startswith('I') or image.mode == 'F':
+        pixels = _to_uint8(image)
+    else:
+        target = 'L' if grayscale or image.mode in GRAY_MODES else 'RGB'
+        if image.mode != target:
+            image = image.convert(target)
+        pixels = np.asarray(image)
+    # Every engine reads this one buffer, so none may change it in place
+    pixels.flags.writeable = False
+    return pixels, scale
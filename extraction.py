@@ -0,0 +1,116 @@
+"""
+Precompiled field extraction for the document parsers
+Every regex is compiled once at import. Skill keywords are compiled into a
+single trie-shaped pattern with word boundaries, and all fields (emails,
+phones, Aadhar numbers, dates, skills, gender words) are pulled out of the
+text in one left-to-right scan.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Iterable
+
+from config import DOCUMENT_TYPES
+
+EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+PHONE_PATTERN = r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
+AADHAR_PATTERN = DOCUMENT_TYPES['aadhar']['number_pattern']
+DOB_PATTERNS = DOCUMENT_TYPES['aadhar']['dob_patterns']
+SKILL_KEYWORDS = DOCUMENT_TYPES['resume']['skills_keywords']
+GENDER_KEYWORDS = ['male', 'female']
+
+EMAIL_RE = re.compile(EMAIL_PATTERN)
+AADHAR_RE = re.compile(AADHAR_PATTERN)
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """Turn a character trie into a regex so shared prefixes are matched only once"""
+    branches = [re.escape(char) + _trie_pattern(child) if char != ' ' else r'\s+' + _trie_pattern(child)
+                for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    ends_here = '' in node
+    if len(branches) == 1 and not ends_here:
+        return branches[0]
+    group = '(?:' + '|'.join(branches) + ')'
+    return group + '?' if ends_here else group
+
+
+def keyword_pattern(keywords: Iterable[str]) -> str:
+    """Whole-word, case-insensitive pattern matching any of the keywords
+
+    The keywords share one trie, so the regex engine walks the text once
+    instead of searching once per keyword, and (?<!\\w)/(?!\\w) stop "ai"
+    matching inside "maintain" or "java" inside "javascript".
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in WHITESPACE_RE.sub(' ', keyword.lower().strip()):
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return r'(?<!\w)' + _trie_pattern(trie) + r'(?!\w)'
+
+
+# One alternation per field; at any position earlier fields win, so an email
+# address is never also read as skills and an Aadhar number never as a phone
+FIELD_RE = re.compile('|'.join([
+    f'(?P<email>{EMAIL_PATTERN})',
+    f'(?P<aadhar>{AADHAR_PATTERN})',
+    '(?P<date>' + '|'.join(DOB_PATTERNS) + ')',
+    f'(?P<phone>{PHONE_PATTERN})',
+    f'(?P<skill>{keyword_pattern(SKILL_KEYWORDS)})',
+    f'(?P<gender>{keyword_pattern(GENDER_KEYWORDS)})',
+]), re.IGNORECASE)
+
+# Canonical spelling for each skill, keyed by its normalized lowercase form
+_SKILL_NAMES = {WHITESPACE_RE.sub(' ', skill.lower()): skill for skill in SKILL_KEYWORDS}
+
+
+def _normalize_keyword(match: str) -> str:
+    """Lowercase a keyword match and collapse any line breaks or runs of spaces inside it"""
+    return WHITESPACE_RE.sub(' ', match.lower())
+
+
+def scan_fields(text: str) -> Dict[str, List[str]]:
+    """Extract every supported field from text in a single scan
+
+    Lists keep the order of first appearance, except skills which follow the
+    order of the configured keyword list.
+    """
+    fields = {'emails': [], 'aadhar_numbers': [], 'dates': [], 'phones': [], 'skills': [], 'genders': []}
+    skills = set()
+
+    for match in FIELD_RE.finditer(text):
+        kind = match.lastgroup
+        value = match.group()
+        if kind == 'email':
+            fields['emails'].append(value)
+        elif kind == 'aadhar':
+            fields['aadhar_numbers'].append(value)
+        elif kind == 'date':
+            fields['dates'].append(value)
+        elif kind == 'phone':
+            fields['phones'].append(value)
+        elif kind == 'skill':
+            skills.add(_SKILL_NAMES[_normalize_keyword(value)])
+        else:
+            fields['genders'].append(_normalize_keyword(value))
+
+    fields['skills'] = [skill for skill in SKILL_KEYWORDS if skill in skills]
+    return fields
+
+
+@lru_cache(maxsize=32)
+def _keyword_regex(keywords: tuple) -> re.Pattern:
+    """Compiled whole-word matcher for an arbitrary keyword list"""
+    return re.compile(keyword_pattern(keywords), re.IGNORECASE)
+
+
+def find_keywords(text: str, keywords: Iterable[str]) -> List[str]:
+    """Keywords that occur as whole words in text, in keyword-list order"""
+    keywords = tuple(keywords)
+    names = {_normalize_keyword(keyword): keyword for keyword in keywords}
+    found = {names[_normalize_keyword(match)] for match in _keyword_regex(keywords).findall(text)}
+    return [keyword for keyword in keywords if keyword in found]
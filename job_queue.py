@@ -0,0 +1,348 @@
+"""
+Durable OCR job queue
+Jobs (one per document, or one per PDF page) live in a SQLite file, so a big
+submission survives restarts and can be worked on by many processes. Workers
+claim jobs under a time-limited lease and write each result to a JSON file.
+A worker that crashes simply lets its leases expire and the jobs are claimed
+again; failed jobs are retried with exponential backoff, and finished jobs
+are never repeated.
+
+The queue file must be on a filesystem with working locks (local disk, or a
+shared volume that supports them) for workers on several machines.
+"""
+
+import json
+import os
+import random
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from functools import partial
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from config import JOBS_CONFIG, ensure_directories
+
+STATES = ('pending', 'running', 'done', 'failed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    page INTEGER NOT NULL DEFAULT 0,
+    document_type TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    not_before REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result_path TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    UNIQUE (source, page, document_type, engine)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (state, not_before);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished);
+"""
+
+
+def default_owner() -> str:
+    """Lease owner name for this process"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retrying a job that has failed `attempts` times, with jitter"""
+    delay = min(JOBS_CONFIG['backoff_base'] * 2 ** (attempts - 1), JOBS_CONFIG['backoff_max'])
+    return delay * random.uniform(0.8, 1.2)
+
+
+class JobQueue:
+    """SQLite-backed queue of OCR jobs with leases, retries and progress reporting"""
+
+    def __init__(self, path: str, lease_seconds: float = None):
+        self.path = path
+        self.lease_seconds = lease_seconds or JOBS_CONFIG['lease_seconds']
+        directory = os.path.dirname(path)
+        if directory:
+            ensure_directories(directory)
+        # Autocommit; claims take an IMMEDIATE transaction so two workers never claim the same job
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def submit(self, sources: List[str], document_type: str, engine: str, per_page: bool = False,
+               max_attempts: int = None) -> int:
+        """Add one job per document (or per PDF page); jobs already in the queue are left alone
+
+        Returns the number of new jobs.
+        """
+        max_attempts = max_attempts or JOBS_CONFIG['max_attempts']
+        rows = []
+        for source in sources:
+            source = os.path.abspath(source)
+            if per_page and source.lower().endswith('.pdf'):
+                from pdf_pages import pdf_page_count
+                pages = range(1, pdf_page_count(source) + 1)
+            else:
+                pages = [0]
+            rows.extend((source, page, document_type, engine, max_attempts, time.time()) for page in pages)
+
+        before = self._conn.total_changes
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO jobs (source, page, document_type, engine, max_attempts, created) "
+            "VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+        self._conn.execute("COMMIT")
+        return self._conn.total_changes - before
+
+    def claim(self, owner: str, limit: int = 1) -> List[Dict[str, Any]]:
+        """Lease up to `limit` runnable jobs: pending ones past their backoff, or running ones whose lease expired"""
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A job whose worker died on its last attempt will not be retried again
+            self._conn.execute(
+                "UPDATE jobs SET state = 'failed', lease_owner = NULL, finished = ?, "
+                "error = COALESCE(error, 'Lease expired') "
+                "WHERE state = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE (state = 'pending' AND not_before <= ?) "
+                "OR (state = 'running' AND lease_expires < ?) ORDER BY id LIMIT ?",
+                (now, now, limit)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE jobs SET state = 'running', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, started = COALESCE(started, ?) WHERE id = ?",
+                [(owner, now + self.lease_seconds, now, row['id']) for row in rows]
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return [dict(row, attempts=row['attempts'] + 1) for row in rows]
+
+    def extend(self, job_ids: List[int], owner: str) -> int:
+        """Renew the leases this owner holds; returns how many are still held"""
+        cursor = self._conn.executemany(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND state = 'running'",
+            [(time.time() + self.lease_seconds, job_id, owner) for job_id in job_ids]
+        )
+        return cursor.rowcount
+
+    def complete(self, job_id: int, owner: str, result_path: str, publish: Callable[[], None] = None) -> bool:
+        """Mark a leased job done; False if the lease was lost to another worker
+
+        publish (e.g. moving the result file into place) runs only while the
+        lease is confirmed held, inside the same transaction, so a worker that
+        lost its lease never overwrites the new owner's result.
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            held = self._conn.execute(
+                "UPDATE jobs SET state = 'done', result_path = ?, error = NULL, lease_owner = NULL, "
+                "lease_expires = NULL, finished = ? WHERE id = ? AND lease_owner = ? AND state = 'running'",
+                (result_path, time.time(), job_id, owner)
+            ).rowcount == 1
+            if held and publish is not None:
+                publish()
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return held
+
+    def fail(self, job_id: int, owner: str, error: str) -> Optional[str]:
+        """Record a failed attempt: back to pending after a backoff, or failed once out of attempts
+
+        Returns the job's new state, or None if the lease was lost.
+        """
+        row = self._conn.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_owner = ?",
+                                 (job_id, owner)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if row['attempts'] >= row['max_attempts']:
+            state, not_before, finished = 'failed', 0, now
+        else:
+            state, not_before, finished = 'pending', now + backoff_seconds(row['attempts']), None
+        cursor = self._conn.execute(
+            "UPDATE jobs SET state = ?, not_before = ?, finished = ?, error = ?, lease_owner = NULL, "
+            "lease_expires = NULL WHERE id = ? AND lease_owner = ? AND state = 'running'",
+            (state, not_before, finished, error, job_id, owner)
+        )
+        # Another worker may have claimed the job between the two statements
+        return state if cursor.rowcount == 1 else None
+
+    def release(self, owner: str) -> int:
+        """Hand this owner's running jobs back without counting the attempt (graceful shutdown)"""
+        cursor = self._conn.execute(
+            "UPDATE jobs SET state = 'pending', attempts = MAX(attempts - 1, 0), lease_owner = NULL, "
+            "lease_expires = NULL WHERE lease_owner = ? AND state = 'running'", (owner,)
+        )
+        return cursor.rowcount
+
+    def retry_failed(self) -> int:
+        """Give every failed job a fresh set of attempts"""
+        cursor = self._conn.execute(
+            "UPDATE jobs SET state = 'pending', attempts = 0, not_before = 0, finished = NULL "
+            "WHERE state = 'failed'"
+        )
+        return cursor.rowcount
+
+    def status(self, window: float = 300.0) -> Dict[str, Any]:
+        """Job counts per state, throughput overall and over the last `window` seconds, and an ETA"""
+        now = time.time()
+        counts = dict.fromkeys(STATES, 0)
+        for row in self._conn.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state"):
+            counts[row['state']] = row['n']
+
+        first_started, last_finished = self._conn.execute(
+            "SELECT MIN(started), MAX(finished) FROM jobs WHERE state = 'done'").fetchone()
+        # A queue that started less than `window` ago is measured over its actual run time
+        window_start = max(now - window, first_started or now)
+        recent = self._conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE state = 'done' AND finished >= ?", (window_start,)).fetchone()[0]
+        workers = self._conn.execute(
+            "SELECT COUNT(DISTINCT lease_owner) FROM jobs WHERE state = 'running' AND lease_expires >= ?",
+            (now,)).fetchone()[0]
+        retries = self._conn.execute("SELECT COALESCE(SUM(attempts - 1), 0) FROM jobs "
+                                     "WHERE attempts > 1").fetchone()[0]
+
+        elapsed = (last_finished - first_started) if first_started and last_finished else 0
+        overall_rate = counts['done'] / elapsed if elapsed > 0 else 0.0
+        recent_rate = recent / (now - window_start) if now > window_start else 0.0
+        remaining = counts['pending'] + counts['running']
+        rate = recent_rate or overall_rate
+        total = sum(counts.values())
+        return {
+            'total': total,
+            **counts,
+            'progress': round(counts['done'] / total, 4) if total else 0.0,
+            'retries': retries,
+            'active_workers': workers,
+            'jobs_per_sec': round(overall_rate, 3),
+            'recent_jobs_per_sec': round(recent_rate, 3),
+            'eta_seconds': round(remaining / rate) if rate > 0 and remaining else None
+        }
+
+    def failures(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent failed jobs with their errors"""
+        rows = self._conn.execute(
+            "SELECT id, source, page, attempts, error FROM jobs WHERE state = 'failed' "
+            "ORDER BY finished DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def _write_result(results_dir: str, job: Dict[str, Any], record: Dict[str, Any]) -> Tuple[str, str]:
+    """Write a job's result to a temp file of its own; returns it and the path to publish it under
+
+    The file is renamed into place by JobQueue.complete once the lease is
+    confirmed, so a crash never leaves a half-written result and two workers
+    never write the same file.
+    """
+    path = os.path.join(results_dir, f"{job['id']:08d}.json")
+    handle, temp_path = tempfile.mkstemp(dir=results_dir, prefix=f"{job['id']:08d}.", suffix='.tmp')
+    with os.fdopen(handle, 'w', encoding='utf-8') as f:
+        json.dump(record, f)
+    return temp_path, path
+
+
+class _Heartbeat:
+    """Renew the lease on the jobs a worker is processing from a background thread"""
+
+    def __init__(self, queue_path: str, owner: str, interval: float):
+        self.queue_path = queue_path
+        self.owner = owner
+        self.interval = interval
+        self.job_ids: List[int] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='job-heartbeat', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        # SQLite connections stay on the thread that opened them
+        queue = JobQueue(self.queue_path)
+        try:
+            while not self._stop.wait(self.interval):
+                if self.job_ids:
+                    queue.extend(list(self.job_ids), self.owner)
+        finally:
+            queue.close()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(queue_path: str, results_dir: str, owner: str = None, exit_when_idle: bool = False,
+               use_cache: bool = True, poll_seconds: float = None, processes: int = 1) -> Dict[str, int]:
+    """Claim and process jobs until interrupted (or until the queue has nothing left to run)
+
+    processes is the number of workers sharing this machine's cores (see thread_budget.py).
+    Jobs whose lease expired and went to another worker before they finished
+    are counted as 'lost' and leave no result behind.
+    """
+    from batch import process_document
+    from ocr_cache import get_default_cache
+    from ocr_engine import OCREngine
+    from tesseract_pool import TesseractPool
+    from thread_budget import apply_budget
+
+    apply_budget(processes)
+    owner = owner or default_owner()
+    poll_seconds = poll_seconds or JOBS_CONFIG['poll_seconds']
+    ensure_directories(results_dir)
+    queue = JobQueue(queue_path)
+    # Parallelism comes from running several workers, so each drives a single tesseract
+    engine = OCREngine(cache=get_default_cache() if use_cache else None, tesseract_pool=TesseractPool(workers=1))
+    counts = {'done': 0, 'failed': 0, 'retried': 0, 'lost': 0}
+    heartbeat = _Heartbeat(queue_path, owner, queue.lease_seconds / 3)
+
+    try:
+        while True:
+            jobs = queue.claim(owner)
+            if not jobs:
+                status = queue.status()
+                if exit_when_idle and status['pending'] == 0 and status['running'] == 0:
+                    break
+                time.sleep(poll_seconds)
+                continue
+
+            heartbeat.job_ids = [job['id'] for job in jobs]
+            for job in jobs:
+                record = process_document(job['source'], job['document_type'], job['engine'], engine,
+                                          job['page'] or None)
+                record.update(job_id=job['id'], attempt=job['attempts'], worker=owner)
+                if record['error']:
+                    state = queue.fail(job['id'], owner, record['error'])
+                    # None: the lease expired and the job belongs to another worker now
+                    counts['lost' if state is None else 'retried' if state == 'pending' else 'failed'] += 1
+                    continue
+                temp_path, path = _write_result(results_dir, job, record)
+                if queue.complete(job['id'], owner, path, publish=partial(os.replace, temp_path, path)):
+                    counts['done'] += 1
+                else:
+                    os.remove(temp_path)
+                    counts['lost'] += 1
+            heartbeat.job_ids = []
+    except KeyboardInterrupt:
+        pass
+    finally:
+        heartbeat.stop()
+        queue.release(owner)
+        queue.close()
+    return counts
@@ -0,0 +1,211 @@
+"""
+Timing spans for the OCR pipeline
+Each stage of a document (upload decode, PDF rasterization, resize,
+preprocessing, detection, recognition, parsing, rendering) is recorded as a
+span carrying the document type, engine, page and image size. Spans are kept
+in memory for the UI, aggregated into Prometheus histograms and written as
+JSON lines to METRICS_CONFIG['log_path'].
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+import numpy as np
+
+from config import METRICS_CONFIG, ensure_directories
+
+logger = logging.getLogger('ocr.metrics')
+
+# Labels exported to Prometheus; every other attribute only goes to the JSON log
+LABELS = ('stage', 'engine', 'doc_type')
+
+# Attributes inherited by every span opened inside context(...)
+_attributes: contextvars.ContextVar = contextvars.ContextVar('metrics_attributes', default={})
+# Lists collecting spans inside collect(...), and whether they also reach the recorder
+_collectors: contextvars.ContextVar = contextvars.ContextVar('metrics_collectors', default=())
+_forward: contextvars.ContextVar = contextvars.ContextVar('metrics_forward', default=True)
+
+
+def image_size(image) -> Dict[str, int]:
+    """Width and height of a PIL image or ndarray, as span attributes"""
+    if hasattr(image, 'size') and not isinstance(image, np.ndarray):
+        width, height = image.size
+    else:
+        height, width = np.asarray(image).shape[:2]
+    return {'width': int(width), 'height': int(height)}
+
+
+class MetricsRecorder:
+    """Collect spans into recent history, per-stage histograms and a JSON log"""
+
+    def __init__(self, log_path: Optional[str] = None, history: int = None, buckets: Tuple[float, ...] = None):
+        self.log_path = log_path if log_path is not None else METRICS_CONFIG['log_path']
+        self.buckets = tuple(buckets or METRICS_CONFIG['buckets'])
+        self.recent: "deque[Dict[str, Any]]" = deque(maxlen=history or METRICS_CONFIG['history'])
+        self._histograms: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._log_handler = None
+
+    def _log(self, span: Dict[str, Any]):
+        """Write one span as a JSON line, opening the log file on first use"""
+        if self.log_path and self._log_handler is None:
+            folder = os.path.dirname(self.log_path)
+            if folder:
+                ensure_directories(folder)
+            self._log_handler = logging.FileHandler(self.log_path, encoding='utf-8')
+            self._log_handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(self._log_handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+        if self._log_handler is not None:
+            logger.info(json.dumps(span, default=str))
+
+    def record(self, span: Dict[str, Any]):
+        """Add a finished span"""
+        labels = tuple(str(span.get(label, '')) for label in LABELS)
+        seconds = span['duration_ms'] / 1000
+        with self._lock:
+            self.recent.append(span)
+            histogram = self._histograms.get(labels)
+            if histogram is None:
+                histogram = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+                self._histograms[labels] = histogram
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+            self._log(span)
+
+    def spans(self) -> List[Dict[str, Any]]:
+        """Recent spans, oldest first"""
+        with self._lock:
+            return list(self.recent)
+
+    def prometheus_text(self) -> str:
+        """Histograms of span durations in the Prometheus text exposition format"""
+        lines = [
+            '# HELP ocr_stage_duration_seconds Time spent in each OCR pipeline stage',
+            '# TYPE ocr_stage_duration_seconds histogram'
+        ]
+        with self._lock:
+            for labels, histogram in sorted(self._histograms.items()):
+                label_text = ','.join(f'{name}="{value}"' for name, value in zip(LABELS, labels))
+                for bound, count in zip(self.buckets, histogram['buckets']):
+                    lines.append(f'ocr_stage_duration_seconds_bucket{{{label_text},le="{bound}"}} {count}')
+                lines.append(f'ocr_stage_duration_seconds_bucket{{{label_text},le="+Inf"}} {histogram["count"]}')
+                lines.append(f'ocr_stage_duration_seconds_sum{{{label_text}}} {histogram["sum"]:.6f}')
+                lines.append(f'ocr_stage_duration_seconds_count{{{label_text}}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Atomically replace a Prometheus text file (for node_exporter's textfile collector)"""
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(temp_path, path)
+
+    def reset(self):
+        """Forget all spans and histograms"""
+        with self._lock:
+            self.recent.clear()
+            self._histograms.clear()
+
+
+_recorder: Optional[MetricsRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder() -> MetricsRecorder:
+    """Process-wide metrics recorder"""
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = MetricsRecorder()
+    return _recorder
+
+
+def record_span(stage: str, duration_ms: float, **attributes):
+    """Record a span whose duration was measured elsewhere"""
+    if not METRICS_CONFIG['enabled']:
+        return
+    span = {'stage': stage, 'duration_ms': round(duration_ms, 3), 'time': round(time.time(), 3)}
+    span.update(_attributes.get())
+    span.update(attributes)
+    for spans in _collectors.get():
+        spans.append(span)
+    if _forward.get():
+        get_recorder().record(span)
+
+
+@contextmanager
+def span(stage: str, **attributes) -> Iterator[Dict[str, Any]]:
+    """Time the enclosed block as one span
+
+    Yields a dict the block can add attributes to (e.g. an image size that is
+    only known after decoding).
+    """
+    extra = dict(attributes)
+    start = time.perf_counter()
+    try:
+        yield extra
+    finally:
+        record_span(stage, (time.perf_counter() - start) * 1000, **extra)
+
+
+@contextmanager
+def context(**attributes):
+    """Attach attributes (doc_type, engine, page, ...) to every span opened inside"""
+    token = _attributes.set({**_attributes.get(), **attributes})
+    try:
+        yield
+    finally:
+        _attributes.reset(token)
+
+
+def current_attributes() -> Dict[str, Any]:
+    """Attributes set by the enclosing context(...) calls"""
+    return dict(_attributes.get())
+
+
+@contextmanager
+def collect(forward: bool = True) -> Iterator[List[Dict[str, Any]]]:
+    """Gather the spans recorded inside into a list
+
+    With forward=False the spans only go to the list, e.g. in a worker process
+    that sends them back to the parent to record.
+    """
+    spans: List[Dict[str, Any]] = []
+    collectors_token = _collectors.set(_collectors.get() + (spans,))
+    forward_token = _forward.set(forward and _forward.get())
+    try:
+        yield spans
+    finally:
+        _forward.reset(forward_token)
+        _collectors.reset(collectors_token)
+
+
+def record_spans(spans: List[Dict[str, Any]]):
+    """Record spans gathered elsewhere (e.g. returned by a worker process)"""
+    for finished in spans:
+        for collected in _collectors.get():
+            collected.append(finished)
+        if _forward.get():
+            get_recorder().record(finished)
+
+
+def stage_totals(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Calls and total milliseconds per stage, in order of first appearance"""
+    totals: Dict[str, Dict[str, Any]] = {}
+    for finished in spans:
+        total = totals.setdefault(finished['stage'], {'stage': finished['stage'], 'calls': 0, 'total_ms': 0.0})
+        total['calls'] += 1
+        total['total_ms'] = round(total['total_ms'] + finished['duration_ms'], 3)
+    return list(totals.values())
@@ -0,0 +1,288 @@
+"""
+Process-wide registry of OCR models
+One EasyOCR Reader is loaded per language set and options, then shared by
+every Streamlit session and thread in the server process
+"""
+
+import functools
+import inspect
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backends import load_backend
+from config import EASYOCR_CONFIG
+from cpu_inference import onnx_unavailable_reason, set_torch_threads, use_onnx_runtime
+from thread_budget import process_threads
+
+_readers: Dict[Tuple, 'SharedReader'] = {}
+_registry_lock = threading.Lock()
+_load_locks: Dict[Tuple, threading.Lock] = {}
+
+logger = logging.getLogger('ocr.models')
+
+# Parameters _readtext_batch passes to easyocr's internal helpers by name (easyocr 1.7),
+# checked when the helpers are loaded so a release that renames them falls back to readtext
+GET_IMAGE_LIST_PARAMETERS = ('horizontal_list', 'free_list', 'img', 'model_height', 'sort_output')
+GET_TEXT_PARAMETERS = ('character', 'imgH', 'imgW', 'recognizer', 'converter', 'image_list', 'ignore_char',
+                       'decoder', 'beamWidth', 'batch_size', 'contrast_ths', 'adjust_contrast', 'filter_ths',
+                       'workers', 'device')
+
+
+class SharedReader:
+    """EasyOCR Reader wrapper that serializes inference across threads"""
+
+    def __init__(self, reader):
+        self._reader = reader
+        self._lock = threading.Lock()
+        self._timings: Optional[Dict[str, float]] = None
+        # readtext calls detect then recognize on the instance, so timing them
+        # here splits readtext's cost without changing how it runs
+        for name, stage in (('detect', 'detection'), ('recognize', 'recognition')):
+            method = getattr(reader, name, None)
+            if callable(method):
+                setattr(reader, name, self._timed(stage, method))
+
+    def _timed(self, stage: str, method):
+        """Wrap a Reader method so calls made during readtext(timings=...) are timed"""
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                if self._timings is not None:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    self._timings[stage] = self._timings.get(stage, 0.0) + elapsed
+        return timed
+
+    def readtext(self, image, timings: Optional[Dict[str, float]] = None, **kwargs) -> List[tuple]:
+        """Run readtext while holding the model lock
+
+        When a timings dict is given, milliseconds spent in detection and
+        recognition are added to it.
+        """
+        with self._lock:
+            self._timings = timings
+            try:
+                return self._reader.readtext(image, **kwargs)
+            finally:
+                self._timings = None
+
+    def readtext_many(self, images: Sequence[np.ndarray], batch_size: int = None,
+                      recognition_batch_size: int = None,
+                      timings: Optional[Dict[str, float]] = None) -> List[List[tuple]]:
+        """readtext over several images with batched detection and recognition
+
+        Images of similar size are padded to a common shape and detected
+        together, batch_size at a time. The text crops of the whole batch are
+        then sorted by width and recognized recognition_batch_size at a time
+        (readtext recognizes one crop per forward pass on CPU), and the
+        results are split back per image in readtext's order.
+        """
+        batch_size = batch_size or EASYOCR_CONFIG['batch_size']
+        recognition_batch_size = recognition_batch_size or EASYOCR_CONFIG['recognition_batch_size']
+        internals = _recognition_internals()
+        if internals is None or not hasattr(self._reader, 'detect'):
+            return [self.readtext(image, timings=timings, batch_size=recognition_batch_size) for image in images]
+
+        results: List[List[tuple]] = [[] for _ in images]
+        with self._lock:
+            self._timings = timings
+            try:
+                for batch in size_batches([image.shape[:2] for image in images], batch_size,
+                                          EASYOCR_CONFIG['max_padding'], EASYOCR_CONFIG['max_batch_pixels']):
+                    batch_results = self._readtext_batch([images[i] for i in batch], recognition_batch_size,
+                                                         internals)
+                    for i, result in zip(batch, batch_results):
+                        results[i] = result
+            finally:
+                self._timings = None
+        return results
+
+    def _readtext_batch(self, images: List[np.ndarray], recognition_batch_size: int,
+                        internals: Tuple) -> List[List[tuple]]:
+        """Detect and recognize one batch of similarly sized images (lock held by the caller)"""
+        cv2 = load_backend('opencv')
+        model_height, get_image_list, get_text = internals
+        reader = self._reader
+        colour, grey = zip(*(_reformat(image) for image in images))
+        height = max(image.shape[0] for image in colour)
+        width = max(image.shape[1] for image in colour)
+
+        # Pad at the bottom and right so box coordinates are unchanged
+        padded = np.stack([
+            cv2.copyMakeBorder(image, 0, height - image.shape[0], 0, width - image.shape[1],
+                               cv2.BORDER_CONSTANT, value=[int(np.median(image))] * 3)
+            for image in colour
+        ])
+        horizontal_lists, free_lists = reader.detect(padded, reformat=False)
+
+        start = time.perf_counter()
+        # Crops are cut from each unpadded image, so boxes never reach into padding
+        crops = []
+        for index, (image, horizontal, free) in enumerate(zip(grey, horizontal_lists, free_lists)):
+            # Horizontal boxes then free boxes, in detection order, as readtext returns them
+            for boxes in ((horizontal, []), ([], free)):
+                image_list, _ = get_image_list(horizontal_list=boxes[0], free_list=boxes[1], img=image,
+                                               model_height=model_height, sort_output=False)
+                crops.extend((index, box, crop) for box, crop in image_list)
+
+        # Crops are grouped by the padded width readtext would give each one alone,
+        # so batching adds no padding and results match one-crop-at-a-time recognition
+        recognized: List[Optional[tuple]] = [None] * len(crops)
+        ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+        widths: Dict[int, List[int]] = {}
+        for i, (_, _, crop) in enumerate(crops):
+            widths.setdefault(math.ceil(max(1, crop.shape[1] / model_height)) * model_height, []).append(i)
+        for max_width, indices in sorted(widths.items()):
+            for offset in range(0, len(indices), recognition_batch_size):
+                chunk = indices[offset:offset + recognition_batch_size]
+                # readtext's defaults, except the batch size and no DataLoader workers
+                chunk_results = get_text(character=reader.character, imgH=model_height, imgW=max_width,
+                                         recognizer=reader.recognizer, converter=reader.converter,
+                                         image_list=[crops[i][1:] for i in chunk], ignore_char=ignore_char,
+                                         decoder='greedy', beamWidth=5, batch_size=len(chunk), contrast_ths=0.1,
+                                         adjust_contrast=0.5, filter_ths=0.003, workers=0, device=reader.device)
+                for i, result in zip(chunk, chunk_results):
+                    recognized[i] = result
+        if self._timings is not None:
+            elapsed = (time.perf_counter() - start) * 1000
+            self._timings['recognition'] = self._timings.get('recognition', 0.0) + elapsed
+
+        results: List[List[tuple]] = [[] for _ in images]
+        for (index, _, _), (box, text, confidence) in zip(crops, recognized):
+            results[index].append(([[int(x), int(y)] for x, y in box], text, confidence))
+        return results
+
+    def recognize(self, image, horizontal_list, free_list, **kwargs) -> List[tuple]:
+        """Recognize text in given boxes, skipping detection, while holding the model lock"""
+        with self._lock:
+            return self._reader.recognize(image, horizontal_list, free_list, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._reader, name)
+
+
+def _accepts(function, parameters: Sequence[str]) -> bool:
+    """Whether a function takes every one of these parameters by name"""
+    try:
+        accepted = inspect.signature(function).parameters
+    except (TypeError, ValueError):
+        return False
+    return all(name in accepted for name in parameters)
+
+
+@functools.lru_cache(maxsize=None)
+def _recognition_internals() -> Optional[Tuple]:
+    """easyocr's crop and batched-recognition helpers, or None if this version lacks them
+
+    They are private, so their signatures are checked against the parameters
+    _readtext_batch passes; on a mismatch pages are read with readtext.
+    """
+    try:
+        from easyocr import easyocr as easyocr_module
+        internals = easyocr_module.imgH, easyocr_module.get_image_list, easyocr_module.get_text
+    except (ImportError, AttributeError):
+        return None
+    if not (_accepts(internals[1], GET_IMAGE_LIST_PARAMETERS) and _accepts(internals[2], GET_TEXT_PARAMETERS)):
+        logger.warning("easyocr %s's recognition helpers do not take the expected arguments; "
+                       "reading pages one readtext call at a time",
+                       getattr(load_backend('easyocr'), '__version__', '?'))
+        return None
+    return internals
+
+
+def _reformat(image: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Colour and greyscale copies of an image, converted the way readtext converts its input"""
+    cv2 = load_backend('opencv')
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR), image
+    if image.shape[2] == 4:
+        image = image[:, :, :3]
+    return image, cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def size_batches(shapes: Sequence[Tuple[int, int]], batch_size: int, max_padding: float,
+                 max_pixels: int) -> List[List[int]]:
+    """Group image indices into batches of at most batch_size similar sizes
+
+    An image joins a batch only while the padded shape stays within
+    max_padding times the area of the batch's smallest image and the padded
+    batch holds at most max_pixels pixels (detector activations grow with it).
+    """
+    order = sorted(range(len(shapes)), key=lambda i: shapes[i][0] * shapes[i][1])
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for i in order:
+        if current:
+            height = max(shapes[j][0] for j in current + [i])
+            width = max(shapes[j][1] for j in current + [i])
+            smallest = shapes[current[0]][0] * shapes[current[0]][1]
+            if (len(current) == batch_size or height * width > max_padding * max(smallest, 1)
+                    or height * width * (len(current) + 1) > max_pixels):
+                batches.append(current)
+                current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _registry_key(languages, options: Dict[str, Any]) -> Tuple:
+    """Build a hashable key from a language set and reader options"""
+    return (tuple(sorted(languages)), tuple(sorted(options.items())))
+
+
+def _load_reader(languages, options: Dict[str, Any]):
+    """Construct an EasyOCR Reader, moving it to onnxruntime when options ask for runtime='onnx'"""
+    easyocr = load_backend('easyocr')
+    runtime = options.pop('runtime', 'torch')
+    set_torch_threads(EASYOCR_CONFIG['threads'])
+    if runtime == 'onnx' and not options.get('gpu'):
+        reason = onnx_unavailable_reason()
+        if reason is None:
+            # Export needs the float model; onnxruntime does its own int8 quantization
+            quantize = options.pop('quantize', True)
+            reader = easyocr.Reader(list(languages), quantize=False, **options)
+            # onnxruntime keeps its own thread pool, sized to this process's thread budget
+            return use_onnx_runtime(reader, quantize, EASYOCR_CONFIG['threads'] or process_threads())
+        logger.warning("EASYOCR_CONFIG['runtime'] is 'onnx' but %s; running EasyOCR with torch", reason)
+    return easyocr.Reader(list(languages), **options)
+
+
+def get_easyocr_reader(languages=('en',), **options) -> SharedReader:
+    """Return the shared EasyOCR reader for these languages and options, loading it once"""
+    key = _registry_key(languages, options)
+
+    reader = _readers.get(key)
+    if reader is not None:
+        return reader
+
+    with _registry_lock:
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    # Only one thread loads a given model; others wait and reuse it
+    with load_lock:
+        reader = _readers.get(key)
+        if reader is None:
+            reader = SharedReader(_load_reader(languages, dict(options)))
+            with _registry_lock:
+                _readers[key] = reader
+    return reader
+
+
+def loaded_models() -> List[Tuple]:
+    """List the keys of models currently held by the registry"""
+    with _registry_lock:
+        return list(_readers.keys())
+
+
+def clear_registry():
+    """Drop every cached model so the next request reloads it"""
+    with _registry_lock:
+        _readers.clear()
+        _load_locks.clear()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Command line entry point for headless OCR
+Usage: python -m ocr [-v] batch <dir|glob> --doc-type resume --engine tesseract --workers 4
+       python -m ocr serve --port 8502 [--stub]
+       python -m ocr jobs submit queue.db <dir|glob> --per-page; python -m ocr jobs work queue.db --processes 4
+       python -m ocr jobs status queue.db
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+DOCUMENT_TYPE_CHOICES = ['resume', 'aadhar', 'notes', 'general']
+ENGINE_CHOICES = ['easyocr', 'tesseract', 'cascade']
+
+
+def _print_thread_budget(workers: int, enabled: bool = True):
+    """Report the threads each worker process will use"""
+    from config import THREAD_CONFIG
+    from thread_budget import plan
+
+    if not enabled or not THREAD_CONFIG['enabled']:
+        print(f"🧵 {workers} workers, thread budget off", file=sys.stderr)
+        return
+    budget = plan(workers)
+    print(f"🧵 {budget['cores']} cores / {workers} workers: {budget['threads']} threads each "
+          f"(torch {budget['torch_intra_op']}+{budget['torch_inter_op']}, OpenCV {budget['opencv']}, "
+          f"OMP_THREAD_LIMIT {budget['omp_thread_limit']})", file=sys.stderr)
+
+
+def cmd_batch(args):
+    """Run batch OCR over the given inputs"""
+    from batch import collect_inputs, run_batch
+
+    paths = collect_inputs(args.inputs)
+    if not paths:
+        print("❌ No supported images or PDFs found", file=sys.stderr)
+        return 1
+
+    print(f"📂 {len(paths)} documents, engine={args.engine}, doc type={args.doc_type}", file=sys.stderr)
+    _print_thread_budget(args.workers or os.cpu_count() or 1, not args.no_thread_budget)
+
+    batch_args = (args.doc_type, args.engine, args.workers, not args.no_cache, not args.no_thread_budget)
+    if args.output == '-':
+        summary = run_batch(paths, sys.stdout, *batch_args)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            summary = run_batch(paths, output, *batch_args)
+
+    print(f"✅ {summary['documents']} documents ({summary['pages']} pages, "
+          f"{summary['text_layer_pages']} from a PDF text layer, {summary['blank_pages']} blank and "
+          f"{summary['duplicate_pages']} duplicate pages skipped, {summary['failed']} failed) "
+          f"in {summary['elapsed']:.1f}s - {summary['docs_per_sec']:.2f} docs/sec", file=sys.stderr)
+    return 0 if summary['failed'] == 0 else 2
+
+
+def cmd_serve(args):
+    """Run the HTTP OCR service"""
+    from service import serve
+
+    serve(args.host, args.port, args.stub)
+    return 0
+
+
+def cmd_jobs_submit(args):
+    """Queue one job per document (or PDF page)"""
+    from batch import collect_inputs
+    from job_queue import JobQueue
+
+    paths = collect_inputs(args.inputs)
+    if not paths:
+        print("❌ No supported images or PDFs found", file=sys.stderr)
+        return 1
+
+    queue = JobQueue(args.queue)
+    added = queue.submit(paths, args.doc_type, args.engine, args.per_page, args.max_attempts)
+    total = queue.status()['total']
+    queue.close()
+    print(f"✅ Queued {added} new jobs from {len(paths)} documents ({total} jobs in {args.queue})", file=sys.stderr)
+    return 0
+
+
+def _work(queue_path: str, results: str, exit_when_idle: bool, use_cache: bool, processes: int):
+    """Run one queue worker and report what it did"""
+    from job_queue import default_owner, run_worker
+
+    counts = run_worker(queue_path, results, exit_when_idle=exit_when_idle, use_cache=use_cache,
+                        processes=processes)
+    print(f"👷 {default_owner()}: {counts['done']} done, {counts['retried']} retried, {counts['failed']} failed, "
+          f"{counts['lost']} lost to other workers", file=sys.stderr)
+
+
+def cmd_jobs_work(args):
+    """Process queued jobs with one or more worker processes"""
+    import multiprocessing
+
+    results = args.results or args.queue + '.results'
+    worker_args = (args.queue, results, args.exit_when_idle, not args.no_cache, args.processes)
+    _print_thread_budget(args.processes)
+    if args.processes <= 1:
+        _work(*worker_args)
+        return 0
+
+    workers = [multiprocessing.Process(target=_work, args=worker_args) for _ in range(args.processes)]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        # Each worker hands its leased jobs back on Ctrl-C
+        for worker in workers:
+            worker.join()
+    return 0
+
+
+def cmd_jobs_status(args):
+    """Report queue progress and throughput"""
+    from job_queue import JobQueue
+
+    queue = JobQueue(args.queue)
+    status = queue.status()
+    failures = queue.failures(args.failures) if args.failures else []
+    queue.close()
+
+    if args.json:
+        print(json.dumps({**status, 'failures': failures}, indent=2))
+        return 0
+
+    eta = f"{status['eta_seconds'] / 60:.1f} min" if status['eta_seconds'] is not None else "n/a"
+    print(f"📊 {status['done']}/{status['total']} done ({status['progress']:.1%}), {status['pending']} pending, "
+          f"{status['running']} running, {status['failed']} failed")
+    print(f"⚡ {status['recent_jobs_per_sec']:.2f} jobs/sec recently, {status['jobs_per_sec']:.2f} overall, "
+          f"{status['active_workers']} active workers, {status['retries']} retries, ETA {eta}")
+    for failure in failures:
+        page = f" page {failure['page']}" if failure['page'] else ''
+        print(f"❌ #{failure['id']} {failure['source']}{page} after {failure['attempts']} attempts: {failure['error']}")
+    return 0
+
+
+def cmd_jobs_retry(args):
+    """Requeue failed jobs"""
+    from job_queue import JobQueue
+
+    queue = JobQueue(args.queue)
+    count = queue.retry_failed()
+    queue.close()
+    print(f"🔁 Requeued {count} failed jobs", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for all subcommands"""
+    parser = argparse.ArgumentParser(prog='ocr', description='AI OCR Engine command line tools')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Log model loading and each worker\'s effective thread settings')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    batch_parser = subparsers.add_parser('batch', help='OCR a folder or glob of images and PDFs')
+    batch_parser.add_argument('inputs', nargs='+', help='Directories, files or glob patterns')
+    batch_parser.add_argument('--doc-type', choices=DOCUMENT_TYPE_CHOICES, default='general')
+    batch_parser.add_argument('--engine', choices=ENGINE_CHOICES, default='tesseract')
+    batch_parser.add_argument('--workers', type=int, default=None,
+                              help='Worker processes (default: CPU count)')
+    batch_parser.add_argument('--output', '-o', default='-',
+                              help='JSONL output file (default: stdout)')
+    batch_parser.add_argument('--no-cache', action='store_true',
+                              help='Skip the OCR result cache')
+    batch_parser.add_argument('--no-thread-budget', action='store_true',
+                              help='Let every worker use all cores (see THREAD_CONFIG)')
+    batch_parser.set_defaults(func=cmd_batch)
+
+    serve_parser = subparsers.add_parser('serve', help='Run the HTTP OCR service')
+    serve_parser.add_argument('--host', default=None, help='Bind address (default: SERVICE_CONFIG)')
+    serve_parser.add_argument('--port', type=int, default=None, help='Port (default: SERVICE_CONFIG)')
+    serve_parser.add_argument('--stub', action='store_true',
+                              help='Answer with canned text instead of running OCR models, for local testing')
+    serve_parser.set_defaults(func=cmd_serve)
+
+    jobs_parser = subparsers.add_parser('jobs', help='Durable job queue for large batches')
+    jobs_subparsers = jobs_parser.add_subparsers(dest='jobs_command', required=True)
+
+    submit_parser = jobs_subparsers.add_parser('submit', help='Queue documents for OCR')
+    submit_parser.add_argument('queue', help='Queue file (SQLite), created if missing')
+    submit_parser.add_argument('inputs', nargs='+', help='Directories, files or glob patterns')
+    submit_parser.add_argument('--doc-type', choices=DOCUMENT_TYPE_CHOICES, default='general')
+    submit_parser.add_argument('--engine', choices=ENGINE_CHOICES, default='tesseract')
+    submit_parser.add_argument('--per-page', action='store_true', help='One job per PDF page instead of per document')
+    submit_parser.add_argument('--max-attempts', type=int, default=None,
+                               help='Attempts before a job is marked failed (default: JOBS_CONFIG)')
+    submit_parser.set_defaults(func=cmd_jobs_submit)
+
+    work_parser = jobs_subparsers.add_parser('work', help='Claim and process queued jobs')
+    work_parser.add_argument('queue', help='Queue file')
+    work_parser.add_argument('--results', default=None,
+                             help='Folder for per-job JSON results (default: <queue>.results)')
+    work_parser.add_argument('--processes', type=int, default=1, help='Worker processes on this machine')
+    work_parser.add_argument('--exit-when-idle', action='store_true',
+                             help='Stop once no jobs are pending or running')
+    work_parser.add_argument('--no-cache', action='store_true', help='Skip the OCR result cache')
+    work_parser.set_defaults(func=cmd_jobs_work)
+
+    status_parser = jobs_subparsers.add_parser('status', help='Show queue progress and throughput')
+    status_parser.add_argument('queue', help='Queue file')
+    status_parser.add_argument('--failures', type=int, default=5, help='Recent failures to list')
+    status_parser.add_argument('--json', action='store_true', help='Print machine-readable JSON')
+    status_parser.set_defaults(func=cmd_jobs_status)
+
+    retry_parser = jobs_subparsers.add_parser('retry', help='Requeue failed jobs')
+    retry_parser.add_argument('queue', help='Queue file')
+    retry_parser.set_defaults(func=cmd_jobs_retry)
+
+    return parser
+
+
+def main(argv=None):
+    """Main function"""
+    args = build_parser().parse_args(argv)
+    if args.verbose:
+        # Forked workers inherit the handler, so their logs reach stderr too
+        logging.basicConfig(level=logging.INFO, format='%(processName)s %(name)s: %(message)s')
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+Content-addressed cache for OCR results
+A bounded in-memory LRU sits in front of a SQLite store under OUTPUT_FOLDER,
+so re-uploaded scans skip recognition entirely
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from config import CACHE_CONFIG, ensure_directories
+from ocr_result import OCRResult
+
+logger = logging.getLogger('ocr.cache')
+
+
+def image_digest(image) -> str:
+    """Hash the decoded pixels of a PIL image or ndarray"""
+    pixels = np.ascontiguousarray(np.asarray(image))
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{pixels.shape}|{pixels.dtype}".encode())
+    digest.update(pixels.data)
+    return digest.hexdigest()
+
+
+def cache_key(image, engine: str, **settings) -> str:
+    """Build a cache key from image content plus engine, language and preprocessing settings"""
+    parts = json.dumps(settings, sort_keys=True, default=str)
+    return f"{engine}:{image_digest(image)}:{hashlib.blake2b(parts.encode(), digest_size=8).hexdigest()}"
+
+
+def _to_json(value) -> Any:
+    """Convert OCRResults and numpy scalars and arrays in OCR results to plain Python types"""
+    if isinstance(value, OCRResult):
+        return value.to_json()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+class OCRCache:
+    """Two-tier OCR result cache with size-based eviction and hit/miss counters"""
+
+    def __init__(self, path: Optional[str] = None, memory_bytes: int = None, disk_bytes: int = None):
+        self.path = path if path is not None else CACHE_CONFIG['path']
+        self.memory_bytes = memory_bytes if memory_bytes is not None else CACHE_CONFIG['memory_bytes']
+        self.disk_bytes = disk_bytes if disk_bytes is not None else CACHE_CONFIG['disk_bytes']
+
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._disk_used = 0
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0,
+                      'disk_errors': 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the SQLite store on first use"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                ensure_directories(directory)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON ocr_results (accessed)")
+            self._conn.commit()
+            self._disk_used = self._stored_bytes(self._conn)
+        return self._conn
+
+    @staticmethod
+    def _stored_bytes(conn: sqlite3.Connection) -> int:
+        """Bytes stored by every process sharing the SQLite file"""
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_results").fetchone()[0]
+
+    def _remember(self, key: str, payload: str):
+        """Insert into the memory tier, evicting least recently used entries"""
+        if key in self._memory:
+            self._memory_used -= len(self._memory.pop(key))
+        self._memory[key] = payload
+        self._memory_used += len(payload)
+        while self._memory_used > self.memory_bytes and len(self._memory) > 1:
+            _, old = self._memory.popitem(last=False)
+            self._memory_used -= len(old)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached result, or None on a miss"""
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return json.loads(payload)
+
+            try:
+                conn = self._connection()
+                row = conn.execute("SELECT value FROM ocr_results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE ocr_results SET accessed = ? WHERE key = ?", (time.time(), key))
+                    conn.commit()
+            except sqlite3.Error as e:
+                # A locked or broken store only costs the disk tier; the memory tier keeps working
+                self._disk_error(e)
+                row = None
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            self._remember(key, row[0])
+            self.stats['disk_hits'] += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, value: Any):
+        """Store a JSON-serializable result in both tiers"""
+        payload = json.dumps(value, default=_to_json)
+        with self._lock:
+            self._remember(key, payload)
+            try:
+                conn = self._connection()
+                # Take the write lock first, so no other process changes the size between measuring and evicting
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO ocr_results (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                        (key, payload, len(payload), time.time())
+                    )
+                    self._evict_disk(conn)
+                    conn.commit()
+                except BaseException:
+                    # Never leave the transaction open, or every later BEGIN fails
+                    conn.rollback()
+                    raise
+                self.stats['writes'] += 1
+            except sqlite3.Error as e:
+                self._disk_error(e)
+
+    def _disk_error(self, error: sqlite3.Error):
+        """Count a failed disk read or write; the result stays in (or is missing from) memory only"""
+        self.stats['disk_errors'] += 1
+        logger.warning("OCR cache store %s unavailable, using memory only for this result: %s", self.path, error)
+
+    def _evict_disk(self, conn: sqlite3.Connection):
+        """Delete least recently used rows until the store fits in disk_bytes
+
+        The size is read from the database, since batch, job and page-pool
+        workers all write to the same file.
+        """
+        self._disk_used = self._stored_bytes(conn)
+        if self._disk_used <= self.disk_bytes:
+            return
+
+        excess = self._disk_used - self.disk_bytes
+        freed = 0
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM ocr_results ORDER BY accessed"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM ocr_results WHERE key = ?", stale)
+        self._disk_used -= freed
+        self.stats['evictions'] += len(stale)
+
+    def get_or_compute(self, key: str, compute):
+        """Return the cached result for key, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def summary(self) -> Dict[str, Any]:
+        """Counters plus current tier sizes"""
+        with self._lock:
+            lookups = self.stats['memory_hits'] + self.stats['disk_hits'] + self.stats['misses']
+            hits = lookups - self.stats['misses']
+            return dict(
+                self.stats,
+                hit_rate=round(hits / lookups, 4) if lookups else 0.0,
+                memory_entries=len(self._memory),
+                memory_bytes=self._memory_used,
+                disk_bytes=self._disk_used
+            )
+
+    def clear(self):
+        """Empty both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+            conn = self._connection()
+            conn.execute("DELETE FROM ocr_results")
+            conn.commit()
+            self._disk_used = 0
+
+    def close(self):
+        """Close the SQLite connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_cache: Optional[OCRCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[OCRCache]:
+    """Process-wide cache built from CACHE_CONFIG, or None when caching is disabled"""
+    global _default_cache
+    if not CACHE_CONFIG['enabled']:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = OCRCache()
+    return _default_cache
@@ -0,0 +1,458 @@
+from PIL import Image
+import numpy as np
+import time
+from typing import Dict, List, Any, Optional, Tuple
+import metrics
+from aadhar_roi import crop_regions, locate_card, parse_regions
+from backends import load_backend
+from cascade import covered_fraction, detections_to_text, low_confidence_regions, merge_detections
+from extraction import scan_fields
+from preprocessing import get_pipeline
+from model_registry import get_easyocr_reader
+from ocr_cache import cache_key
+from tesseract_pool import get_tesseract_pool
+from config import AADHAR_TEMPLATE, CASCADE_CONFIG, DEDUP_CONFIG, EASYOCR_CONFIG, RESIZE_CONFIG
+from ocr_result import OCRResult
+from page_dedup import PageIndex, fingerprint, is_duplicate
+from resolution import normalize_resolution, resize_signature
+
+class OCREngine:
+    def __init__(self, languages: List[str] = None, cache=None, tesseract_pool=None,
+                 normalize_resolution: bool = None, dedup: bool = None, **reader_options):
+        self.languages = languages or EASYOCR_CONFIG['languages']
+        # Config defaults first, so callers only pass what they want to change
+        self.reader_options = {'gpu': EASYOCR_CONFIG['gpu'], 'quantize': EASYOCR_CONFIG['quantize'],
+                               'runtime': EASYOCR_CONFIG['runtime'], **reader_options}
+        self.cache = cache
+        self.normalize_resolution = RESIZE_CONFIG['enabled'] if normalize_resolution is None else normalize_resolution
+        self._tesseract_pool = tesseract_pool
+        self._reader = None
+        # Skip OCR of blank pages and of pages repeated within a document (see page_dedup.py)
+        self.dedup = DEDUP_CONFIG['enabled'] if dedup is None else dedup
+
+    @property
+    def reader(self):
+        """Shared EasyOCR reader from the process-wide registry, loaded on first use"""
+        if self._reader is None:
+            self._reader = get_easyocr_reader(self.languages, **self.reader_options)
+        return self._reader
+
+    @property
+    def tesseract_pool(self):
+        """Tesseract pool this engine recognizes with (the process-wide one by default)"""
+        if self._tesseract_pool is None:
+            self._tesseract_pool = get_tesseract_pool()
+        return self._tesseract_pool
+
+    def _cached(self, image, engine: str, compute, **settings):
+        """Look up an OCR result by image content and settings, computing it on a miss"""
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(cache_key(image, engine, **settings), compute)
+
+    def _deduplicated(self, images: List[Image.Image], namespace: str, compute, blank,
+                      page_index: Optional[PageIndex] = None) -> List[Tuple[Any, str]]:
+        """compute(images) as (result, source) pairs, skipping blank and repeated pages
+
+        Only pages that are neither blank nor duplicates (page_dedup.is_duplicate)
+        of an earlier page of the same document are passed to compute.
+        page_index holds the document's earlier pages; without one, only pages
+        of this call are compared. source is 'ocr', 'duplicate' (an earlier
+        page's result reused) or 'blank' (`blank` returned).
+        """
+        if not self.dedup:
+            return [(result, 'ocr') for result in compute(images)] if images else []
+        page_index = PageIndex() if page_index is None else page_index
+        outputs = [None] * len(images)
+        pending = {}  # position -> (fingerprint, scope) of each page to compute
+        copies = {}   # position -> earlier position in this call that it duplicates
+        for i, image in enumerate(images):
+            image_array = np.asarray(image)
+            with metrics.span('dedup', **metrics.image_size(image_array)) as span:
+                page = fingerprint(image_array)
+                # Boxes are reused as they are, so only pages of the same size can match
+                scope = f"{namespace}:{image_array.shape[0]}x{image_array.shape[1]}"
+                if page['blank'] and DEDUP_CONFIG['skip_blank']:
+                    outputs[i] = (blank, 'blank')
+                    span['outcome'] = 'blank'
+                    continue
+                match = page_index.lookup(page, scope)
+                if match is not None:
+                    outputs[i] = (match[0], 'duplicate')
+                    span.update(outcome='duplicate', difference=round(match[1], 4))
+                    continue
+                # A page can also repeat one earlier in this same call, which is not indexed yet
+                earlier = next((j for j, (other, other_scope) in pending.items()
+                                if other_scope == scope and is_duplicate(page, other)), None)
+                if earlier is None:
+                    pending[i] = (page, scope)
+                    span['outcome'] = 'new'
+                else:
+                    copies[i] = earlier
+                    span['outcome'] = 'duplicate'
+
+        if pending:
+            for i, result in zip(pending, compute([images[i] for i in pending])):
+                outputs[i] = (result, 'ocr')
+                page_index.add(pending[i][0], pending[i][1], result)
+        for i, j in copies.items():
+            outputs[i] = (outputs[j][0], 'duplicate')
+        return outputs
+
+    def _normalize(self, image_array: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Rescale an image so text is near the target height (scale 1.0 when disabled)"""
+        if not self.normalize_resolution:
+            return image_array, 1.0
+        with metrics.span('resize', **metrics.image_size(image_array)) as span:
+            resized, span['scale'] = normalize_resolution(image_array)
+        return resized, span['scale']
+
+    def _resize_signature(self) -> str:
+        """Resize settings that affect results, for cache keys"""
+        return resize_signature() if self.normalize_resolution else 'off'
+        
+    def preprocess_image(self, image: Image.Image) -> np.ndarray:
+        """Preprocess image for better OCR results (stages from PREPROCESS_CONFIG['tesseract'])"""
+        pipeline = get_pipeline('tesseract')
+        with metrics.span('preprocess', engine='tesseract', **metrics.image_size(image)) as span:
+            processed = pipeline.run(image)
+            span['steps'] = pipeline.last_timings
+        return processed
+    
+    def extract_text_tesseract(self, image: Image.Image) -> str:
+        """Extract text using Tesseract OCR"""
+        return self.extract_text_tesseract_many([image])[0]
+
+    def _cached_many(self, arrays: List[np.ndarray], engine: str, compute, **settings) -> list:
+        """Batch form of _cached: look every image up, then compute all the misses with one compute(arrays)"""
+        keys = [None] * len(arrays)
+        results = [None] * len(arrays)
+        if self.cache is not None:
+            for i, image_array in enumerate(arrays):
+                keys[i] = cache_key(image_array, engine, **settings)
+                results[i] = self.cache.get(keys[i])
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            for i, result in zip(missing, compute([arrays[i] for i in missing])):
+                results[i] = result
+                if self.cache is not None:
+                    self.cache.put(keys[i], result)
+        return results
+
+    def _tesseract_settings(self) -> Dict[str, Any]:
+        """Tesseract settings that affect results, for cache keys"""
+        pool = self.tesseract_pool
+        return {'lang': pool.lang, 'config': pool.config, 'preprocess': get_pipeline('tesseract').signature,
+                'resize': self._resize_signature()}
+
+    def extract_text_tesseract_many(self, images: List[Image.Image]) -> List[str]:
+        """Extract text from several images with as few Tesseract start-ups as possible"""
+        def recognize(arrays: List[np.ndarray]) -> List[str]:
+            prepared = [self.preprocess_image(self._normalize(image_array)[0]) for image_array in arrays]
+            # Tesseract finds and reads text in one call, so this span covers detection too
+            with metrics.span('recognition', engine='tesseract', images=len(prepared)):
+                return self.tesseract_pool.recognize_many(prepared)
+
+        return self._cached_many([np.asarray(image) for image in images], 'tesseract', recognize,
+                                 **self._tesseract_settings())
+
+    def extract_words_tesseract_many(self, images: List[Image.Image]) -> List[List[Dict[str, Any]]]:
+        """Tesseract words with confidences (see TesseractPool.recognize_words_many), boxes in original pixels"""
+        def recognize(arrays: List[np.ndarray]) -> List[List[Dict[str, Any]]]:
+            resized = [self._normalize(image_array) for image_array in arrays]
+            prepared = [self.preprocess_image(image_array) for image_array, _ in resized]
+            with metrics.span('recognition', engine='tesseract', images=len(prepared)):
+                pages = self.tesseract_pool.recognize_words_many(prepared)
+            for words, (_, scale) in zip(pages, resized):
+                for word in words:
+                    word['box'] = [int(round(value / scale)) for value in word['box']]
+            return pages
+
+        return self._cached_many([np.asarray(image) for image in images], 'tesseract-words', recognize,
+                                 **self._tesseract_settings())
+    
+    def extract_text_easyocr(self, image: Image.Image) -> OCRResult:
+        """Extract text using EasyOCR"""
+        return self.extract_text_easyocr_many([image])[0]
+
+    def extract_text_easyocr_many(self, images: List[Image.Image], batch_size: int = None) -> List[OCRResult]:
+        """Extract text from several images, detecting and recognizing them in batches
+
+        batch_size is the number of similarly sized images detected together
+        (EASYOCR_CONFIG['batch_size'] by default).
+        """
+        pipeline = get_pipeline('easyocr')
+
+        def recognize(arrays: List[np.ndarray]) -> List[OCRResult]:
+            prepared = []
+            scales = []
+            for image_array in arrays:
+                # Detect on the normalized image, report boxes in original coordinates
+                resized, scale = self._normalize(image_array)
+                with metrics.span('preprocess', engine='easyocr', **metrics.image_size(resized)) as span:
+                    prepared.append(pipeline.run(resized))
+                    span['steps'] = pipeline.last_timings
+                scales.append(scale)
+
+            timings = {}
+            start = time.perf_counter()
+            recognized = self.reader.readtext_many(prepared, batch_size, timings=timings)
+            if timings:
+                for stage, elapsed in timings.items():
+                    metrics.record_span(stage, elapsed, engine='easyocr', images=len(prepared))
+            else:
+                metrics.record_span('recognition', (time.perf_counter() - start) * 1000,
+                                    engine='easyocr', images=len(prepared))
+            return [OCRResult.from_detections(result).scaled(scale) for result, scale in zip(recognized, scales)]
+
+        results = self._cached_many([np.asarray(image) for image in images], 'easyocr', recognize,
+                                    languages=self.languages, options=self.reader_options,
+                                    resize=self._resize_signature(), preprocess=pipeline.signature)
+        # Cache hits come back in the cache's JSON form
+        return [OCRResult.coerce(result) for result in results]
+
+    def extract_text_cascade(self, image: Image.Image) -> Tuple[str, OCRResult, Dict[str, Any]]:
+        """Tesseract first, EasyOCR only for low-confidence regions (see cascade.py)"""
+        return self.extract_text_cascade_many([image])[0]
+
+    def extract_text_cascade_many(self, images: List[Image.Image]) -> List[Tuple[str, OCRResult, Dict[str, Any]]]:
+        """Run the cascade over several images, re-reading all their escalated regions in one EasyOCR batch
+
+        Returns the text, the merged detections and a report with the
+        fraction of pixels escalated to EasyOCR, per image.
+        """
+        arrays = [np.asarray(image) for image in images]
+        pages = self.extract_words_tesseract_many(arrays)
+
+        plans = []
+        crops = []
+        for image_array, words in zip(arrays, pages):
+            height, width = image_array.shape[:2]
+            regions = low_confidence_regions(words, image_array.shape)
+            fraction = covered_fraction(regions, image_array.shape)
+            # Re-reading most of the page region by region costs more than reading it whole
+            if fraction > CASCADE_CONFIG['page_fraction'] or (not words and CASCADE_CONFIG['escalate_empty']):
+                regions = [(0, 0, width, height)]
+                fraction = 1.0
+            plans.append((regions, len(crops), fraction))
+            crops.extend(image_array[top:bottom, left:right] for left, top, right, bottom in regions)
+
+        pixels = [image_array.shape[0] * image_array.shape[1] for image_array in arrays]
+        escalated = sum(fraction * count for (_, _, fraction), count in zip(plans, pixels))
+        with metrics.span('escalate', engine='cascade', images=len(arrays), regions=len(crops),
+                          escalated_fraction=round(escalated / max(sum(pixels), 1), 4)):
+            region_results = self.extract_text_easyocr_many(crops) if crops else []
+
+        outputs = []
+        for words, (regions, first, fraction) in zip(pages, plans):
+            detections = merge_detections(words, regions, region_results[first:first + len(regions)])
+            report = {'escalated_fraction': round(fraction, 4), 'regions': len(regions), 'words': len(words)}
+            outputs.append((detections_to_text(detections), detections, report))
+        return outputs
+    
+    def extract_text(self, image: Image.Image, engine: str) -> Tuple[str, Optional[OCRResult]]:
+        """Run the named engine ('easyocr', 'tesseract' or 'cascade'), returning text and any detections
+
+        Tesseract's plain-text output has no boxes, so its detections are None.
+        """
+        return self.extract_text_many([image], engine)[0]
+
+    def extract_text_many(self, images: List[Image.Image], engine: str) -> List[Tuple[str, Optional[OCRResult]]]:
+        """extract_text over several images, batching Tesseract calls and EasyOCR inference"""
+        return [(text, detections) for text, detections, _ in self.read_pages(images, engine)]
+
+    def read_pages(self, images: List[Image.Image], engine: str,
+                   page_index: Optional[PageIndex] = None) -> List[Tuple[str, Optional[OCRResult], str]]:
+        """extract_text_many that also says how each page was read
+
+        The images are pages of one document. The source is 'ocr',
+        'duplicate' (an earlier page's result reused) or 'blank' (no text,
+        OCR skipped); see page_dedup.py. Pass the same page_index for every
+        call on one document to compare pages across calls.
+        """
+        blank = ('', None if engine not in ('easyocr', 'cascade') else OCRResult.empty())
+        pages = self._deduplicated(images, engine, lambda pending: self._extract_text_many(pending, engine), blank,
+                                   page_index)
+        return [(text, detections, source) for (text, detections), source in pages]
+
+    def _extract_text_many(self, images: List[Image.Image], engine: str) -> List[Tuple[str, Optional[OCRResult]]]:
+        """OCR every image with the named engine (Tesseract for unknown names)"""
+        if engine == 'easyocr':
+            return [(results.text, results) for results in self.extract_text_easyocr_many(images)]
+        if engine == 'cascade':
+            return [(text, detections) for text, detections, _ in self.extract_text_cascade_many(images)]
+        return [(text, None) for text in self.extract_text_tesseract_many(images)]
+    
+    def read_aadhar(self, image: Image.Image, engine: str) -> Tuple[str, Optional[OCRResult], Dict[str, Any]]:
+        """OCR an Aadhar card region by region (AADHAR_TEMPLATE), falling back to the full page
+
+        Returns the text, any EasyOCR detections and the parsed fields, whose
+        'method' entry says which path produced them: 'template', 'full_page',
+        or 'template+full_page' when the regions gave a valid number but no
+        DOB and the empty fields were filled in from the full page.
+        """
+        # Never deduplicated: two cards differ only in field text, which no page comparison can rule out
+        if AADHAR_TEMPLATE['enabled']:
+            image_array = np.asarray(image)
+            # Regions may be read by EasyOCR, whose output depends on the reader's quantization and runtime
+            settings = {'template': AADHAR_TEMPLATE, 'languages': self.languages, 'options': self.reader_options,
+                        'preprocess': get_pipeline('tesseract').signature}
+            texts = self._cached(image_array, f'{engine}-aadhar-roi',
+                                 lambda: self._read_aadhar_regions(image_array, engine), **settings)
+            if texts:
+                parsed = parse_regions(texts)
+                # Without a readable number the crops probably missed the layout
+                if parsed['aadhar_number'] and parsed['dob']:
+                    text = '\n'.join(texts[name] for name in AADHAR_TEMPLATE['regions'] if texts[name])
+                    return text, None, dict(parsed, method='template')
+                if parsed['aadhar_number']:
+                    # The date sat outside its region or did not read; fill the gaps from the full page
+                    text, detections = self._extract_text_many([image], engine)[0]
+                    full_page = self.parse_document(text, 'aadhar')
+                    merged = {name: value or full_page[name] for name, value in parsed.items()}
+                    return text, detections, dict(merged, method='template+full_page')
+
+        text, detections = self._extract_text_many([image], engine)[0]
+        parsed = self.parse_document(text, 'aadhar')
+        return text, detections, dict(parsed, method='full_page')
+
+    def _read_aadhar_regions(self, image_array: np.ndarray, engine: str) -> Dict[str, str]:
+        """Text of each template region, or {} when no card is found"""
+        with metrics.span('locate', **metrics.image_size(image_array)) as span:
+            card = locate_card(image_array)
+            span['found'] = card is not None
+        if card is None:
+            return {}
+
+        crops = crop_regions(card)
+        digit_regions = set(AADHAR_TEMPLATE['digit_regions'])
+        allowlist = AADHAR_TEMPLATE['digit_allowlist']
+        texts = {}
+
+        if engine == 'easyocr':
+            cv2 = load_backend('opencv')
+            with metrics.span('recognition', engine='easyocr', regions=len(crops)):
+                for name, crop in crops.items():
+                    gray = crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+                    height, width = gray.shape
+                    # Each crop is one known box, so the detector is skipped entirely
+                    results = self.reader.recognize(gray, [[0, width, 0, height]], [],
+                                                    allowlist=allowlist if name in digit_regions else None)
+                    texts[name] = ' '.join(result[1] for result in results)
+            return texts
+
+        # Tesseract reads each crop as a single line; numeric crops use a digit whitelist
+        for digits, config in ((False, '--psm 7'), (True, f'--psm 7 -c tessedit_char_whitelist={allowlist}')):
+            names = [name for name in crops if (name in digit_regions) == digits]
+            if not names:
+                continue
+            with metrics.span('recognition', engine='tesseract', regions=len(names)):
+                results = get_tesseract_pool(config).recognize_many([self.preprocess_image(crops[name])
+                                                                     for name in names])
+            texts.update((name, text.strip()) for name, text in zip(names, results))
+        return texts
+
+    def parse_resume(self, text: str) -> Dict[str, Any]:
+        """Parse resume text and extract structured information"""
+        resume_data = {
+            'name': '',
+            'email': '',
+            'phone': '',
+            'skills': [],
+            'experience': [],
+            'education': []
+        }
+        
+        fields = scan_fields(text)
+        
+        # Extract email
+        if fields['emails']:
+            resume_data['email'] = fields['emails'][0]
+        
+        # Extract phone number
+        if fields['phones']:
+            resume_data['phone'] = fields['phones'][0]
+        
+        # Extract name (assuming it's in the first few lines)
+        lines = text.split('\n')
+        for line in lines[:5]:
+            line = line.strip()
+            if line and len(line.split()) <= 4 and not any(char.isdigit() for char in line):
+                if '@' not in line and len(line) > 3:
+                    resume_data['name'] = line
+                    break
+        
+        # Extract skills (whole-word matches against the configured keyword list)
+        resume_data['skills'] = fields['skills']
+        
+        return resume_data
+    
+    def parse_aadhar(self, text: str) -> Dict[str, Any]:
+        """Parse Aadhar card text and extract structured information"""
+        aadhar_data = {
+            'name': '',
+            'aadhar_number': '',
+            'dob': '',
+            'gender': '',
+            'address': ''
+        }
+        
+        fields = scan_fields(text)
+        
+        # Extract Aadhar number (12 digits)
+        if fields['aadhar_numbers']:
+            aadhar_data['aadhar_number'] = fields['aadhar_numbers'][0].replace(' ', '')
+        
+        # Extract DOB pattern (a DD/MM/YY date only when no date has a four-digit year)
+        if fields['dates']:
+            full_year = [date for date in fields['dates'] if len(date) == 10]
+            aadhar_data['dob'] = (full_year or fields['dates'])[0]
+        
+        # Extract gender
+        if 'female' in fields['genders']:
+            aadhar_data['gender'] = 'Female'
+        elif 'male' in fields['genders']:
+            aadhar_data['gender'] = 'Male'
+        
+        # Extract name (heuristic approach)
+        lines = text.split('\n')
+        for line in lines:
+            line = line.strip()
+            if line and len(line.split()) <= 4 and not any(char.isdigit() for char in line):
+                lowered = line.lower()
+                if 'government' not in lowered and 'india' not in lowered:
+                    aadhar_data['name'] = line
+                    break
+        
+        return aadhar_data
+    
+    def parse_handwritten_notes(self, text: str) -> Dict[str, Any]:
+        """Parse handwritten notes and provide basic structure"""
+        notes_data = {
+            'content': text,
+            'word_count': len(text.split()),
+            'line_count': 0,
+            'key_points': []
+        }
+        
+        # Extract potential key points (lines starting with bullet points or numbers)
+        lines = text.split('\n')
+        notes_data['line_count'] = len(lines)
+        for line in lines:
+            line = line.strip()
+            if line.startswith(('•', '-', '*')) or (line and line[0].isdigit() and '.' in line[:3]):
+                notes_data['key_points'].append(line)
+        
+        return notes_data
+
+    def parse_document(self, text: str, document_type: str) -> Dict[str, Any]:
+        """Parse text with the parser for the given document type key"""
+        with metrics.span('parse', chars=len(text)):
+            if document_type == 'resume':
+                return self.parse_resume(text)
+            elif document_type == 'aadhar':
+                return self.parse_aadhar(text)
+            elif document_type == 'notes':
+                return self.parse_handwritten_notes(text)
+            return {}
@@ -0,0 +1,180 @@
+"""
+Columnar OCR detections
+An OCRResult holds a page's detections as NumPy arrays (an N x 4 x 2 float32
+box array and a float32 confidence array) plus one string buffer with the
+texts joined by spaces and their (start, end) offsets into it, instead of a
+list of (box, text, confidence) tuples. Filtering, bucketing and rescaling
+work on whole arrays, the joined page text is the buffer itself, and the
+boxes and confidences become DataFrame columns without being copied.
+Iterating still yields (box, text, confidence) tuples for code written
+against EasyOCR's format.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Any, Sequence, Tuple
+
+import numpy as np
+
+from backends import load_backend
+
+# Columns of OCRResult.to_frame: the four corners of each box, clockwise from top-left
+BOX_COLUMNS = ['x0', 'y0', 'x1', 'y1', 'x2', 'y2', 'x3', 'y3']
+
+# Confidence bucket edges used by OCRResult.buckets (and utils.format_extraction_results)
+CONFIDENCE_BUCKETS = {'low': 0.0, 'medium': 0.6, 'high': 0.8}
+
+
+class OCRResult:
+    """A page's detections as box, confidence and text-offset arrays over one text buffer"""
+
+    __slots__ = ('boxes', 'confidences', 'buffer', 'offsets')
+
+    def __init__(self, boxes: np.ndarray, confidences: np.ndarray, buffer: str, offsets: np.ndarray):
+        self.boxes = boxes
+        self.confidences = confidences
+        self.buffer = buffer
+        self.offsets = offsets
+
+    @classmethod
+    def empty(cls) -> 'OCRResult':
+        return cls(np.zeros((0, 4, 2), dtype=np.float32), np.zeros(0, dtype=np.float32), '',
+                   np.zeros((0, 2), dtype=np.int64))
+
+    @classmethod
+    def from_columns(cls, boxes, texts: Sequence[str], confidences) -> 'OCRResult':
+        """Build a result from parallel boxes, texts and confidences"""
+        if not len(texts):
+            return cls.empty()
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+        # Each text is followed by one separator, so start i is the sum of the previous lengths plus i
+        starts = np.concatenate(([0], np.cumsum(lengths[:-1] + 1)))
+        offsets = np.stack([starts, starts + lengths], axis=1)
+        return cls(np.asarray(boxes, dtype=np.float32).reshape(-1, 4, 2),
+                   np.asarray(confidences, dtype=np.float32), ' '.join(texts), offsets)
+
+    @classmethod
+    def from_detections(cls, detections: Iterable[tuple]) -> 'OCRResult':
+        """Build a result from EasyOCR-style (box, text, confidence) detections"""
+        detections = list(detections)
+        return cls.from_columns([detection[0] for detection in detections],
+                                [detection[1] for detection in detections],
+                                [detection[2] for detection in detections])
+
+    @classmethod
+    def coerce(cls, value) -> 'OCRResult':
+        """An OCRResult from an OCRResult, its to_json form or a list of detection tuples"""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            return cls.from_columns(value['boxes'], value['texts'], value['confidences'])
+        return cls.from_detections(value)
+
+    @classmethod
+    def concatenate(cls, results: Sequence['OCRResult']) -> 'OCRResult':
+        """One result holding every detection of several, in order"""
+        results = [result for result in results if len(result)]
+        if not results:
+            return cls.empty()
+        if len(results) == 1:
+            return results[0]
+        return cls.from_columns(np.concatenate([result.boxes for result in results]),
+                                [text for result in results for text in result.texts],
+                                np.concatenate([result.confidences for result in results]))
+
+    def __len__(self) -> int:
+        return len(self.confidences)
+
+    def __iter__(self) -> Iterator[tuple]:
+        for box, (start, end), confidence in zip(self.boxes.tolist(), self.offsets.tolist(),
+                                                 self._python_confidences()):
+            yield box, self.buffer[start:end], confidence
+
+    def __getitem__(self, index: int) -> tuple:
+        start, end = self.offsets[index]
+        return self.boxes[index].tolist(), self.buffer[start:end], round(float(self.confidences[index]), 6)
+
+    def _python_confidences(self) -> List[float]:
+        """Confidences as floats without float32 noise (0.9, not 0.8999999761581421)"""
+        return self.confidences.astype(np.float64).round(6).tolist()
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, OCRResult):
+            return NotImplemented
+        return (self.texts == other.texts and np.array_equal(self.boxes, other.boxes)
+                and np.array_equal(self.confidences, other.confidences))
+
+    def __repr__(self) -> str:
+        return f"OCRResult({len(self)} detections)"
+
+    @property
+    def texts(self) -> List[str]:
+        return [self.buffer[start:end] for start, end in self.offsets.tolist()]
+
+    @property
+    def text(self) -> str:
+        """Every detection's text joined by spaces"""
+        if not len(self):
+            return ''
+        offsets = self.offsets
+        # A selection keeps its parent's buffer, which then also holds texts it left out
+        if (offsets[0, 0] == 0 and offsets[-1, 1] == len(self.buffer)
+                and np.array_equal(offsets[1:, 0], offsets[:-1, 1] + 1)):
+            return self.buffer
+        return ' '.join(self.texts)
+
+    def select(self, index) -> 'OCRResult':
+        """Detections picked by a boolean mask or index array, sharing this result's text buffer"""
+        return OCRResult(self.boxes[index], self.confidences[index], self.buffer, self.offsets[index])
+
+    def filter(self, min_confidence: float) -> 'OCRResult':
+        """Detections with at least this confidence"""
+        return self.select(self.confidences >= min_confidence)
+
+    def bucket_indices(self, edges: Sequence[float] = None) -> np.ndarray:
+        """Bucket number of each detection: how many of the (ascending) edges its confidence reaches"""
+        edges = list(CONFIDENCE_BUCKETS.values())[1:] if edges is None else edges
+        return np.searchsorted(np.asarray(edges, dtype=np.float32), self.confidences, side='right')
+
+    def buckets(self) -> Dict[str, 'OCRResult']:
+        """Detections split into the CONFIDENCE_BUCKETS ranges"""
+        indices = self.bucket_indices()
+        return {name: self.select(indices == i) for i, name in enumerate(CONFIDENCE_BUCKETS)}
+
+    def scaled(self, scale: float) -> 'OCRResult':
+        """Boxes mapped from an image resized by `scale` back to the original, rounded to pixels"""
+        if scale == 1.0:
+            return self
+        return OCRResult(np.round(self.boxes / np.float32(scale)), self.confidences, self.buffer, self.offsets)
+
+    def translated(self, dx: float, dy: float) -> 'OCRResult':
+        """Boxes shifted by (dx, dy), e.g. from a crop into page coordinates"""
+        return OCRResult(self.boxes + np.array([dx, dy], dtype=np.float32), self.confidences,
+                         self.buffer, self.offsets)
+
+    def bounds(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Left, top, right and bottom of every box"""
+        minimum = self.boxes.min(axis=1)
+        maximum = self.boxes.max(axis=1)
+        return minimum[:, 0], minimum[:, 1], maximum[:, 0], maximum[:, 1]
+
+    def to_frame(self):
+        """DataFrame with text, confidence and box corner columns; the numeric columns are not copied"""
+        pd = load_backend('pandas')
+        corners = self.boxes.reshape(len(self), 8)
+        columns = {'text': self.texts, 'confidence': self.confidences}
+        # Column views into the box array; a dict keeps pandas from consolidating them into a copy
+        columns.update((name, corners[:, i]) for i, name in enumerate(BOX_COLUMNS))
+        return pd.DataFrame(columns, copy=False)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Columnar plain-Python form for the result cache (read back with coerce)"""
+        return {'boxes': self.boxes.tolist(), 'texts': self.texts, 'confidences': self._python_confidences()}
+
+    def to_list(self) -> List[list]:
+        """[box, text, confidence] lists, the shape API clients and JSON exports have always seen"""
+        return [list(detection) for detection in self]
+
+    def __getstate__(self):
+        return self.boxes, self.confidences, self.buffer, self.offsets
+
+    def __setstate__(self, state):
+        self.boxes, self.confidences, self.buffer, self.offsets = state
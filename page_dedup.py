@@ -0,0 +1,196 @@
+"""
+Blank and repeated pages of a document
+Bulk scans contain blank separator sheets and pages that repeat within one
+document. Each page is downscaled once to a small grayscale copy and reduced
+to an ink map (pixels well below the page's background level). A page with
+almost no ink there is checked again on a min-pooled copy, which keeps thin
+and faint strokes (pencil, light grey text) that averaging washes out, with
+a threshold set from the paper's own grain; only then is it blank. A page whose decoded pixels are identical to an
+earlier page of the same document (the OCR cache's digest) reuses its result.
+
+Near-duplicate matching is opt-in (DEDUP_CONFIG['near_duplicates']): pages
+whose ink-grid hash is close are aligned and compared ink against ink. That
+matches re-scans, but it also matches copies of one form that differ only in
+a name, a date or one digit of an ID number, since those change too little
+ink, so a page can be given another page's field values.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from backends import load_backend
+from config import DEDUP_CONFIG
+from ocr_cache import image_digest
+from resolution import downscale
+
+# Largest alignment shift between two pages, as a fraction of their size
+MAX_SHIFT = 0.05
+
+
+def _gray_thumbnail(image, side: int) -> np.ndarray:
+    """Grayscale copy of a PIL image or ndarray whose longest side is at most `side`"""
+    cv2 = load_backend('opencv')
+    pixels = np.asarray(image)
+    scale = side / max(pixels.shape[:2])
+    if scale < 1.0:
+        pixels = downscale(pixels, scale)
+    if pixels.ndim == 3:
+        # Shrinking first makes the colour conversion nearly free
+        pixels = cv2.cvtColor(pixels, cv2.COLOR_RGBA2GRAY if pixels.shape[2] == 4 else cv2.COLOR_RGB2GRAY)
+    return pixels
+
+
+def _min_pool_thumbnail(image, side: int) -> np.ndarray:
+    """Like _gray_thumbnail, but each halving keeps the darkest pixel of every 2 x 2 block
+
+    Averaging blends a stroke a few pixels wide into the paper around it
+    until a pencil line or light grey text no longer stands out.
+    """
+    cv2 = load_backend('opencv')
+    pixels = np.asarray(image)
+    if pixels.ndim == 3:
+        pixels = cv2.cvtColor(pixels, cv2.COLOR_RGBA2GRAY if pixels.shape[2] == 4 else cv2.COLOR_RGB2GRAY)
+    height, width = pixels.shape
+    scale = side / max(height, width)
+    if scale >= 1.0:
+        return pixels
+    target = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+    block = np.ones((2, 2), np.uint8)
+    while pixels.shape[1] >= target[0] * 2 and pixels.shape[0] >= target[1] * 2:
+        pixels = np.ascontiguousarray(cv2.erode(pixels, block, anchor=(0, 0))[::2, ::2])
+    if (pixels.shape[1], pixels.shape[0]) != target:
+        # Under 2x left: spread each dark pixel to its neighbour first, so the average keeps it
+        pixels = cv2.resize(cv2.erode(pixels, block, anchor=(0, 0)), target, interpolation=cv2.INTER_AREA)
+    return pixels
+
+
+def faint_ink(gray: np.ndarray) -> np.ndarray:
+    """Pixels of a thumbnail darker than the paper (its median level) by the blank check's margin
+
+    The margin is blank_contrast, or blank_noise times the paper's grain (a
+    robust standard deviation) when that is larger, so faint text on clean
+    paper counts as ink and the speckle of a noisy scan does not.
+    """
+    background = float(np.median(gray))
+    grain = 1.4826 * float(np.median(np.abs(gray.astype(np.float32) - background)))
+    return gray < background - max(DEDUP_CONFIG['blank_contrast'], DEDUP_CONFIG['blank_noise'] * grain)
+
+
+def is_blank(image, ink: Optional[np.ndarray] = None) -> bool:
+    """Whether a page has (almost) no ink; `ink` is its fingerprint ink map, if already computed
+
+    A page with ink in the (averaged) fingerprint map is not blank. One
+    without is looked at again on a min-pooled thumbnail before it is skipped.
+    """
+    limit = DEDUP_CONFIG['blank_ink_fraction']
+    if ink is not None and np.count_nonzero(ink) > limit * ink.size:
+        return False
+    faint = faint_ink(_min_pool_thumbnail(image, DEDUP_CONFIG['side']))
+    return bool(np.count_nonzero(faint) <= limit * faint.size)
+
+
+def fingerprint(image) -> Dict[str, Any]:
+    """A page's pixel digest, packed ink map and ink-grid hash, and whether it is blank"""
+    cv2 = load_backend('opencv')
+    gray = _gray_thumbnail(image, DEDUP_CONFIG['side'])
+    ink = gray < float(np.median(gray)) - DEDUP_CONFIG['ink_contrast']
+    hash_size = DEDUP_CONFIG['hash_size']
+    # A cell counts as inked once a few percent of it is ink, so paper noise never sets a bit
+    cells = cv2.resize(ink.astype(np.float32), (hash_size, hash_size), interpolation=cv2.INTER_AREA)
+    return {
+        'digest': image_digest(image),
+        'hash': np.packbits(cells > 0.05),
+        'ink': np.packbits(ink),
+        'shape': ink.shape,
+        'blank': is_blank(image, ink)
+    }
+
+
+def hash_distances(hashes: np.ndarray, page_hash: np.ndarray) -> np.ndarray:
+    """Differing bits between one packed hash and each row of a matrix of them"""
+    return np.unpackbits(np.bitwise_xor(hashes, page_hash), axis=1).sum(axis=1)
+
+
+def _ink_map(page: Dict[str, Any]) -> np.ndarray:
+    height, width = page['shape']
+    return np.unpackbits(page['ink'], count=height * width).reshape(height, width)
+
+
+def page_difference(first: Dict[str, Any], second: Dict[str, Any]) -> float:
+    """Share of the two pages' ink that has no ink within a pixel on the other page, once aligned"""
+    if first['shape'] != second['shape']:
+        return 1.0
+    cv2 = load_backend('opencv')
+    a, b = _ink_map(first), _ink_map(second)
+    total = int(a.sum()) + int(b.sum())
+    if not total:
+        return 0.0
+    (dx, dy), _ = cv2.phaseCorrelate(a.astype(np.float32), b.astype(np.float32))
+    height, width = a.shape
+    if abs(dx) <= MAX_SHIFT * width and abs(dy) <= MAX_SHIFT * height:
+        a = cv2.warpAffine(a, np.float32([[1, 0, dx], [0, 1, dy]]), (width, height))
+    kernel = np.ones((3, 3), np.uint8)
+    unmatched = (np.count_nonzero(a & (cv2.dilate(b, kernel) == 0)) +
+                 np.count_nonzero(b & (cv2.dilate(a, kernel) == 0)))
+    return unmatched / total
+
+
+def is_near_duplicate(first: Dict[str, Any], second: Dict[str, Any]) -> bool:
+    """Whether two fingerprinted pages look near-identical (blind to small field changes, see above)"""
+    return (hash_distances(first['hash'][None], second['hash'])[0] <= DEDUP_CONFIG['max_hash_distance']
+            and page_difference(first, second) <= DEDUP_CONFIG['max_difference'])
+
+
+def is_duplicate(first: Dict[str, Any], second: Dict[str, Any]) -> bool:
+    """Whether a page may reuse another's result under DEDUP_CONFIG"""
+    if DEDUP_CONFIG['exact'] and first['digest'] == second['digest']:
+        return True
+    return DEDUP_CONFIG['near_duplicates'] and is_near_duplicate(first, second)
+
+
+class PageIndex:
+    """Fingerprints and OCR results of the pages of one document read so far
+
+    Create one per document: results are only ever reused between pages of
+    the same document. Entries live in namespaces (engine and page size),
+    each keeping its `size` most recently used pages.
+    """
+
+    # Closest-hash candidates compared in detail per near-duplicate lookup
+    CANDIDATES = 3
+
+    def __init__(self, size: int = None):
+        self.size = size or DEDUP_CONFIG['index_size']
+        self._namespaces: Dict[str, OrderedDict] = {}
+
+    def lookup(self, page: Dict[str, Any], namespace: str) -> Optional[Tuple[Any, float]]:
+        """The result of an identical (or, if enabled, near-identical) earlier page and their difference"""
+        entries = self._namespaces.get(namespace)
+        if not entries:
+            return None
+        if DEDUP_CONFIG['exact'] and page['digest'] in entries:
+            entries.move_to_end(page['digest'])
+            return entries[page['digest']][1], 0.0
+        if not DEDUP_CONFIG['near_duplicates']:
+            return None
+        keys = list(entries)
+        distances = hash_distances(np.stack([entries[key][0]['hash'] for key in keys]), page['hash'])
+        for i in np.argsort(distances, kind='stable')[:self.CANDIDATES]:
+            if distances[i] > DEDUP_CONFIG['max_hash_distance']:
+                break
+            other, result = entries[keys[i]]
+            difference = page_difference(page, other)
+            if difference <= DEDUP_CONFIG['max_difference']:
+                entries.move_to_end(keys[i])
+                return result, difference
+        return None
+
+    def add(self, page: Dict[str, Any], namespace: str, result: Any):
+        """Remember a page's result, forgetting the least recently used page of a full namespace"""
+        entries = self._namespaces.setdefault(namespace, OrderedDict())
+        entries[page['digest']] = (page, result)
+        entries.move_to_end(page['digest'])
+        while len(entries) > self.size:
+            entries.popitem(last=False)
@@ -0,0 +1,195 @@
+"""
+Concurrent OCR of the pages of one document
+Tesseract pages run on a thread pool (each call is its own subprocess, so
+threads are enough); EasyOCR pages run on a process pool whose workers each
+hold a model. Results come back in page order and a failing page is reported
+on its own instead of aborting the document. A page given as a str (a PDF
+page's embedded text layer) becomes a result as it is, without OCR.
+"""
+
+import contextvars
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Iterable, Iterator, Optional, Union
+
+from PIL import Image
+
+import metrics
+from config import PARALLEL_CONFIG
+from thread_budget import apply_budget
+
+# Engines that load an EasyOCR model and therefore run in worker processes
+MODEL_ENGINES = ('easyocr', 'cascade')
+
+_pools: Dict[tuple, Executor] = {}
+_pools_lock = threading.Lock()
+
+# Engine owned by each EasyOCR worker process, built once by _init_process
+_process_engine = None
+
+
+def _init_process(languages, reader_options: Dict[str, Any], use_cache: bool, workers: int):
+    """Build the worker process's OCREngine and load its EasyOCR model once"""
+    global _process_engine
+    from ocr_engine import OCREngine
+    from ocr_cache import get_default_cache
+
+    # Before the model loads, so torch starts with this worker's share of the cores
+    apply_budget(workers)
+    _process_engine = OCREngine(languages, cache=get_default_cache() if use_cache else None, **reader_options)
+    _process_engine.reader
+
+
+def _read_page(engine, image: Image.Image, ocr_method: str, document_type: Optional[str]) -> tuple:
+    """(text, detections, source, parsed) of one page; parsed is only filled in for Aadhar cards
+
+    Cards go through read_aadhar, so every entry point reads them with the
+    same region template and full-page fallback.
+    """
+    if document_type == 'aadhar':
+        text, detections, parsed = engine.read_aadhar(image, ocr_method)
+        return text, detections, 'ocr', parsed
+    text, detections, source = engine.read_pages([image], ocr_method)[0]
+    return text, detections, source, None
+
+
+def _ocr_in_process(image: Image.Image, ocr_method: str, attributes: Dict[str, Any], document_type: str = None):
+    """Run OCR on one page inside a worker process, returning its spans for the parent to record"""
+    with metrics.context(**attributes), metrics.collect(forward=False) as spans:
+        output = _read_page(_process_engine, image, ocr_method, document_type)
+    return output, spans
+
+
+def _ocr_in_thread(engine, image: Image.Image, ocr_method: str, attributes: Dict[str, Any],
+                   document_type: str = None):
+    """Run OCR on one page on a pool thread with the page's span attributes"""
+    with metrics.context(**attributes):
+        return _read_page(engine, image, ocr_method, document_type), []
+
+
+def get_pool(ocr_method: str, workers: int, engine, processes: bool = None) -> Executor:
+    """Return a long-lived pool for this engine so worker models are loaded only once
+
+    EasyOCR and the cascade run in worker processes by default; processes=False
+    keeps any engine on threads (e.g. a stub engine that cannot be rebuilt in a child).
+    """
+    processes = ocr_method in MODEL_ENGINES if processes is None else processes
+    key = (ocr_method, workers, tuple(engine.languages), tuple(sorted(engine.reader_options.items())),
+           engine.cache is not None, processes)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            if processes:
+                # spawn keeps torch and the Streamlit server threads out of the children
+                pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_process,
+                    initargs=(engine.languages, engine.reader_options, engine.cache is not None, workers)
+                )
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ocr-page')
+            _pools[key] = pool
+    return pool
+
+
+def _discard_pool(pool: Executor):
+    """Forget a pool whose worker died so the next document starts a fresh one"""
+    with _pools_lock:
+        for key, cached in list(_pools.items()):
+            if cached is pool:
+                del _pools[key]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def submit_page(pool: Executor, image: Image.Image, ocr_method: str, engine,
+                attributes: Dict[str, Any] = None, document_type: str = None) -> Future:
+    """Start OCR of one page on a pool from get_pool; collect the outcome with page_result
+
+    With document_type 'aadhar' the page is read with OCREngine.read_aadhar
+    and its result includes the parsed fields.
+    """
+    attributes = metrics.current_attributes() if attributes is None else attributes
+    if isinstance(pool, ProcessPoolExecutor):
+        return pool.submit(_ocr_in_process, image, ocr_method, attributes, document_type)
+    # Threads get a copy of the caller's context so collect(...) around the caller sees their spans
+    return pool.submit(contextvars.copy_context().run, _ocr_in_thread, engine, image, ocr_method, attributes,
+                       document_type)
+
+
+def page_result(page_number: int, image: Image.Image, future: Future, pool: Executor) -> Dict[str, Any]:
+    """Collect one page's outcome, turning an exception into an error entry
+
+    Pages submitted as Aadhar cards also get their 'parsed' fields.
+    """
+    result = {'page': page_number, 'image': image, 'text': '', 'detections': None, 'error': None, 'source': 'ocr'}
+    try:
+        (result['text'], result['detections'], result['source'], parsed), spans = future.result()
+        if parsed is not None:
+            result['parsed'] = parsed
+        metrics.record_spans(spans)
+    except BrokenProcessPool as e:
+        _discard_pool(pool)
+        result['error'] = f"{type(e).__name__}: {e}"
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def text_layer_result(page_number: int, text: str) -> Dict[str, Any]:
+    """Result of a page read from its embedded text layer instead of OCR"""
+    return {'page': page_number, 'image': None, 'text': text, 'detections': None, 'error': None,
+            'source': 'text_layer'}
+
+
+def ocr_pages(pages: Iterable[Union[Image.Image, str]], ocr_method: str, engine, workers: int = None,
+              first_page: int = 1, document_type: str = None, processes: bool = None) -> Iterator[Dict[str, Any]]:
+    """OCR pages concurrently and yield one result dict per page in page order
+
+    Pages are numbered from first_page, for iterators that start part-way into
+    a document. str pages (embedded text from pdf_pages.iter_pdf_document)
+    are passed through without OCR. Aadhar pages (document_type 'aadhar')
+    are read with OCREngine.read_aadhar and come back with 'parsed' fields.
+
+    Only a bounded number of pages is in flight, so a streaming page iterator
+    keeps its memory ceiling. processes is passed on to get_pool.
+    """
+    workers = workers or PARALLEL_CONFIG[f'{ocr_method}_workers']
+    pool = get_pool(ocr_method, workers, engine, processes)
+
+    max_in_flight = workers * PARALLEL_CONFIG['queue_depth']
+    in_flight = deque()
+    page_iter = enumerate(pages, start=first_page)
+    exhausted = False
+
+    while in_flight or not exhausted:
+        while not exhausted and len(in_flight) < max_in_flight:
+            try:
+                page_number, image = next(page_iter)
+            except StopIteration:
+                exhausted = True
+                break
+            if isinstance(image, str):
+                in_flight.append((page_number, image, None))
+                continue
+            attributes = {**metrics.current_attributes(), 'page': page_number}
+            in_flight.append((page_number, image,
+                              submit_page(pool, image, ocr_method, engine, attributes, document_type)))
+
+        if in_flight:
+            page_number, image, future = in_flight.popleft()
+            if future is None:
+                yield text_layer_result(page_number, image)
+            else:
+                yield page_result(page_number, image, future, pool)
+
+
+def shutdown_pools():
+    """Stop every pool started by ocr_pages"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
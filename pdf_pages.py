@@ -0,0 +1,184 @@
+"""
+Streaming PDF rasterization
+Pages are rendered a small window at a time on a background thread, so memory
+stays flat regardless of page count and rendering page N+1 overlaps with OCR
+of page N. Pages with an embedded text layer (born-digital PDFs) can skip
+rendering entirely: iter_pdf_document yields their text instead of an image.
+"""
+
+import contextvars
+import logging
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+from itertools import groupby
+from typing import Dict, Iterator, Optional, Union
+
+from PIL import Image
+
+import metrics
+from backends import load_backend
+from config import PDF_CONFIG
+
+logger = logging.getLogger('ocr.pdf')
+
+_DONE = object()
+
+
+@contextmanager
+def _pdf_path(source: Union[str, bytes]) -> Iterator[str]:
+    """Yield a filesystem path for the PDF, spilling bytes to a temp file once"""
+    if isinstance(source, str):
+        yield source
+        return
+
+    handle = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+    try:
+        handle.write(source)
+        handle.close()
+        yield handle.name
+    finally:
+        os.remove(handle.name)
+
+
+def pdf_page_count(source: Union[str, bytes]) -> int:
+    """Number of pages in a PDF file (or PDF bytes), read with poppler's pdfinfo"""
+    with _pdf_path(source) as path:
+        return int(load_backend('pdf').pdfinfo_from_path(path)['Pages'])
+
+
+def render_pdf_page(source: Union[str, bytes], page: int, dpi: int = None, grayscale: bool = None) -> Image.Image:
+    """Rasterize a single page (1-based) of a PDF file or PDF bytes"""
+    dpi = dpi or PDF_CONFIG['dpi']
+    grayscale = PDF_CONFIG['grayscale'] if grayscale is None else grayscale
+    with _pdf_path(source) as path, metrics.span('rasterize', page=page, pages=1, dpi=dpi) as span:
+        images = load_backend('pdf').convert_from_path(path, dpi=dpi, first_page=page, last_page=page,
+                                                       grayscale=grayscale)
+        if not images:
+            raise ValueError(f"PDF has no page {page}")
+        span.update(metrics.image_size(images[0]))
+    return images[0]
+
+
+def iter_pdf_pages(source: Union[str, bytes], dpi: int = None, grayscale: bool = None,
+                   window: int = None, prefetch: int = None,
+                   first_page: int = 1, last_page: int = None) -> Iterator[Image.Image]:
+    """Yield PDF pages one at a time while the next window is rasterized in the background
+
+    Only pages first_page to last_page (default: the last page) are rendered.
+    At most (prefetch + 1) windows of pages are alive at once.
+    """
+    dpi = dpi or PDF_CONFIG['dpi']
+    grayscale = PDF_CONFIG['grayscale'] if grayscale is None else grayscale
+    window = max(1, window or PDF_CONFIG['window'])
+    prefetch = max(1, prefetch or PDF_CONFIG['prefetch'])
+    pdf2image = load_backend('pdf')
+
+    with _pdf_path(source) as path:
+        page_count = pdf_page_count(path)
+        end = min(last_page or page_count, page_count)
+        pages: "queue.Queue" = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+
+        def rasterize():
+            try:
+                for start in range(first_page, end + 1, window):
+                    if stop.is_set():
+                        break
+                    stop_page = min(start + window - 1, end)
+                    with metrics.span('rasterize', page=start, pages=stop_page - start + 1,
+                                      page_count=page_count, dpi=dpi) as span:
+                        images = pdf2image.convert_from_path(
+                            path, dpi=dpi, first_page=start, last_page=stop_page, grayscale=grayscale
+                        )
+                        if images:
+                            span.update(metrics.image_size(images[0]))
+                    pages.put(images)
+            except Exception as e:
+                pages.put(e)
+            pages.put(_DONE)
+
+        # Run in a copy of the caller's context so spans keep its document attributes
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(rasterize,),
+                                  name='pdf-rasterizer', daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = pages.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                while item:
+                    yield item.pop(0)
+        finally:
+            # Unblock the producer if the consumer stopped early
+            stop.set()
+            while worker.is_alive():
+                try:
+                    pages.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+
+def has_text_layer(text: str) -> bool:
+    """Whether a page's extracted text is real text rather than a stray header or undecodable glyphs"""
+    characters = sum(1 for char in text if char.isalnum())
+    if characters < PDF_CONFIG['text_layer_min_chars']:
+        return False
+    # Fonts without a Unicode map extract as replacement or control characters
+    junk = sum(1 for char in text if char == '\ufffd' or (char < ' ' and char not in '\n\r\t'))
+    return junk * 10 < characters
+
+
+def pdf_text_layer(source: Union[str, bytes], first_page: int = 1,
+                   last_page: int = None) -> Dict[int, Optional[str]]:
+    """Embedded text of pages first_page to last_page (default: the last page), None for image-only pages
+
+    Read with poppler's pdftotext, installed alongside the pdfinfo and
+    pdftoppm that pdf2image runs. Returns {} when pdftotext is missing or
+    fails, so callers OCR every page.
+    """
+    command = ['pdftotext', '-enc', 'UTF-8', '-f', str(first_page)]
+    if last_page:
+        command += ['-l', str(last_page)]
+    with _pdf_path(source) as path, metrics.span('text_layer', page=first_page) as span:
+        try:
+            result = subprocess.run(command + [path, '-'], capture_output=True, check=True,
+                                    timeout=PDF_CONFIG['text_layer_timeout'])
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning("Could not read the PDF text layer, OCR'ing every page: %s", e)
+            span['error'] = True
+            return {}
+        # pdftotext ends every page, including the last, with a form feed
+        texts = result.stdout.decode('utf-8', errors='replace').split('\f')[:-1]
+        layer = {number: text.strip() if has_text_layer(text) else None
+                 for number, text in enumerate(texts, start=first_page)}
+        span.update(pages=len(layer), text_pages=sum(1 for text in layer.values() if text is not None))
+    return layer
+
+
+def iter_pdf_document(source: Union[str, bytes], first_page: int = 1, last_page: int = None,
+                      text_layer: bool = None, **kwargs) -> Iterator[Union[str, Image.Image]]:
+    """Yield every page from first_page to last_page in order: its embedded text, or a rendered image
+
+    Pages with a text layer come out as a str and are never rasterized; the
+    rest are rendered by iter_pdf_pages with the given keyword arguments.
+    text_layer=False (default: PDF_CONFIG['text_layer']) renders every page.
+    """
+    text_layer = PDF_CONFIG['text_layer'] if text_layer is None else text_layer
+    with _pdf_path(source) as path:
+        layer = pdf_text_layer(path, first_page, last_page) if text_layer else {}
+        if not layer:
+            yield from iter_pdf_pages(path, first_page=first_page, last_page=last_page, **kwargs)
+            return
+        # Runs of image-only pages are streamed through one rasterizer each
+        for has_text, run in groupby(sorted(layer), key=lambda number: layer[number] is not None):
+            run = list(run)
+            if has_text:
+                yield from (layer[number] for number in run)
+            else:
+                yield from iter_pdf_pages(path, first_page=run[0], last_page=run[-1], **kwargs)
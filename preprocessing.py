@@ -0,0 +1,169 @@
+"""
+Configurable image preprocessing pipeline
+Stages are declared as (name, params) pairs, e.g. in PREPROCESS_CONFIG.
+Intermediate results are written into buffers that are reused for every image
+of the same size, stages that would not change the image are skipped, and the
+time spent in each stage is recorded.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backends import load_backend
+from config import PREPROCESS_CONFIG
+
+# Image sizes whose scratch buffers are kept per thread
+MAX_BUFFER_SHAPES = 4
+
+
+def _grayscale(cv2, src, dst, order: str = 'rgb'):
+    """Convert 3 or 4 channel images to one channel in a single conversion"""
+    if src.shape[2] == 4:
+        code = cv2.COLOR_RGBA2GRAY if order == 'rgb' else cv2.COLOR_BGRA2GRAY
+    else:
+        code = cv2.COLOR_RGB2GRAY if order == 'rgb' else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(src, code, dst=dst)
+
+
+def _denoise(cv2, src, dst, ksize: int = 5):
+    """Median blur to remove salt-and-pepper noise"""
+    return cv2.medianBlur(src, ksize, dst=dst)
+
+
+def _clahe(cv2, src, dst, clip_limit: float = 2.0, tile_grid_size: int = 8):
+    """Contrast-limited adaptive histogram equalization"""
+    clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(tile_grid_size, tile_grid_size))
+    return clahe.apply(src, dst=dst)
+
+
+def _threshold(cv2, src, dst, block_size: int = 11, c: int = 2):
+    """Adaptive Gaussian threshold to a black and white image"""
+    return cv2.adaptiveThreshold(src, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+                                 block_size, c, dst=dst)
+
+
+def _morphology(cv2, src, dst, operation: str = 'close', kernel_size: int = 3, iterations: int = 1):
+    """Morphological open/close/erode/dilate with a square kernel"""
+    operations = {'open': cv2.MORPH_OPEN, 'close': cv2.MORPH_CLOSE,
+                  'erode': cv2.MORPH_ERODE, 'dilate': cv2.MORPH_DILATE}
+    kernel = np.ones((kernel_size, kernel_size), np.uint8)
+    return cv2.morphologyEx(src, operations[operation], kernel, dst=dst, iterations=iterations)
+
+
+STAGES = {
+    'grayscale': _grayscale,
+    'denoise': _denoise,
+    'clahe': _clahe,
+    'threshold': _threshold,
+    'morphology': _morphology,
+}
+
+
+def _is_noop(name: str, params: Dict[str, Any]) -> bool:
+    """Stages whose parameters make them leave the image unchanged"""
+    if name == 'denoise':
+        return params.get('ksize', 5) <= 1
+    if name == 'clahe':
+        return params.get('clip_limit', 2.0) <= 0
+    if name == 'morphology':
+        return params.get('kernel_size', 3) <= 1 or params.get('iterations', 1) <= 0
+    return False
+
+
+class PreprocessPipeline:
+    """Run a sequence of preprocessing stages with reused buffers and per-stage timings"""
+
+    def __init__(self, stages: Sequence[Tuple[str, Dict[str, Any]]]):
+        for name, _ in stages:
+            if name not in STAGES:
+                raise ValueError(f"Unknown preprocessing stage '{name}'. Available: {', '.join(STAGES)}")
+        self.stages = [(name, dict(params)) for name, params in stages if not _is_noop(name, params)]
+        self.stats: Dict[str, Dict[str, float]] = {name: {'calls': 0, 'total_ms': 0.0} for name, _ in self.stages}
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def signature(self) -> str:
+        """Stable description of the stages, used in cache keys"""
+        if not self.stages:
+            return 'none'
+        return '/'.join(name + ''.join(f",{k}={v}" for k, v in sorted(params.items()))
+                        for name, params in self.stages)
+
+    @property
+    def last_timings(self) -> Dict[str, float]:
+        """Milliseconds spent in each stage for this thread's most recent image"""
+        return getattr(self._local, 'timings', {})
+
+    def _buffer(self, shape: Tuple[int, ...], slot: int) -> np.ndarray:
+        """Scratch buffer for this image size and ping-pong slot, kept per thread"""
+        cache = getattr(self._local, 'buffers', None)
+        if cache is None:
+            cache = self._local.buffers = OrderedDict()
+        buffers = cache.get(shape)
+        if buffers is None:
+            buffers = [np.empty(shape, np.uint8), np.empty(shape, np.uint8)]
+            cache[shape] = buffers
+            if len(cache) > MAX_BUFFER_SHAPES:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(shape)
+        return buffers[slot]
+
+    def run(self, image) -> np.ndarray:
+        """Apply every stage to an image (PIL image or ndarray) and return a new array"""
+        cv2 = load_backend('opencv')
+        current = np.asarray(image)
+        timings = {}
+
+        # Grayscale is the only stage that can be a no-op at run time (single-channel input)
+        active = [(name, params) for name, params in self.stages
+                  if not (name == 'grayscale' and current.ndim == 2)]
+
+        for index, (name, params) in enumerate(active):
+            # Intermediates land in the scratch buffers; the final stage allocates the result
+            if index == len(active) - 1:
+                dst = None
+            else:
+                shape = current.shape[:2] if name == 'grayscale' else current.shape
+                dst = self._buffer(shape, index % 2)
+            start = time.perf_counter()
+            current = STAGES[name](cv2, current, dst, **params)
+            timings[name] = (time.perf_counter() - start) * 1000
+
+        self._local.timings = timings
+        with self._stats_lock:
+            for name, elapsed in timings.items():
+                self.stats[name]['calls'] += 1
+                self.stats[name]['total_ms'] += elapsed
+        return current
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Call count, total and mean milliseconds per stage"""
+        with self._stats_lock:
+            return {
+                name: {
+                    'calls': stat['calls'],
+                    'total_ms': round(stat['total_ms'], 3),
+                    'mean_ms': round(stat['total_ms'] / stat['calls'], 3) if stat['calls'] else 0.0
+                }
+                for name, stat in self.stats.items()
+            }
+
+
+_pipelines: Dict[str, PreprocessPipeline] = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_pipeline(name: str, stages: Optional[Sequence[Tuple[str, Dict[str, Any]]]] = None) -> PreprocessPipeline:
+    """Shared pipeline for a PREPROCESS_CONFIG entry (or the given stages) so buffers and stats are reused"""
+    with _pipelines_lock:
+        pipeline = _pipelines.get(name)
+        if pipeline is None:
+            pipeline = PreprocessPipeline(stages if stages is not None else PREPROCESS_CONFIG[name])
+            _pipelines[name] = pipeline
+    return pipeline
@@ -0,0 +1,93 @@
+"""
+Resolution normalization before OCR
+Estimates the text height of a page from a small probe image and rescales the
+page so text lands near a target height, then maps detection boxes back to
+the original image's coordinates
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from backends import load_backend
+from config import RESIZE_CONFIG
+
+
+def downscale(image: np.ndarray, scale: float) -> np.ndarray:
+    """Shrink an image by repeated exact halving with INTER_AREA, then a linear resize for the rest
+
+    A single INTER_AREA resize by a non-integer factor is several times slower
+    on large photos and gives no visible benefit for text.
+    """
+    cv2 = load_backend('opencv')
+    height, width = image.shape[:2]
+    target = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+    while image.shape[1] >= target[0] * 2 and image.shape[0] >= target[1] * 2:
+        image = cv2.resize(image, (image.shape[1] // 2, image.shape[0] // 2), interpolation=cv2.INTER_AREA)
+    if (image.shape[1], image.shape[0]) != target:
+        image = cv2.resize(image, target, interpolation=cv2.INTER_LINEAR)
+    return image
+
+
+def estimate_text_height(image: np.ndarray, probe_side: int = None) -> Optional[float]:
+    """Median height in pixels of text-like connected components, or None if too few are found"""
+    cv2 = load_backend('opencv')
+    probe_side = probe_side or RESIZE_CONFIG['probe_side']
+
+    probe_scale = min(1.0, probe_side / max(image.shape[:2]))
+    probe = downscale(image, probe_scale) if probe_scale < 1.0 else image
+    gray = probe if probe.ndim == 2 else cv2.cvtColor(probe, cv2.COLOR_RGB2GRAY)
+
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+
+    # Drop specks, rules, borders and photos: keep glyph-sized, glyph-shaped blobs
+    text_like = (
+        (heights >= 3) & (heights < gray.shape[0] * 0.1) &
+        (widths < gray.shape[1] * 0.2) &
+        (widths < heights * 8) & (heights < widths * 12)
+    )
+    if np.count_nonzero(text_like) < RESIZE_CONFIG['min_components']:
+        return None
+    return float(np.median(heights[text_like])) / probe_scale
+
+
+def choose_scale(shape: Tuple[int, ...], text_height: Optional[float]) -> float:
+    """Scale factor that brings text to the target height within the configured limits"""
+    scale = 1.0
+    if text_height:
+        scale = RESIZE_CONFIG['target_text_height'] / text_height
+        scale = min(max(scale, RESIZE_CONFIG['min_scale']), RESIZE_CONFIG['max_scale'])
+
+    # Never hand the detector more pixels than it can use
+    scale = min(scale, RESIZE_CONFIG['max_side'] / max(shape[:2]))
+
+    # Not worth a resample for small adjustments
+    if abs(scale - 1.0) < RESIZE_CONFIG['tolerance']:
+        return 1.0
+    return scale
+
+
+def normalize_resolution(image: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Resize an image so its text is near the target height, returning the image and scale used"""
+    scale = choose_scale(image.shape, estimate_text_height(image))
+    if scale == 1.0:
+        return image, scale
+
+    if scale < 1.0:
+        resized = downscale(image, scale)
+    else:
+        cv2 = load_backend('opencv')
+        resized = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    # Report the scale actually applied after rounding to whole pixels
+    return resized, resized.shape[1] / image.shape[1]
+
+
+def resize_signature() -> str:
+    """Describe the resize settings for cache keys"""
+    if not RESIZE_CONFIG['enabled']:
+        return 'off'
+    return (f"text{RESIZE_CONFIG['target_text_height']}/side{RESIZE_CONFIG['max_side']}"
+            f"/scale{RESIZE_CONFIG['min_scale']}-{RESIZE_CONFIG['max_scale']}")
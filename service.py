@@ -0,0 +1,448 @@
+"""
+HTTP OCR service
+An asyncio front end hands requests to one bounded queue per engine. Each
+engine has a fixed number of consumers (its concurrency limit) that run OCR
+on the page pools from page_pool.py, whose workers hold the models. When an
+engine's queue is full the request is turned away with 429 and a Retry-After
+estimate instead of piling up.
+
+Endpoints (request bodies are the raw image or PDF bytes):
+    GET  /health                            liveness
+    GET  /ready                             readiness and queue depths (503 until warmed up)
+    GET  /metrics                           Prometheus text from metrics.py
+    POST /ocr?engine=tesseract              text and detections per page
+    POST /parse/<doc_type>?engine=easyocr   the same plus parsed fields (resume, aadhar, notes, general)
+
+Usage: python -m ocr serve [--port 8502] [--stub]
+"""
+
+import asyncio
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+from PIL import Image
+
+import metrics
+from aadhar_roi import locate_card
+from config import SERVICE_CONFIG
+from decoding import decode_image_with_scale
+from ocr_engine import OCREngine
+from ocr_result import OCRResult
+from page_pool import ocr_pages, shutdown_pools
+
+DOCUMENT_TYPES = ('resume', 'aadhar', 'notes', 'general')
+
+STUB_TEXT = "Priya Sharma\npriya.sharma@example.com | 555-123-4567\nSkills: python, docker, sql"
+STUB_REGIONS = {'name': "Priya Sharma", 'dob': "DOB: 15/08/1990", 'gender': "Female", 'number': "2345 6789 0123"}
+
+
+class HTTPError(Exception):
+    """Error that is sent to the client as a JSON response with the given status"""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class StubEngine(OCREngine):
+    """OCREngine that returns canned text after a fixed delay instead of running a model
+
+    Parsing is the real implementation, so the service can be exercised end to
+    end without Tesseract or EasyOCR installed.
+    """
+
+    def __init__(self, text: str = STUB_TEXT, delay: float = 0.05, regions: Dict[str, str] = None):
+        # Every request pays the delay, as if each page were OCR'd
+        super().__init__(dedup=False)
+        self.text = text
+        self.delay = delay
+        self.regions = dict(STUB_REGIONS if regions is None else regions)
+
+    def _read_aadhar_regions(self, image_array: np.ndarray, engine: str) -> Dict[str, str]:
+        # The card is still located for real, so only card-shaped uploads take the template path
+        if locate_card(image_array) is None:
+            return {}
+        time.sleep(self.delay)
+        return dict(self.regions)
+
+    def _extract_text_many(self, images: List[Image.Image], engine: str) -> List[Tuple[str, Optional[OCRResult]]]:
+        return [self._extract_page(image, engine) for image in images]
+
+    def _extract_page(self, image: Image.Image, engine: str) -> Tuple[str, Optional[OCRResult]]:
+        time.sleep(self.delay)
+        if engine != 'easyocr':
+            return self.text, None
+        size = metrics.image_size(image)
+        width, height = size['width'], size['height']
+        lines = self.text.split('\n')
+        step = height // max(len(lines), 1)
+        detections = OCRResult.from_detections(
+            ([[0, i * step], [width, i * step], [width, (i + 1) * step], [0, (i + 1) * step]], line, 0.99)
+            for i, line in enumerate(lines))
+        return detections.text, detections
+
+
+def _json_default(value):
+    """Convert OCRResults and numpy values in OCR results for json.dumps"""
+    if isinstance(value, OCRResult):
+        # The [box, text, confidence] lists clients have always received
+        return value.to_list()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _pdf_pages(body: bytes) -> Iterator[Union[Image.Image, str]]:
+    """A PDF's pages, rasterized as they are pulled; a PDF that fails part-way is a bad request"""
+    from pdf_pages import iter_pdf_document
+    try:
+        yield from iter_pdf_document(body)
+    except Exception as e:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Body is not a readable PDF: {e}")
+
+
+def decode_document(body: bytes, content_type: str = '',
+                    grayscale: bool = False) -> Tuple[Iterable[Union[Image.Image, np.ndarray, str]], int, float]:
+    """Decode a request body into pages: one decoded array, or a PDF's pages (text-layer pages as str)
+
+    PDF pages are not rendered here but come from an iterator, so the lane
+    rasterizes them only as its workers free up. Also returns the page count
+    and the pages' scale relative to the upload, below 1.0 when a large JPEG
+    was decoded at reduced size.
+    """
+    if content_type == 'application/pdf' or body.startswith(b'%PDF'):
+        from pdf_pages import pdf_page_count
+        try:
+            page_count = pdf_page_count(body)
+        except Exception as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Body is not a readable PDF: {e}")
+        if page_count > SERVICE_CONFIG['max_pdf_pages']:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            f"PDF has {page_count} pages, more than {SERVICE_CONFIG['max_pdf_pages']}")
+        return _pdf_pages(body), page_count, 1.0
+    try:
+        image, scale = decode_image_with_scale(body, grayscale)
+        return [image], 1, scale
+    except Exception as e:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Body is not a readable image or PDF: {e}")
+
+
+class EngineLane:
+    """Bounded queue and fixed set of consumers for one OCR engine"""
+
+    def __init__(self, name: str, engine: OCREngine, workers: int, queue_size: int, processes: bool = None):
+        self.name = name
+        self.engine = engine
+        self.workers = workers
+        self.processes = processes
+        self.queue: Optional[asyncio.Queue] = None
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.ready = False
+        # Moving average of request run time, used for Retry-After
+        self.mean_seconds: Optional[float] = None
+        self._consumers: List[asyncio.Task] = []
+        # One thread per consumer feeds its document's pages to the page pool
+        self._feeders: Optional[ThreadPoolExecutor] = None
+
+    async def start(self):
+        """Start the consumers and warm the engine up with a blank page"""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._feeders = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f'lane-{self.name}')
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+        await self._run([Image.new('RGB', (64, 32), 'white')], {'warmup': True})
+        self.ready = True
+
+    async def stop(self):
+        """Cancel the consumers"""
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        if self._feeders is not None:
+            self._feeders.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def full(self) -> bool:
+        return self.queue is None or self.queue.full()
+
+    def retry_after(self) -> int:
+        """Seconds until the queue has likely drained enough to accept another request"""
+        waiting = (self.queue.qsize() if self.queue else 0) + self.in_flight
+        return max(1, math.ceil(waiting * (self.mean_seconds or 1.0) / self.workers))
+
+    def reject(self):
+        """Raise the 429 sent when this engine cannot take more requests"""
+        raise HTTPError(HTTPStatus.TOO_MANY_REQUESTS, f"The {self.name} queue is full",
+                        {'Retry-After': str(self.retry_after())})
+
+    def enqueue(self, images: Iterable[Image.Image], document_type: Optional[str]) -> asyncio.Future:
+        """Queue a document (its pages, or an iterator over them), returning a future for its page results"""
+        job = {
+            'images': images,
+            'document_type': document_type,
+            'attributes': metrics.current_attributes(),
+            'future': asyncio.get_running_loop().create_future()
+        }
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.reject()
+        return job['future']
+
+    async def _run(self, images: Iterable[Image.Image], attributes: Dict[str, Any],
+                   document_type: str = None) -> List[Dict[str, Any]]:
+        """OCR every page of one document on the engine's page pool; text-layer pages (str) are not OCR'd
+
+        Pages are pulled from the iterable only as the pool has room for them
+        (page_pool.ocr_pages), so a PDF is rasterized while its earlier pages
+        are OCR'd rather than all up front. Aadhar pages are read with
+        OCREngine.read_aadhar and come back already parsed.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._feeders, self._ocr_document, images,
+                                                                attributes, document_type)
+
+    def _ocr_document(self, images: Iterable[Image.Image], attributes: Dict[str, Any],
+                      document_type: Optional[str]) -> List[Dict[str, Any]]:
+        """Feed one document's pages to the page pool and collect the results in page order"""
+        pages = []
+        with metrics.context(**attributes):
+            # get_pool (inside ocr_pages) replaces a pool that was discarded after a worker crash
+            for page in ocr_pages(images, self.name, self.engine, self.workers, document_type=document_type,
+                                  processes=self.processes):
+                # Responses never include page images, so rendered pages are not kept until the end
+                page.pop('image', None)
+                pages.append(page)
+        return pages
+
+    async def _consume(self):
+        """Take documents off the queue one at a time"""
+        while True:
+            job = await self.queue.get()
+            future = job['future']
+            if future.done():
+                # The client timed out or disconnected while the job was queued
+                self.queue.task_done()
+                continue
+
+            self.in_flight += 1
+            start = time.perf_counter()
+            try:
+                pages = await self._run(job['images'], job['attributes'], job['document_type'])
+                if job['document_type']:
+                    with metrics.context(**job['attributes']):
+                        for page in pages:
+                            if not page['error'] and 'parsed' not in page:
+                                page['parsed'] = self.engine.parse_document(page['text'], job['document_type'])
+                if not future.done():
+                    future.set_result(pages)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                elapsed = time.perf_counter() - start
+                self.mean_seconds = elapsed if self.mean_seconds is None else 0.8 * self.mean_seconds + 0.2 * elapsed
+                self.in_flight -= 1
+                self.queue.task_done()
+
+    def status(self) -> Dict[str, Any]:
+        """Queue depth and limits for the readiness endpoint"""
+        return {
+            'ready': self.ready,
+            'workers': self.workers,
+            'queued': self.queue.qsize() if self.queue else 0,
+            'queue_size': self.queue_size,
+            'in_flight': self.in_flight,
+            'mean_seconds': round(self.mean_seconds, 3) if self.mean_seconds is not None else None
+        }
+
+
+class OCRService:
+    """asyncio HTTP front end over one EngineLane per engine"""
+
+    def __init__(self, engine: OCREngine = None, stub: bool = False, engines: Dict[str, Dict[str, int]] = None):
+        self.engine = engine or (StubEngine() if stub else OCREngine())
+        # A stub engine cannot be rebuilt inside worker processes, so it always runs on threads
+        processes = False if isinstance(self.engine, StubEngine) else None
+        self.lanes = {
+            name: EngineLane(name, self.engine, limits['workers'], limits['queue_size'], processes)
+            for name, limits in (engines or SERVICE_CONFIG['engines']).items()
+        }
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._warmups: List[asyncio.Task] = []
+
+    async def start(self, host: str = None, port: int = None) -> asyncio.AbstractServer:
+        """Start listening; engines warm up in the background and /ready reports when they are done"""
+        self.server = await asyncio.start_server(self.handle, host or SERVICE_CONFIG['host'],
+                                                 SERVICE_CONFIG['port'] if port is None else port)
+        self._warmups = [asyncio.create_task(lane.start()) for lane in self.lanes.values()]
+        return self.server
+
+    async def stop(self):
+        """Stop accepting connections and cancel the lanes"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in self._warmups:
+            task.cancel()
+        for lane in self.lanes.values():
+            await lane.stop()
+
+    @property
+    def ready(self) -> bool:
+        return all(lane.ready for lane in self.lanes.values())
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one request per connection"""
+        try:
+            try:
+                method, target, headers, body = await self._read_request(reader)
+                status, payload, extra_headers = await self.route(method, target, headers, body)
+            except HTTPError as e:
+                status, payload, extra_headers = e.status, {'error': e.message}, e.headers
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            except Exception as e:
+                status, payload, extra_headers = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}, {}
+            writer.write(self._response(status, payload, extra_headers))
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+        """Read the request line, headers and body"""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), SERVICE_CONFIG['header_timeout'])
+        except asyncio.LimitOverrunError:
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request headers too large")
+        except asyncio.TimeoutError:
+            raise HTTPError(HTTPStatus.REQUEST_TIMEOUT, "Timed out reading request headers")
+
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length is not a number")
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length is negative")
+        if length > SERVICE_CONFIG['max_body_bytes']:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            f"Body larger than {SERVICE_CONFIG['max_body_bytes']} bytes")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, headers, body
+
+    async def route(self, method: str, target: str, headers: Dict[str, str],
+                    body: bytes) -> Tuple[int, Any, Dict[str, str]]:
+        """Dispatch a request to its endpoint"""
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+
+        if path == '/health':
+            return HTTPStatus.OK, {'status': 'ok'}, {}
+        if path == '/ready':
+            status = HTTPStatus.OK if self.ready else HTTPStatus.SERVICE_UNAVAILABLE
+            return status, {'ready': self.ready, 'engines': {n: l.status() for n, l in self.lanes.items()}}, {}
+        if path == '/metrics':
+            return HTTPStatus.OK, metrics.get_recorder().prometheus_text(), {}
+
+        if path == '/ocr':
+            document_type = None
+        elif path.startswith('/parse/'):
+            document_type = path[len('/parse/'):]
+            if document_type not in DOCUMENT_TYPES:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown document type '{document_type}'. "
+                                                      f"Available: {', '.join(DOCUMENT_TYPES)}")
+        else:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No endpoint at {path}")
+        if method != 'POST':
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{path} only accepts POST", {'Allow': 'POST'})
+        if not body:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Send the image or PDF as the request body")
+
+        engine = parse_qs(url.query).get('engine', ['tesseract'])[0]
+        lane = self.lanes.get(engine)
+        if lane is None:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Unknown engine '{engine}'. Available: {', '.join(self.lanes)}")
+        if not lane.ready:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, f"The {engine} engine is still loading",
+                            {'Retry-After': '5'})
+        # Turn the request away before spending time decoding it
+        if lane.full:
+            lane.reject()
+
+        with metrics.context(doc_type=document_type or 'general', engine=engine), \
+                metrics.span('document') as document_span:
+            loop = asyncio.get_running_loop()
+            with metrics.span('decode', bytes=len(body)):
+                # Tesseract reads one channel, so its JPEGs are decoded straight to luminance
+                images, page_count, scale = await loop.run_in_executor(None, decode_document, body,
+                                                                       headers.get('content-type', '').split(';')[0],
+                                                                       engine == 'tesseract')
+            document_span['pages'] = page_count
+            future = lane.enqueue(images, document_type)
+            try:
+                pages = await asyncio.wait_for(future, SERVICE_CONFIG['request_timeout'])
+            except asyncio.TimeoutError:
+                raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, "OCR did not finish in time")
+        # Boxes are returned in the uploaded image's coordinates
+        for page in pages:
+            if page['detections'] is not None:
+                page['detections'] = page['detections'].scaled(scale)
+
+        return HTTPStatus.OK, {
+            'engine': engine,
+            'document_type': document_type,
+            'pages': pages
+        }, {}
+
+    @staticmethod
+    def _response(status: int, payload: Any, headers: Dict[str, str]) -> bytes:
+        """Serialize a response; strings are sent as plain text, everything else as JSON"""
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), 'text/plain; version=0.0.4'
+        else:
+            body, content_type = json.dumps(payload, default=_json_default).encode(), 'application/json'
+        status = HTTPStatus(status)
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}", f"Content-Type: {content_type}",
+                 f"Content-Length: {len(body)}", "Connection: close"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+def serve(host: str = None, port: int = None, stub: bool = False):
+    """Run the service until interrupted"""
+    async def run():
+        service = OCRService(stub=stub)
+        server = await service.start(host, port)
+        addresses = ', '.join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+        print(f"🚀 OCR service listening on {addresses}{' (stub engine)' if stub else ''}", flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await service.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_pools()
@@ -0,0 +1,236 @@
+"""
+Tesseract backend that amortizes process start and model load
+Uses long-lived tesserocr API handles when tesserocr is installed; otherwise
+falls back to Tesseract's file-list mode, recognizing a whole batch of images
+with a single tesseract process instead of one process per image
+"""
+
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+from PIL import Image
+
+from backends import load_backend, is_available
+from config import TESSERACT_CONFIG
+from thread_budget import process_threads, subprocess_env
+
+PAGE_SEPARATOR = '\f'
+
+
+class TesseractPool:
+    """Recognize many images per Tesseract start-up, from any number of threads"""
+
+    def __init__(self, lang: str = None, config: str = '', workers: int = None,
+                 batch_size: int = None, mode: str = None):
+        self.lang = lang or TESSERACT_CONFIG['lang']
+        self.config = config
+        self.workers = workers or TESSERACT_CONFIG['pool_workers'] or process_threads()
+        self.batch_size = batch_size or TESSERACT_CONFIG['batch_size']
+        self.mode = mode or ('tesserocr' if is_available('tesserocr') else 'filelist')
+
+        self._apis: "queue.Queue" = queue.Queue()
+        self._api_count = 0
+        self._api_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # tesserocr mode: a bounded set of long-lived API handles, each with the model loaded once
+
+    @contextmanager
+    def _borrow_api(self):
+        """Check out an API handle, creating one if the pool is not yet full"""
+        try:
+            api = self._apis.get_nowait()
+        except queue.Empty:
+            api = None
+            with self._api_lock:
+                if self._api_count < self.workers:
+                    self._api_count += 1
+                    api = self._new_api()
+            if api is None:
+                api = self._apis.get()
+        try:
+            yield api
+        finally:
+            self._apis.put(api)
+
+    def _new_api(self):
+        """Create a tesserocr API with this pool's language and variables"""
+        # OpenMP reads its limit once, when libtesseract loads; the handles share this process's threads
+        os.environ.setdefault('OMP_THREAD_LIMIT', str(process_threads()))
+        tesserocr = load_backend('tesserocr')
+        options = _parse_options(self.config)
+        api = tesserocr.PyTessBaseAPI(lang=self.lang, **options.pop('init'))
+        for name, value in options['variables']:
+            api.SetVariable(name, value)
+        return api
+
+    def _recognize_api(self, image: np.ndarray) -> str:
+        """Recognize one image on a pooled API handle"""
+        with self._borrow_api() as api:
+            api.SetImage(Image.fromarray(image))
+            return api.GetUTF8Text()
+
+    def _words_api(self, image: np.ndarray) -> List[Dict[str, Any]]:
+        """Recognize one image on a pooled API handle, returning its words"""
+        tesserocr = load_backend('tesserocr')
+        level = tesserocr.RIL.WORD
+        words = []
+        with self._borrow_api() as api:
+            api.SetImage(Image.fromarray(image))
+            api.Recognize()
+            for word in tesserocr.iterate_level(api.GetIterator(), level):
+                text = (word.GetUTF8Text(level) or '').strip()
+                box = word.BoundingBox(level)
+                if text and box:
+                    left, top, right, bottom = box
+                    words.append({'text': text, 'confidence': float(word.Confidence(level)),
+                                  'box': [left, top, right - left, bottom - top]})
+        return words
+
+    # filelist mode: one tesseract process per batch of images
+
+    def _run_filelist(self, images: List[np.ndarray], output: List[str]) -> str:
+        """Write a batch to a temp dir and run tesseract once over its file list, returning stdout"""
+        cv2 = load_backend('opencv')
+        pytesseract = load_backend('tesseract')
+        workdir = tempfile.mkdtemp(prefix='ocr-tess-')
+        try:
+            paths = []
+            for i, image in enumerate(images):
+                # PNM is uncompressed, so writing it costs far less than PNG
+                path = os.path.join(workdir, f"{i:05d}.pgm" if image.ndim == 2 else f"{i:05d}.ppm")
+                cv2.imwrite(path, image)
+                paths.append(path)
+
+            list_path = os.path.join(workdir, 'images.txt')
+            with open(list_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(paths) + '\n')
+
+            command = [pytesseract.pytesseract.tesseract_cmd, list_path, 'stdout', '-l', self.lang]
+            command += self.config.split() + output
+            # Concurrent tesseracts split this process's threads instead of each taking every core
+            result = subprocess.run(command, capture_output=True, env=subprocess_env(self.workers))
+            if result.returncode != 0:
+                raise RuntimeError(f"tesseract failed: {result.stderr.decode(errors='replace').strip()}")
+            return result.stdout.decode('utf-8', errors='replace')
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _recognize_filelist(self, images: List[np.ndarray]) -> List[str]:
+        """Text of each image in a batch from one tesseract process"""
+        pages = self._run_filelist(images, []).split(PAGE_SEPARATOR)
+        if len(pages) < len(images):
+            raise RuntimeError(f"tesseract returned {len(pages)} pages for {len(images)} images")
+        return pages[:len(images)]
+
+    def _words_filelist(self, images: List[np.ndarray]) -> List[List[Dict[str, Any]]]:
+        """Words of each image in a batch from one tesseract process's TSV output"""
+        return parse_tsv(self._run_filelist(images, ['tsv']), len(images))
+
+    def _pool(self) -> ThreadPoolExecutor:
+        """Threads that drive tesseract processes or API handles concurrently"""
+        with self._api_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='tesseract')
+        return self._executor
+
+    def recognize(self, image: np.ndarray) -> str:
+        """Recognize a single preprocessed image"""
+        return self.recognize_many([image])[0]
+
+    def recognize_many(self, images: List[np.ndarray]) -> List[str]:
+        """Recognize preprocessed images, returning text in input order"""
+        if not images:
+            return []
+
+        if self.mode == 'tesserocr':
+            if len(images) == 1:
+                return [self._recognize_api(images[0])]
+            return list(self._pool().map(self._recognize_api, images))
+
+        return self._map_batches(self._recognize_filelist, images)
+
+    def recognize_words_many(self, images: List[np.ndarray]) -> List[List[Dict[str, Any]]]:
+        """Recognize preprocessed images, returning each one's words in reading order
+
+        A word is a dict with its 'text', Tesseract's 'confidence' (0-100) and
+        'box' as [left, top, width, height] in the image's pixels.
+        """
+        if not images:
+            return []
+
+        if self.mode == 'tesserocr':
+            if len(images) == 1:
+                return [self._words_api(images[0])]
+            return list(self._pool().map(self._words_api, images))
+        return self._map_batches(self._words_filelist, images)
+
+    def _map_batches(self, recognize, images: List[np.ndarray]) -> list:
+        """Run a filelist recognizer over batch_size chunks concurrently, keeping input order"""
+        batches = [images[i:i + self.batch_size] for i in range(0, len(images), self.batch_size)]
+        if len(batches) == 1:
+            return recognize(batches[0])
+        results = []
+        for batch_results in self._pool().map(recognize, batches):
+            results.extend(batch_results)
+        return results
+
+    def close(self):
+        """Release API handles and worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        while not self._apis.empty():
+            self._apis.get_nowait().End()
+        self._api_count = 0
+
+
+def parse_tsv(tsv: str, pages: int) -> List[List[Dict[str, Any]]]:
+    """Words per page from Tesseract's TSV output (level 5 rows, page_num counting from 1)"""
+    words: List[List[Dict[str, Any]]] = [[] for _ in range(pages)]
+    for row in tsv.splitlines():
+        fields = row.split('\t')
+        if len(fields) < 12 or fields[0] != '5' or not fields[11].strip():
+            continue
+        page = int(fields[1]) - 1
+        if 0 <= page < pages:
+            words[page].append({'text': fields[11].strip(), 'confidence': float(fields[10]),
+                                'box': [int(value) for value in fields[6:10]]})
+    return words
+
+
+def _parse_options(config: str):
+    """Split a tesseract config string into tesserocr init arguments and '-c name=value' variables"""
+    parts = config.split()
+    options = {'init': {}, 'variables': []}
+    for i, part in enumerate(parts[:-1]):
+        value = parts[i + 1]
+        if part == '--psm':
+            options['init']['psm'] = int(value)
+        elif part == '--oem':
+            options['init']['oem'] = int(value)
+        elif part == '-c' and '=' in value:
+            options['variables'].append(tuple(value.split('=', 1)))
+    return options
+
+
+_pools: Dict[str, TesseractPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_tesseract_pool(config: str = '') -> TesseractPool:
+    """Process-wide Tesseract pool for a config string (TESSERACT_CONFIG language and sizes)"""
+    with _pools_lock:
+        pool = _pools.get(config)
+        if pool is None:
+            pool = TesseractPool(config=config)
+            _pools[config] = pool
+    return pool
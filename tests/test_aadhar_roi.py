@@ -0,0 +1,71 @@
+"""
+Template-region Aadhar reading
+Region texts come from the service's StubEngine or a mocked Tesseract pool,
+so these run without an OCR engine installed.
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from aadhar_roi import parse_regions
+from config import AADHAR_TEMPLATE
+from ocr_engine import OCREngine
+from service import STUB_REGIONS, StubEngine
+
+CARD = np.full((638, 1011, 3), 255, dtype=np.uint8)
+
+
+class ParseRegionsTest(unittest.TestCase):
+
+    def test_dob_next_to_its_label(self):
+        for text in ("DOB: 15/08/1990", "DOB : 15/08/1990", "Date of Birth/DOB: 15-08-1990"):
+            self.assertEqual(parse_regions({'dob': text})['dob'], text[-10:])
+
+    def test_invalid_number(self):
+        self.assertEqual(parse_regions({'number': "1234 5678 9012"})['aadhar_number'], '')
+        self.assertEqual(parse_regions({'number': "2345 6789 0123"})['aadhar_number'], '234567890123')
+
+
+class ReadAadharTest(unittest.TestCase):
+
+    def test_template(self):
+        text, detections, parsed = StubEngine(delay=0).read_aadhar(CARD, 'tesseract')
+        self.assertEqual(parsed['method'], 'template')
+        self.assertEqual((parsed['dob'], parsed['aadhar_number']), ('15/08/1990', '234567890123'))
+        self.assertIsNone(detections)
+
+    def test_missing_dob_comes_from_the_full_page(self):
+        engine = StubEngine(text="Priya Sharma\nDOB: 15/08/1990\nFemale", delay=0,
+                            regions=dict(STUB_REGIONS, dob="DOB:", gender=""))
+        text, _, parsed = engine.read_aadhar(CARD, 'tesseract')
+        self.assertEqual(parsed['method'], 'template+full_page')
+        # The number still comes from its region; the gaps are filled from the page
+        self.assertEqual((parsed['aadhar_number'], parsed['dob'], parsed['gender']),
+                         ('234567890123', '15/08/1990', 'Female'))
+        self.assertIn("DOB: 15/08/1990", text)
+
+    def test_no_card_reads_the_full_page(self):
+        page = np.full((100, 200, 3), 255, dtype=np.uint8)
+        _, _, parsed = StubEngine(text="2345 6789 0123", delay=0).read_aadhar(page, 'tesseract')
+        self.assertEqual((parsed['method'], parsed['aadhar_number']), ('full_page', '234567890123'))
+
+    def test_only_the_number_is_digit_restricted(self):
+        crops = {}
+
+        def pool(config=''):
+            def recognize_many(images):
+                crops[config] = len(images)
+                return ['text'] * len(images)
+            return mock.Mock(recognize_many=recognize_many)
+
+        with mock.patch('ocr_engine.get_tesseract_pool', pool):
+            texts = OCREngine(dedup=False)._read_aadhar_regions(CARD, 'tesseract')
+        self.assertEqual(set(texts), set(AADHAR_TEMPLATE['regions']))
+        # The DOB crop holds its "DOB:" label too, so it is read with the name and gender
+        self.assertEqual(crops, {'--psm 7': 3,
+                                 f"--psm 7 -c tessedit_char_whitelist={AADHAR_TEMPLATE['digit_allowlist']}": 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Per-upload memoization in the Streamlit app
+Checks the session keys and the bounded document store that let reruns
+re-render stored pages instead of OCR'ing them again. Skipped when Streamlit
+is not installed.
+"""
+
+import importlib.util
+import unittest
+from collections import OrderedDict
+from types import SimpleNamespace
+from unittest import mock
+
+if importlib.util.find_spec('streamlit') is not None:
+    import app
+
+
+def upload(data: bytes, content_type: str = 'image/png') -> SimpleNamespace:
+    """Stand-in for Streamlit's UploadedFile"""
+    return SimpleNamespace(getvalue=lambda: data, type=content_type)
+
+
+@unittest.skipIf(importlib.util.find_spec('streamlit') is None, "streamlit is not installed")
+class MemoTest(unittest.TestCase):
+
+    def test_document_key(self):
+        key = app.document_key(upload(b'page'), 'Resume', 'Tesseract OCR')
+        self.assertEqual(key, app.document_key(upload(b'page'), 'Resume', 'Tesseract OCR'))
+        self.assertNotEqual(key, app.document_key(upload(b'other page'), 'Resume', 'Tesseract OCR'))
+        self.assertNotEqual(key, app.document_key(upload(b'page'), 'Aadhar Card', 'Tesseract OCR'))
+        self.assertNotEqual(key, app.document_key(upload(b'page'), 'Resume', 'EasyOCR (Recommended)'))
+
+    def test_reruns_reuse_the_document(self):
+        memoized = OrderedDict()
+        with mock.patch.object(app, 'open_document', wraps=app.open_document) as opened:
+            document = app.memoized_document(memoized, 'a', upload(b'page'))
+            document['pages'][1] = {'page': 1, 'text': 'Priya Sharma'}
+            self.assertIs(app.memoized_document(memoized, 'a', upload(b'page')), document)
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(document['pages'][1]['text'], 'Priya Sharma')
+
+    def test_keeps_the_most_recent_documents(self):
+        memoized = OrderedDict()
+        keys = [str(index) for index in range(app.MAX_MEMOIZED_DOCUMENTS + 1)]
+        for key in keys[:-1]:
+            app.memoized_document(memoized, key, upload(key.encode()))
+        # Touching the oldest makes it the most recent, so the next one goes instead
+        app.memoized_document(memoized, keys[0], upload(b'0'))
+        app.memoized_document(memoized, keys[-1], upload(keys[-1].encode()))
+        self.assertEqual(list(memoized), keys[2:-1] + [keys[0], keys[-1]])
+
+    def test_unreadable_upload_is_not_kept(self):
+        memoized = OrderedDict()
+        with mock.patch.object(app, 'open_document', return_value=None):
+            self.assertIsNone(app.memoized_document(memoized, 'a', upload(b'%PDF-broken', 'application/pdf')))
+        self.assertEqual(memoized, OrderedDict())
+
+    def test_page_runs(self):
+        self.assertEqual(app.page_runs([5, 1, 2, 3, 7, 8]), [(1, 3), (5, 5), (7, 8)])
+        self.assertEqual(app.page_runs([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Field extraction regressions for the single-scan parser patterns
+Covers whole-word skill matching, each field family in scan_fields, the
+parse_resume/parse_aadhar results built on it and the utils.py helpers.
+"""
+
+import unittest
+
+from extraction import find_keywords, scan_fields
+from ocr_engine import OCREngine
+from utils import extract_dates, extract_phone_numbers, extract_skills_from_text
+
+
+class KeywordTest(unittest.TestCase):
+
+    def test_whole_words_only(self):
+        self.assertEqual(scan_fields("Maintained legacy javascript services")['skills'], ['javascript'])
+        self.assertEqual(find_keywords("maintain the mail server", ['ai', 'ml']), [])
+        self.assertEqual(find_keywords("AI and ML research", ['ai', 'ml']), ['ai', 'ml'])
+
+    def test_multi_word_across_lines(self):
+        self.assertEqual(scan_fields("Interests: machine\nlearning,  deep   learning")['skills'],
+                         ['machine learning', 'deep learning'])
+
+    def test_punctuated_keywords(self):
+        skills = scan_fields("Built Node.js APIs with CI/CD on GitHub.")['skills']
+        self.assertEqual(skills, ['node.js', 'github', 'ci/cd'])
+        # "node" or "ci" alone are not the keywords
+        self.assertEqual(scan_fields("node js, ci cd")['skills'], [])
+
+    def test_keyword_order_and_duplicates(self):
+        self.assertEqual(find_keywords("SQL, python, Python, sql", ['python', 'sql']), ['python', 'sql'])
+        self.assertEqual(extract_skills_from_text("Docker and dockerfiles", ['docker']), ['docker'])
+
+
+class FieldTest(unittest.TestCase):
+
+    def test_phones(self):
+        fields = scan_fields("Call +91 987-654-3210 or (022) 555-1234")
+        self.assertEqual(fields['phones'], ['+91 987-654-3210', '(022) 555-1234'])
+
+    def test_aadhar_is_not_a_phone(self):
+        fields = scan_fields("Aadhar 2345 6789 0123")
+        self.assertEqual((fields['aadhar_numbers'], fields['phones']), (['2345 6789 0123'], []))
+
+    def test_email_is_not_skills(self):
+        fields = scan_fields("priya.python@example.com")
+        self.assertEqual((fields['emails'], fields['skills']), (['priya.python@example.com'], []))
+
+    def test_dates(self):
+        self.assertEqual(scan_fields("DOB: 15/08/1990, issued 01-02-20")['dates'], ['15/08/1990', '01-02-20'])
+
+    def test_genders(self):
+        self.assertEqual(scan_fields("Female")['genders'], ['female'])
+        self.assertEqual(scan_fields("MALE")['genders'], ['male'])
+
+
+class ParserTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = OCREngine()
+
+    def test_parse_resume(self):
+        parsed = self.engine.parse_resume("Priya Sharma\npriya@example.com\n+91 987-654-3210\nPython, Docker")
+        self.assertEqual(parsed['name'], 'Priya Sharma')
+        self.assertEqual(parsed['email'], 'priya@example.com')
+        self.assertEqual(parsed['phone'], '+91 987-654-3210')
+        self.assertEqual(parsed['skills'], ['python', 'docker'])
+
+    def test_parse_aadhar(self):
+        parsed = self.engine.parse_aadhar("Government of India\nPriya Sharma\nDOB: 15/08/1990\nFemale\n"
+                                          "2345 6789 0123")
+        self.assertEqual(parsed, {'name': 'Priya Sharma', 'aadhar_number': '234567890123', 'dob': '15/08/1990',
+                                  'gender': 'Female', 'address': ''})
+
+    def test_aadhar_dob_prefers_four_digit_year(self):
+        self.assertEqual(self.engine.parse_aadhar("Printed 01/02/20\nDOB: 15/08/1990")['dob'], '15/08/1990')
+        # Two-digit years are accepted when nothing else is there
+        self.assertEqual(self.engine.parse_aadhar("DOB: 15/08/90")['dob'], '15/08/90')
+
+
+class UtilsTest(unittest.TestCase):
+
+    def test_phone_numbers_are_full_matches(self):
+        self.assertIn('+91 987-654-3210', extract_phone_numbers("Phone: +91 987-654-3210"))
+        self.assertEqual(extract_phone_numbers("9876543210"), ['9876543210'])
+
+    def test_dates_are_full_matches(self):
+        self.assertEqual(extract_dates("15/08/1990, 1990-08-15 and 15 Aug 1990"),
+                         ['15/08/1990', '1990-08-15', '15 Aug 1990'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+Durable job queue: leases, retries with backoff and lost leases
+Time is driven through a patched time.time, so leases expire and backoffs
+pass without waiting. The worker test replaces batch.process_document, so
+no OCR engine runs.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from job_queue import JobQueue, backoff_seconds, run_worker
+
+
+class Clock:
+    """Settable stand-in for time.time"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class JobQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'jobs.sqlite3')
+        self.clock = Clock()
+        patcher = mock.patch('job_queue.time.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.queue = JobQueue(self.path, lease_seconds=60)
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(self.queue.close)
+        self.queue.submit(['scan.png'], 'resume', 'tesseract', max_attempts=2)
+
+    def test_submit_is_idempotent(self):
+        self.assertEqual(self.queue.submit(['scan.png', 'other.png'], 'resume', 'tesseract'), 1)
+        self.assertEqual(self.queue.status()['pending'], 2)
+
+    def test_lease_expiry(self):
+        job, = self.queue.claim('a')
+        self.assertEqual(self.queue.claim('b'), [])
+        self.clock.now += 61
+        stolen, = self.queue.claim('b')
+        self.assertEqual((stolen['id'], stolen['attempts']), (job['id'], 2))
+        # The first worker finds out when it reports back
+        self.assertFalse(self.queue.complete(job['id'], 'a', 'a.json'))
+        self.assertIsNone(self.queue.fail(job['id'], 'a', 'boom'))
+        self.assertTrue(self.queue.complete(job['id'], 'b', 'b.json'))
+        self.assertEqual(self.queue.status()['done'], 1)
+
+    def test_heartbeat_keeps_the_lease(self):
+        job, = self.queue.claim('a')
+        self.clock.now += 50
+        self.assertEqual(self.queue.extend([job['id']], 'a'), 1)
+        self.clock.now += 50
+        self.assertEqual(self.queue.claim('b'), [])
+        self.assertEqual(self.queue.extend([job['id']], 'b'), 0)
+
+    def test_last_attempt_expiring_fails_the_job(self):
+        self.queue.claim('a')
+        self.clock.now += 61
+        self.queue.claim('b')
+        self.clock.now += 61
+        self.assertEqual(self.queue.claim('c'), [])
+        self.assertEqual(self.queue.failures()[0]['error'], 'Lease expired')
+
+    def test_backoff_and_retry(self):
+        job, = self.queue.claim('a')
+        with mock.patch('job_queue.random.uniform', return_value=1.0):
+            self.assertEqual(self.queue.fail(job['id'], 'a', 'tesseract crashed'), 'pending')
+        # Not runnable again until the backoff has passed
+        self.assertEqual(self.queue.claim('a'), [])
+        self.clock.now += backoff_seconds(1) * 1.25
+        job, = self.queue.claim('a')
+        self.assertEqual(job['attempts'], 2)
+        self.assertEqual(self.queue.fail(job['id'], 'a', 'tesseract crashed'), 'failed')
+        self.assertEqual(self.queue.status()['failed'], 1)
+
+        self.assertEqual(self.queue.retry_failed(), 1)
+        job, = self.queue.claim('a')
+        self.assertEqual(job['attempts'], 1)
+
+    def test_backoff_grows_and_is_capped(self):
+        with mock.patch('job_queue.random.uniform', return_value=1.0), \
+                mock.patch.dict('job_queue.JOBS_CONFIG', backoff_base=10, backoff_max=60):
+            self.assertEqual([backoff_seconds(attempts) for attempts in range(1, 6)], [10, 20, 40, 60, 60])
+
+    def test_release_does_not_count_the_attempt(self):
+        self.queue.claim('a')
+        self.assertEqual(self.queue.release('a'), 1)
+        job, = self.queue.claim('b')
+        self.assertEqual(job['attempts'], 1)
+
+    def test_publish_only_with_the_lease(self):
+        job, = self.queue.claim('a')
+        publish = mock.Mock()
+        self.clock.now += 61
+        self.queue.claim('b')
+        self.assertFalse(self.queue.complete(job['id'], 'a', 'a.json', publish=publish))
+        publish.assert_not_called()
+        self.assertTrue(self.queue.complete(job['id'], 'b', 'b.json', publish=publish))
+        publish.assert_called_once_with()
+
+    def test_failed_publish_keeps_the_job_running(self):
+        job, = self.queue.claim('a')
+        with self.assertRaises(OSError):
+            self.queue.complete(job['id'], 'a', 'a.json', publish=mock.Mock(side_effect=OSError('disk full')))
+        self.assertEqual(self.queue.status()['running'], 1)
+        self.assertTrue(self.queue.complete(job['id'], 'a', 'a.json'))
+
+
+class WorkerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'jobs.sqlite3')
+        self.results = os.path.join(self.directory.name, 'results')
+        queue = JobQueue(self.path)
+        queue.submit(['kept.png', 'lost.png', 'broken.png'], 'resume', 'tesseract', max_attempts=1)
+        queue.close()
+
+    def process_document(self, source, document_type, engine, ocr_engine, page):
+        record = {'source': source, 'pages': [], 'error': 'unreadable' if 'broken' in source else None}
+        if 'lost' in source:
+            # Another worker took the job over after this one's lease expired, and finished first
+            os.makedirs(self.results, exist_ok=True)
+            with open(os.path.join(self.results, '00000002.json'), 'w', encoding='utf-8') as f:
+                json.dump({'worker': 'other'}, f)
+            queue = JobQueue(self.path)
+            queue._conn.execute("UPDATE jobs SET state = 'done', lease_owner = NULL, result_path = ? "
+                                "WHERE source = ?", (os.path.join(self.results, '00000002.json'), source))
+            queue.close()
+        return record
+
+    def test_lost_leases_are_counted_and_leave_no_result(self):
+        with mock.patch('batch.process_document', self.process_document), \
+                mock.patch('thread_budget.apply_budget'):
+            counts = run_worker(self.path, self.results, owner='me', exit_when_idle=True, use_cache=False,
+                                poll_seconds=0.01)
+        self.assertEqual(counts, {'done': 1, 'failed': 1, 'retried': 0, 'lost': 1})
+        self.assertEqual(sorted(os.listdir(self.results)), ['00000001.json', '00000002.json'])
+        workers = []
+        for name in ('00000001.json', '00000002.json'):
+            with open(os.path.join(self.results, name), encoding='utf-8') as f:
+                workers.append(json.load(f)['worker'])
+        # The other worker's result was not overwritten
+        self.assertEqual(workers, ['me', 'other'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+OCR result cache: keys, both LRU tiers and recovery from store errors
+Each test works on its own SQLite file in a temporary directory.
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from ocr_cache import OCRCache, cache_key
+
+
+class CacheKeyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.page = np.full((40, 60), 255, dtype=np.uint8)
+        self.page[10:20, 5:50] = 0
+
+    def test_same_page_and_settings(self):
+        self.assertEqual(cache_key(self.page, 'tesseract', languages=['en'], preprocess=True),
+                         cache_key(self.page.copy(), 'tesseract', preprocess=True, languages=['en']))
+
+    def test_changes_invalidate(self):
+        key = cache_key(self.page, 'tesseract', languages=['en'], preprocess=True)
+        other = self.page.copy()
+        other[30, 30] = 0
+        self.assertNotEqual(key, cache_key(other, 'tesseract', languages=['en'], preprocess=True))
+        self.assertNotEqual(key, cache_key(self.page, 'easyocr', languages=['en'], preprocess=True))
+        self.assertNotEqual(key, cache_key(self.page, 'tesseract', languages=['en', 'hi'], preprocess=True))
+        self.assertNotEqual(key, cache_key(self.page, 'tesseract', languages=['en'], preprocess=False))
+        # Same pixels, different layout
+        self.assertNotEqual(key, cache_key(self.page.reshape(60, 40), 'tesseract', languages=['en'],
+                                           preprocess=True))
+
+
+class OCRCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cache.sqlite3')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def cache(self, **sizes) -> OCRCache:
+        cache = OCRCache(self.path, **dict({'memory_bytes': 1 << 20, 'disk_bytes': 1 << 20}, **sizes))
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_memory_then_disk_hit(self):
+        cache = self.cache()
+        cache.put('a', {'text': 'Priya Sharma'})
+        self.assertEqual(cache.get('a'), {'text': 'Priya Sharma'})
+        self.assertIsNone(cache.get('b'))
+
+        # A second process only sees the SQLite store
+        other = self.cache()
+        self.assertEqual(other.get('a'), {'text': 'Priya Sharma'})
+        self.assertEqual(other.get('a'), {'text': 'Priya Sharma'})
+        self.assertEqual((cache.stats['memory_hits'], cache.stats['misses']), (1, 1))
+        self.assertEqual((other.stats['disk_hits'], other.stats['memory_hits']), (1, 1))
+
+    def test_memory_eviction(self):
+        cache = self.cache(memory_bytes=100)
+        for key in 'abc':
+            cache.put(key, 'x' * 40)
+        cache.get('a')
+        cache.put('d', 'x' * 40)
+        # 'b' was least recently used; 'a' was refreshed by the get
+        self.assertEqual(list(cache._memory), ['a', 'd'])
+        self.assertLessEqual(cache.summary()['memory_bytes'], 100)
+
+    def test_disk_eviction(self):
+        cache = self.cache(memory_bytes=1, disk_bytes=250)
+        for index, key in enumerate('abcd'):
+            with mock.patch('ocr_cache.time.time', return_value=1000.0 + index):
+                cache.put(key, 'x' * 100)
+        summary = cache.summary()
+        self.assertLessEqual(summary['disk_bytes'], 250)
+        self.assertEqual(summary['evictions'], 2)
+        stored = {key for key, in cache._connection().execute("SELECT key FROM ocr_results")}
+        self.assertEqual(stored, {'c', 'd'})
+
+    def test_disk_eviction_counts_other_processes(self):
+        first, second = self.cache(memory_bytes=1, disk_bytes=250), self.cache(memory_bytes=1, disk_bytes=250)
+        for index, (cache, key) in enumerate([(first, 'a'), (second, 'b'), (first, 'c')]):
+            with mock.patch('ocr_cache.time.time', return_value=1000.0 + index):
+                cache.put(key, 'x' * 100)
+        self.assertEqual(first._stored_bytes(first._connection()), 204)
+        self.assertIsNone(second.get('a'))
+
+    def test_failed_write_rolls_back(self):
+        cache = self.cache()
+        cache.put('a', 'first')
+        with mock.patch.object(OCRCache, '_evict_disk', side_effect=sqlite3.OperationalError('disk I/O error')):
+            with self.assertLogs('ocr.cache', 'WARNING'):
+                cache.put('b', 'second')
+        self.assertEqual(cache.stats['disk_errors'], 1)
+        # Still served from memory, but never reached the store
+        self.assertEqual(cache.get('b'), 'second')
+        self.assertIsNone(self.cache().get('b'))
+
+        # The transaction was closed, so the next write goes through
+        cache.put('c', 'third')
+        self.assertEqual(self.cache().get('c'), 'third')
+        self.assertEqual(cache.stats['disk_errors'], 1)
+
+    def test_unreadable_store_is_a_miss(self):
+        cache = self.cache()
+        with mock.patch.object(OCRCache, '_connection', side_effect=sqlite3.OperationalError('unable to open')):
+            with self.assertLogs('ocr.cache', 'WARNING'):
+                self.assertIsNone(cache.get('a'))
+                cache.put('a', 'value')
+            self.assertEqual(cache.get('a'), 'value')
+        self.assertEqual(cache.stats['disk_errors'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
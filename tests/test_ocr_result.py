@@ -0,0 +1,89 @@
+"""
+Columnar OCRResult: construction, selection, coordinates and round trips
+"""
+
+import importlib.util
+import json
+import pickle
+import unittest
+
+import numpy as np
+
+from ocr_result import OCRResult
+
+DETECTIONS = [
+    ([[0, 0], [100, 0], [100, 20], [0, 20]], "Priya", 0.95),
+    ([[110, 0], [200, 0], [200, 20], [110, 20]], "Sharma", 0.7),
+    ([[0, 30], [150, 30], [150, 50], [0, 50]], "", 0.3),
+    ([[0, 60], [90, 60], [90, 80], [0, 80]], "DOB: 15/08/1990", 0.9),
+]
+
+
+class OCRResultTest(unittest.TestCase):
+
+    def setUp(self):
+        self.result = OCRResult.from_detections(DETECTIONS)
+
+    def test_detections_round_trip(self):
+        self.assertEqual(len(self.result), 4)
+        self.assertEqual(list(self.result), [tuple(detection) for detection in DETECTIONS])
+        self.assertEqual(self.result[1], tuple(DETECTIONS[1]))
+        self.assertEqual(self.result.to_list(), [list(detection) for detection in DETECTIONS])
+        self.assertEqual(self.result.texts, ["Priya", "Sharma", "", "DOB: 15/08/1990"])
+        self.assertEqual(self.result.text, "Priya Sharma  DOB: 15/08/1990")
+
+    def test_empty(self):
+        for empty in (OCRResult.empty(), OCRResult.from_detections([]), OCRResult.concatenate([])):
+            self.assertEqual((len(empty), empty.text, empty.to_list()), (0, '', []))
+        self.assertEqual(OCRResult.empty().buckets()['high'].to_list(), [])
+
+    def test_select_shares_the_buffer(self):
+        high = self.result.filter(0.9)
+        self.assertIs(high.buffer, self.result.buffer)
+        self.assertEqual(high.texts, ["Priya", "DOB: 15/08/1990"])
+        # The shared buffer also holds the texts the selection left out
+        self.assertEqual(high.text, "Priya DOB: 15/08/1990")
+        self.assertEqual(self.result.select(np.array([1])).text, "Sharma")
+
+    def test_buckets(self):
+        buckets = self.result.buckets()
+        self.assertEqual({name: bucket.texts for name, bucket in buckets.items()},
+                         {'low': [""], 'medium': ["Sharma"], 'high': ["Priya", "DOB: 15/08/1990"]})
+        # Edges are inclusive: a confidence of exactly 0.8 is high
+        self.assertEqual(OCRResult.from_detections([(DETECTIONS[0][0], "x", 0.8)]).bucket_indices().tolist(), [2])
+
+    def test_coordinates(self):
+        self.assertIs(self.result.scaled(1.0), self.result)
+        halved = OCRResult.from_detections([([[0, 0], [51, 0], [51, 11], [0, 11]], "x", 0.9)]).scaled(0.5)
+        self.assertEqual(halved[0][0], [[0, 0], [102, 0], [102, 22], [0, 22]])
+        moved = self.result.translated(10, 5)
+        self.assertEqual(moved[0][0][0], [10, 5])
+        left, top, right, bottom = self.result.bounds()
+        self.assertEqual((left.tolist(), bottom.tolist()), ([0, 110, 0, 0], [20, 20, 50, 80]))
+
+    def test_concatenate(self):
+        first, second = self.result.select(np.array([0, 1])), self.result.select(np.array([3]))
+        joined = OCRResult.concatenate([first, OCRResult.empty(), second])
+        self.assertEqual(joined.texts, ["Priya", "Sharma", "DOB: 15/08/1990"])
+        self.assertEqual(joined.text, "Priya Sharma DOB: 15/08/1990")
+        self.assertIs(OCRResult.concatenate([first]), first)
+
+    def test_json_and_pickle(self):
+        cached = json.loads(json.dumps(self.result.to_json()))
+        self.assertEqual(OCRResult.coerce(cached), self.result)
+        self.assertEqual(OCRResult.coerce(DETECTIONS), self.result)
+        self.assertIs(OCRResult.coerce(self.result), self.result)
+        self.assertEqual(pickle.loads(pickle.dumps(self.result)), self.result)
+        # Confidences come back without float32 noise
+        self.assertEqual(cached['confidences'], [0.95, 0.7, 0.3, 0.9])
+
+    @unittest.skipIf(importlib.util.find_spec('pandas') is None, "pandas is not installed")
+    def test_to_frame(self):
+        frame = self.result.to_frame()
+        self.assertEqual(list(frame['text']), self.result.texts)
+        self.assertEqual(frame['x1'].tolist(), [100, 200, 150, 90])
+        self.assertTrue(np.shares_memory(frame['x1'].to_numpy(), self.result.boxes))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Blank and repeated pages
+A4 pages at 300 dpi are drawn with Pillow: faint text and pencil strokes
+must not be taken for blank sheets, noisy blank sheets must, and results are
+only reused for identical pages of one document unless near-duplicate
+matching is switched on.
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from config import DEDUP_CONFIG
+from ocr_engine import OCREngine
+from page_dedup import PageIndex, fingerprint, is_duplicate
+
+A4 = (2480, 3508)
+
+
+def text_page(grey: int, size: int = 167) -> np.ndarray:
+    """Lines of text in one grey level (167 px is 40 pt at 300 dpi) on white paper"""
+    image = Image.new('RGB', A4, 'white')
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 has no sized default font; strokes of a similar weight stand in
+        font = None
+    for i in range(6):
+        if font is None:
+            draw.line([(200, 400 + i * 400), (2200, 400 + i * 400)], fill=(grey,) * 3, width=14)
+        else:
+            draw.text((200, 300 + i * 400), "Meeting notes for Tuesday", fill=(grey,) * 3, font=font)
+    return np.asarray(image)
+
+
+def noisy_paper(rng: np.random.Generator, level: int = 245, spread: int = 6) -> np.ndarray:
+    return np.clip(level + rng.integers(-spread, spread + 1, A4[::-1]), 0, 255).astype(np.uint8)
+
+
+class BlankTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(7)
+
+    def test_low_contrast_text_is_not_blank(self):
+        for grey in (200, 215):
+            self.assertFalse(fingerprint(text_page(grey))['blank'], f"grey {grey} text")
+
+    def test_pencil_is_not_blank(self):
+        image = Image.fromarray(noisy_paper(self.rng, 250, 4))
+        draw = ImageDraw.Draw(image)
+        for i in range(20):
+            y = 300 + i * 150
+            draw.line([(200 + x, y + int(10 * np.sin(x / 30))) for x in range(0, 1800, 6)], fill=170, width=2)
+        self.assertFalse(fingerprint(np.asarray(image))['blank'])
+
+    def test_blank_sheets(self):
+        self.assertTrue(fingerprint(noisy_paper(self.rng))['blank'])
+        self.assertTrue(fingerprint(np.full(A4[::-1] + (3,), 255, dtype=np.uint8))['blank'])
+        dusty = noisy_paper(self.rng, 240, 8)
+        for y, x in self.rng.integers(0, 3400, (10, 2)):
+            dusty[y:y + 3, x % 2400:x % 2400 + 3] = 120
+        self.assertTrue(fingerprint(dusty)['blank'])
+
+    def test_blank_pages_skip_ocr(self):
+        engine = OCREngine(dedup=True)
+        pages = [noisy_paper(self.rng), text_page(215)]
+        with mock.patch.object(OCREngine, '_extract_text_many', return_value=[("Meeting notes", None)]) as ocr:
+            results = engine.read_pages(pages, 'tesseract')
+        self.assertEqual(results, [('', None, 'blank'), ("Meeting notes", None, 'ocr')])
+        self.assertEqual(len(ocr.call_args[0][0]), 1)
+
+
+class DuplicateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.page = text_page(0)
+        shifted = np.full_like(self.page, 255)
+        shifted[4:, 4:] = self.page[:-4, :-4]
+        self.shifted = shifted
+
+    def test_exact_copies_within_one_document(self):
+        index = PageIndex()
+        index.add(fingerprint(self.page), 'tesseract:3508x2480', "first page")
+        copy = fingerprint(self.page.copy())
+        self.assertEqual(index.lookup(copy, 'tesseract:3508x2480'), ("first page", 0.0))
+        # Another engine or page size, or another document's index, never shares results
+        self.assertIsNone(index.lookup(copy, 'easyocr:3508x2480'))
+        self.assertIsNone(PageIndex().lookup(copy, 'tesseract:3508x2480'))
+
+    def test_near_duplicates_are_opt_in(self):
+        first, second = fingerprint(self.page), fingerprint(self.shifted)
+        self.assertFalse(DEDUP_CONFIG['near_duplicates'])
+        self.assertFalse(is_duplicate(first, second))
+        index = PageIndex()
+        index.add(first, 'tesseract', "first page")
+        self.assertIsNone(index.lookup(second, 'tesseract'))
+        with mock.patch.dict(DEDUP_CONFIG, near_duplicates=True):
+            self.assertTrue(is_duplicate(first, second))
+            self.assertEqual(index.lookup(second, 'tesseract')[0], "first page")
+
+    def test_repeated_page_in_one_call(self):
+        engine = OCREngine(dedup=True)
+        with mock.patch.object(OCREngine, '_extract_text_many', return_value=[("Meeting notes", None)]) as ocr:
+            results = engine.read_pages([self.page, self.page.copy()], 'tesseract')
+        self.assertEqual([source for _, _, source in results], ['ocr', 'duplicate'])
+        self.assertEqual(results[1][0], "Meeting notes")
+        self.assertEqual(ocr.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+"""
+HTTP service end to end with the stub engine
+Starts OCRService on an ephemeral port with StubEngine, which returns canned
+text after a short delay, so these run without Tesseract or EasyOCR.
+"""
+
+import asyncio
+import io
+import json
+import unittest
+from typing import Dict, Tuple
+from unittest import mock
+
+from PIL import Image, ImageDraw
+
+from config import SERVICE_CONFIG
+from service import OCRService, StubEngine
+
+
+def page_png(size: Tuple[int, int] = (200, 100)) -> bytes:
+    """A small page with some ink on it"""
+    image = Image.new('RGB', size, 'white')
+    ImageDraw.Draw(image).text((10, 40), "Priya Sharma", fill='black')
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def pdf_pages(*pages):
+    """Stand-in for pdf_pages.iter_pdf_document that yields the given pages, raising any exception among them"""
+    def iter_pdf_document(body):
+        for page in pages:
+            if isinstance(page, Exception):
+                raise page
+            yield page
+    return iter_pdf_document
+
+
+class ServiceTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        # One consumer and one queue slot, so a third concurrent request finds the queue full
+        self.service = OCRService(StubEngine(delay=0.5), engines={'tesseract': {'workers': 1, 'queue_size': 1},
+                                                                  'easyocr': {'workers': 1, 'queue_size': 4}})
+        server = await self.service.start('127.0.0.1', 0)
+        self.port = server.sockets[0].getsockname()[1]
+        for _ in range(100):
+            if self.service.ready:
+                break
+            await asyncio.sleep(0.05)
+        self.assertTrue(self.service.ready)
+
+    async def asyncTearDown(self):
+        await self.service.stop()
+
+    async def request(self, raw: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        """Send raw request bytes and return the status, headers and body of the response"""
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write(raw)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        head, body = response.split(b'\r\n\r\n', 1)
+        lines = head.decode('latin-1').split('\r\n')
+        headers = dict(line.split(': ', 1) for line in lines[1:])
+        return int(lines[0].split(' ')[1]), {name.lower(): value for name, value in headers.items()}, body
+
+    async def post(self, path: str, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        head = f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n"
+        return await self.request(head.encode() + body)
+
+    async def test_ocr(self):
+        status, _, body = await self.post('/ocr?engine=tesseract', page_png())
+        self.assertEqual(status, 200)
+        pages = json.loads(body)['pages']
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(pages[0]['text'], StubEngine().text)
+        self.assertIsNone(pages[0]['error'])
+
+    async def test_boxes_in_upload_coordinates(self):
+        # A large JPEG is decoded at reduced size; the stub's boxes span the decoded width
+        buffer = io.BytesIO()
+        Image.new('RGB', (6000, 4500), 'white').save(buffer, 'JPEG')
+        status, _, body = await self.post('/ocr?engine=easyocr', buffer.getvalue())
+        self.assertEqual(status, 200)
+        boxes = [box for box, _, _ in json.loads(body)['pages'][0]['detections']]
+        self.assertEqual(max(x for box in boxes for x, _ in box), 6000)
+        self.assertEqual(max(y for box in boxes for _, y in box), 4500)
+
+    async def test_parse(self):
+        status, _, body = await self.post('/parse/resume?engine=tesseract', page_png())
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['pages'][0]['parsed']['email'], 'priya.sharma@example.com')
+
+    async def test_parse_aadhar(self):
+        # Cards go through read_aadhar, whose parsed fields say which path read them
+        status, _, body = await self.post('/parse/aadhar?engine=tesseract', page_png())
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['pages'][0]['parsed']['method'], 'full_page')
+
+    async def test_parse_aadhar_template(self):
+        # A scan with the card's proportions is read region by region
+        status, _, body = await self.post('/parse/aadhar?engine=tesseract', page_png((1011, 638)))
+        self.assertEqual(status, 200)
+        parsed = json.loads(body)['pages'][0]['parsed']
+        self.assertEqual(parsed['method'], 'template')
+        self.assertEqual((parsed['aadhar_number'], parsed['dob'], parsed['gender']),
+                         ('234567890123', '15/08/1990', 'Female'))
+
+    async def test_pdf(self):
+        page = Image.open(io.BytesIO(page_png()))
+        with mock.patch('pdf_pages.pdf_page_count', return_value=3), \
+                mock.patch('pdf_pages.iter_pdf_document', pdf_pages("Embedded text", page, page)):
+            status, _, body = await self.post('/ocr?engine=tesseract', b'%PDF-1.4')
+        self.assertEqual(status, 200)
+        pages = json.loads(body)['pages']
+        self.assertEqual([page['page'] for page in pages], [1, 2, 3])
+        self.assertEqual([page['source'] for page in pages], ['text_layer', 'ocr', 'ocr'])
+        self.assertEqual(pages[0]['text'], "Embedded text")
+        self.assertEqual(pages[2]['text'], StubEngine().text)
+
+    async def test_unreadable_pdf(self):
+        status, _, _ = await self.post('/ocr', b'%PDF-1.4 truncated')
+        self.assertEqual(status, 400)
+        # Rasterization failing part-way through is still the upload's fault
+        page = Image.open(io.BytesIO(page_png()))
+        with mock.patch('pdf_pages.pdf_page_count', return_value=2), \
+                mock.patch('pdf_pages.iter_pdf_document', pdf_pages(page, RuntimeError("pdftoppm failed"))):
+            status, _, body = await self.post('/ocr', b'%PDF-1.4')
+        self.assertEqual(status, 400)
+        self.assertIn('pdftoppm failed', json.loads(body)['error'])
+
+    async def test_too_many_pdf_pages(self):
+        with mock.patch('pdf_pages.pdf_page_count', return_value=5), mock.patch.dict(SERVICE_CONFIG, max_pdf_pages=4):
+            status, _, _ = await self.post('/ocr', b'%PDF-1.4')
+        self.assertEqual(status, 413)
+
+    async def test_oversized_body(self):
+        with mock.patch.dict(SERVICE_CONFIG, max_body_bytes=1024):
+            status, _, body = await self.post('/ocr', b'x' * 2048)
+        self.assertEqual(status, 413)
+        self.assertIn('error', json.loads(body))
+
+    async def test_malformed_requests(self):
+        status, _, _ = await self.request(b"GARBAGE\r\n\r\n")
+        self.assertEqual(status, 400)
+        for length in ('abc', '-5'):
+            status, _, _ = await self.request(f"POST /ocr HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+            self.assertEqual(status, 400)
+        status, _, _ = await self.post('/ocr', b'not an image')
+        self.assertEqual(status, 400)
+
+    async def test_full_queue(self):
+        body = page_png()
+        first = asyncio.ensure_future(self.post('/ocr', body))
+        await asyncio.sleep(0.1)
+        second = asyncio.ensure_future(self.post('/ocr', body))
+        await asyncio.sleep(0.1)
+        status, headers, _ = await self.post('/ocr', body)
+        self.assertEqual(status, 429)
+        self.assertGreaterEqual(int(headers['retry-after']), 1)
+        self.assertEqual([response[0] for response in await asyncio.gather(first, second)], [200, 200])
+
+
+if __name__ == '__main__':
+    unittest.main()
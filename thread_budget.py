@@ -0,0 +1,109 @@
+"""
+Process-wide CPU thread budget
+torch, OpenCV and Tesseract's OpenMP each start one thread per core, so N
+worker processes on one machine run N times as many threads as there are
+cores and get slower as workers are added. apply_budget(workers) gives this
+process cores // workers threads: torch intra-op (and a small inter-op pool),
+cv2.setNumThreads, and the OpenMP limits that Tesseract subprocesses and
+not-yet-loaded libraries read from the environment. Libraries are configured
+as they are loaded, so a Tesseract-only worker never imports torch for this.
+"""
+
+import logging
+import os
+import sys
+from typing import Dict, Any, Optional
+
+from backends import on_load
+from config import THREAD_CONFIG
+
+logger = logging.getLogger('ocr.threads')
+
+# OpenMP, MKL and OpenBLAS read these when they start, including in tesseract subprocesses
+THREAD_ENV_VARS = ('OMP_THREAD_LIMIT', 'OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+_budget: Optional[Dict[str, Any]] = None
+
+
+def available_cores() -> int:
+    """Cores to share out: THREAD_CONFIG['cores'], else the CPUs this process may run on"""
+    if THREAD_CONFIG['cores']:
+        return THREAD_CONFIG['cores']
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def plan(workers: int, cores: int = None) -> Dict[str, Any]:
+    """Threads each of `workers` processes should use on `cores` cores"""
+    cores = cores or available_cores()
+    workers = max(1, workers)
+    threads = max(1, cores // workers)
+    return {
+        'cores': cores,
+        'workers': workers,
+        'threads': threads,
+        'torch_intra_op': threads,
+        'torch_inter_op': min(THREAD_CONFIG['interop_threads'], threads),
+        'opencv': threads,
+        'omp_thread_limit': threads
+    }
+
+
+def apply_budget(workers: int, cores: int = None) -> Optional[Dict[str, Any]]:
+    """Limit this process to its share of the cores, returning the plan (None when disabled)
+
+    Call it in a worker process before it loads models; torch's inter-op
+    pool can only be sized before its first parallel operation.
+    """
+    global _budget
+    if not THREAD_CONFIG['enabled']:
+        return None
+    _budget = plan(workers, cores)
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(_budget['omp_thread_limit'])
+    logger.info("Thread budget: %d cores / %d workers -> %d threads per worker",
+                _budget['cores'], _budget['workers'], _budget['threads'])
+    # easyocr imports torch and cv2 itself, so its loading configures them too
+    for backend in ('torch', 'opencv', 'easyocr'):
+        on_load(backend, _configure_libraries)
+    return _budget
+
+
+def current_budget() -> Optional[Dict[str, Any]]:
+    """The plan applied in this process, if any"""
+    return _budget
+
+
+def process_threads() -> int:
+    """Threads this process may use: its budget, or every core when none was applied"""
+    return _budget['threads'] if _budget else available_cores()
+
+
+def subprocess_env(concurrent: int) -> Dict[str, str]:
+    """Environment for one of `concurrent` subprocesses, splitting this process's threads between them"""
+    threads = str(max(1, process_threads() // max(1, concurrent)))
+    return {**os.environ, **{name: threads for name in THREAD_ENV_VARS}}
+
+
+def _configure_libraries(_module=None):
+    """Apply the budget to torch and OpenCV if they are loaded, logging the effective settings"""
+    if _budget is None:
+        return
+    effective = {}
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        torch.set_num_threads(_budget['torch_intra_op'])
+        try:
+            torch.set_num_interop_threads(_budget['torch_inter_op'])
+        except RuntimeError:
+            # Already set, or torch has run parallel work; the intra-op limit still applies
+            pass
+        effective['torch_intra_op'] = torch.get_num_threads()
+        effective['torch_inter_op'] = torch.get_num_interop_threads()
+    cv2 = sys.modules.get('cv2')
+    if cv2 is not None:
+        cv2.setNumThreads(_budget['opencv'])
+        effective['opencv'] = cv2.getNumThreads()
+    if effective:
+        logger.info("Effective threads: %s", ', '.join(f"{name}={value}" for name, value in effective.items()))
@@ -1,83 +1,61 @@
 import re
-import cv2
 import numpy as np
 from PIL import Image
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any
 import base64
 import io
+from preprocessing import get_pipeline
+from extraction import EMAIL_RE, WHITESPACE_RE, find_keywords
+from ocr_result import OCRResult
+
+PHONE_RES = [
+    re.compile(r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'),  # US format
+    re.compile(r'\+\d{1,3}\s?\d{10}'),  # International format
+    re.compile(r'\d{10}'),  # Simple 10-digit
+]
+
+DATE_RES = [
+    re.compile(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{4}\b'),  # DD/MM/YYYY or MM/DD/YYYY
+    re.compile(r'\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b'),  # YYYY/MM/DD
+    re.compile(r'\b\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4}\b', re.IGNORECASE),  # DD Mon YYYY
+]
+
+SPECIAL_CHARS_RE = re.compile(r'[^\w\s@.-]')
 
 def preprocess_image_advanced(image: np.ndarray) -> np.ndarray:
-    """Advanced image preprocessing for better OCR results"""
-    
-    # Convert to grayscale if not already
-    if len(image.shape) == 3:
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    else:
-        gray = image.copy()
-    
-    # Noise reduction
-    denoised = cv2.medianBlur(gray, 3)
-    
-    # Contrast enhancement
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-    enhanced = clahe.apply(denoised)
-    
-    # Adaptive thresholding
-    thresh = cv2.adaptiveThreshold(
-        enhanced, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-    )
-    
-    # Morphological operations to clean up
-    kernel = np.ones((1,1), np.uint8)
-    cleaned = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel, iterations=1)
-    
-    return cleaned
+    """Advanced image preprocessing for better OCR results (BGR input, stages from PREPROCESS_CONFIG['advanced'])"""
+    return get_pipeline('advanced').run(image)
 
 def extract_email_addresses(text: str) -> List[str]:
     """Extract all email addresses from text"""
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    return re.findall(email_pattern, text)
+    return EMAIL_RE.findall(text)
 
 def extract_phone_numbers(text: str) -> List[str]:
     """Extract phone numbers from text"""
-    patterns = [
-        r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',  # US format
-        r'\+\d{1,3}\s?\d{10}',  # International format
-        r'\d{10}',  # Simple 10-digit
-    ]
-    
     phone_numbers = []
-    for pattern in patterns:
-        matches = re.findall(pattern, text)
-        phone_numbers.extend(matches)
+    for pattern in PHONE_RES:
+        phone_numbers.extend(match.group() for match in pattern.finditer(text))
     
     return list(set(phone_numbers))  # Remove duplicates
 
 def extract_dates(text: str) -> List[str]:
     """Extract dates from text"""
-    date_patterns = [
-        r'\b\d{1,2}[/-]\d{1,2}[/-]\d{4}\b',  # DD/MM/YYYY or MM/DD/YYYY
-        r'\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b',  # YYYY/MM/DD
-        r'\b\d{1,2}\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4}\b',  # DD Mon YYYY
-    ]
-    
     dates = []
-    for pattern in date_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        dates.extend(matches)
+    for pattern in DATE_RES:
+        dates.extend(match.group() for match in pattern.finditer(text))
     
     return dates
 
 def clean_text(text: str) -> str:
     """Clean and normalize extracted text"""
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = WHITESPACE_RE.sub(' ', text)
     
     # Remove special characters but keep punctuation
-    text = re.sub(r'[^\w\s@.-]', ' ', text)
+    text = SPECIAL_CHARS_RE.sub(' ', text)
     
     # Remove multiple spaces
-    text = re.sub(r'\s+', ' ', text)
+    text = WHITESPACE_RE.sub(' ', text)
     
     return text.strip()
 
@@ -100,19 +78,13 @@ def image_to_base64(image: Image.Image) -> str:
 def validate_aadhar_number(aadhar: str) -> bool:
     """Validate Aadhar number format"""
     # Remove spaces and check if it's 12 digits
-    aadhar_clean = re.sub(r'\s+', '', aadhar)
+    aadhar_clean = WHITESPACE_RE.sub('', aadhar)
     return len(aadhar_clean) == 12 and aadhar_clean.isdigit()
 
 def extract_skills_from_text(text: str, skill_keywords: List[str]) -> List[str]:
     """Extract skills from text based on predefined keywords"""
-    text_lower = text.lower()
-    found_skills = []
-    
-    for skill in skill_keywords:
-        if skill.lower() in text_lower:
-            found_skills.append(skill)
-    
-    return list(set(found_skills))  # Remove duplicates
+    # Whole-word matches in a single scan (see extraction.keyword_pattern)
+    return find_keywords(text, skill_keywords)
 
 def calculate_text_similarity(text1: str, text2: str) -> float:
     """Calculate similarity between two texts (simple Jaccard similarity)"""
@@ -127,47 +99,17 @@ def calculate_text_similarity(text1: str, text2: str) -> float:
     
     return len(intersection) / len(union)
 
-def format_extraction_results(results: List[Tuple], min_confidence: float = 0.5) -> Dict[str, Any]:
-    """Format OCR results with filtering"""
+def format_extraction_results(results, min_confidence: float = 0.5) -> Dict[str, Any]:
+    """Format OCR results (an OCRResult or (box, text, confidence) tuples) with filtering"""
+    results = OCRResult.coerce(results).filter(min_confidence)
     formatted_results = {
-        'high_confidence': [],
-        'medium_confidence': [],
-        'low_confidence': [],
-        'all_text': '',
-        'average_confidence': 0.0
+        'all_text': results.text,
+        'average_confidence': float(results.confidences.mean()) if len(results) else 0.0
     }
-    
-    total_confidence = 0
-    valid_results = []
-    
-    for result in results:
-        coordinates, text, confidence = result
-        
-        if confidence >= min_confidence:
-            valid_results.append(result)
-            total_confidence += confidence
-            
-            if confidence >= 0.8:
-                formatted_results['high_confidence'].append({
-                    'text': text,
-                    'confidence': confidence,
-                    'coordinates': coordinates
-                })
-            elif confidence >= 0.6:
-                formatted_results['medium_confidence'].append({
-                    'text': text,
-                    'confidence': confidence,
-                    'coordinates': coordinates
-                })
-            else:
-                formatted_results['low_confidence'].append({
-                    'text': text,
-                    'confidence': confidence,
-                    'coordinates': coordinates
-                })
-    
-    if valid_results:
-        formatted_results['all_text'] = ' '.join([r[1] for r in valid_results])
-        formatted_results['average_confidence'] = total_confidence / len(valid_results)
-    
+    # Confidence buckets are picked with one vectorized pass; only kept detections become dicts
+    for name, bucket in results.buckets().items():
+        formatted_results[f'{name}_confidence'] = [
+            {'text': text, 'confidence': confidence, 'coordinates': coordinates}
+            for coordinates, text, confidence in bucket
+        ]
     return formatted_results
\ No newline at end of file